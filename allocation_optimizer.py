@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+from assumptions import current_assumptions, resolve
+from retirement_batch import (
+    growing_annuity_pv_batch,
+    required_monthly_sip_batch,
+)
+
+
+def __getattr__(name):
+    # The default equity ceilings per risk level now live in assumptions.toml
+    if name == "MAX_EQUITY_BY_RISK":
+        return current_assumptions().max_equity
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@dataclass
+class AllocationResult:
+    weights: dict
+    annual_return: float
+    required_corpus: float
+    required_sip: int
+    candidates: int
+
+
+@lru_cache(maxsize=8)
+def simplex_grid(n_assets: int, step: float = 0.025) -> np.ndarray:
+    # Every allocation of n_assets weights in multiples of step that sums to
+    # 1, as an (n, n_assets) array. step=0.025 with four assets gives 12,341
+    # points. Built with stars and bars; read-only because it is cached.
+    units = round(1 / step)
+    if not np.isclose(units * step, 1.0):
+        raise ValueError("step must divide 1 evenly")
+    bars = np.array(list(combinations(range(units + n_assets - 1), n_assets - 1)))
+    edges = np.hstack([np.full((len(bars), 1), -1), bars,
+                       np.full((len(bars), 1), units + n_assets - 1)])
+    grid = (np.diff(edges, axis=1) - 1) / units
+    grid.flags.writeable = False
+    return grid
+
+
+def optimize_allocation(monthly_expense_today: float, years_to_ret: int,
+                        retirement_years: int, current_savings: float, *,
+                        min_weights: dict = None, max_weights: dict = None,
+                        fd_lockin: bool = False, step: float = 0.025,
+                        inflation: float = None,
+                        post_ret_return: float = None,
+                        asset_returns: dict = None,
+                        compounding: str = "annual") -> AllocationResult:
+    # Allocation with the lowest required monthly SIP among every simplex grid
+    # point within [min_weights, max_weights] per asset. Under portfolio
+    # withdrawal the same mix also funds retirement, so it drives the corpus
+    # too. Ties go to the lowest equity share.
+    inflation, post_ret_return, asset_returns = resolve(
+        inflation=inflation, post_ret_return=post_ret_return, asset_returns=asset_returns)
+    assets = list(asset_returns)
+    grid = simplex_grid(len(assets), step)
+
+    lo = np.array([(min_weights or {}).get(a, 0.0) for a in assets])
+    hi = np.array([(max_weights or {}).get(a, 1.0) for a in assets])
+    allowed = np.all((grid >= lo - 1e-9) & (grid <= hi + 1e-9), axis=1)
+    if not allowed.any():
+        raise ValueError("No allocation on the grid satisfies the weight limits")
+    candidates = grid[allowed]
+
+    r = candidates @ np.array([asset_returns[a] for a in assets])
+    annual = monthly_expense_today * 12 * (1 + inflation) ** years_to_ret
+    required = growing_annuity_pv_batch(
+        annual, post_ret_return if fd_lockin else r, retirement_years,
+        inflation=inflation, compounding=compounding,
+    )
+    sip = required_monthly_sip_batch(required, current_savings, years_to_ret, r,
+                                     compounding=compounding)
+    if np.isnan(sip).all():
+        raise ValueError("A shortfall cannot be closed with no years left to invest")
+
+    equity = candidates[:, assets.index("Equity")] if "Equity" in assets else np.zeros(len(r))
+    best = np.lexsort((equity, sip))[0]
+    return AllocationResult(
+        weights={a: float(w) for a, w in zip(assets, candidates[best])},
+        annual_return=float(r[best]),
+        required_corpus=float(np.broadcast_to(required, r.shape)[best]),
+        required_sip=int(sip[best]),
+        candidates=int(allowed.sum()),
+    )
@@ -1,7 +1,5 @@
 import streamlit as st
-from insurance_inputs import InsuranceInputs
-from insurance_gap import calculate_insurance_gap
-from premium_estimator import estimate_life_premium, estimate_health_premium
+from ui_bootstrap import apply_theme
 
 
 # =============================
@@ -15,81 +13,7 @@ st.set_page_config(
 # =============================
 # GLOBAL THEME (DARK + EMERALD)
 # =============================
-st.markdown("""
-<style>
-
-/* Background */
-.stApp {
-    background-color: #0f172a;
-    color: #e5e7eb;
-}
-
-/* Headings */
-h1, h2, h3 {
-    color: #f8fafc;
-}
-
-/* Hero */
-.hero-title {
-    font-size: 44px;
-    font-weight: 800;
-    margin-bottom: 6px;
-}
-.hero-subtitle {
-    font-size: 18px;
-    color: #9ca3af;
-    margin-bottom: 32px;
-}
-
-/* DARK CARDS (Streamlit-native) */
-div[data-testid="stContainer"] {
-    background-color: #111827;
-    border-radius: 18px;
-    border: 1px solid #1f2937;
-    padding: 26px;
-}
-
-/* Card hover (subtle) */
-div[data-testid="stContainer"]:hover {
-    box-shadow: 0 0 0 1px #10b981;
-    transition: 0.2s ease;
-}
-
-/* Metrics */
-[data-testid="stMetricValue"] {
-    font-size: 30px;
-    font-weight: 700;
-    color: #10b981;
-}
-
-/* Buttons */
-.stButton > button {
-    background-color: #10b981;
-    color: white;
-    border-radius: 10px;
-    font-weight: 600;
-    border: none;
-    padding: 0.6rem 1.2rem;
-}
-.stButton > button:hover {
-    background-color: #059669;
-}
-
-/* Captions / muted */
-.small-text {
-    color: #94a3b8;
-    font-size: 14px;
-}
-            
-/* Accent text */
-.accent {
-    color: #5eead4;
-    font-weight: 600;
-}
-
-
-</style>
-""", unsafe_allow_html=True)
+apply_theme("home")
 
 # =============================
 # HOME PAGE CONTENT (POLISHED)
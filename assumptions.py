@@ -0,0 +1,430 @@
+import bisect
+import hashlib
+import json
+import math
+import os
+import threading
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+ASSUMPTIONS_PATH = Path(os.environ.get("SIMULATOR_ASSUMPTIONS",
+                                       Path(__file__).parent / "assumptions.toml"))
+
+# Fingerprint sections: a change only invalidates results cached under its section
+SECTIONS = {
+    "retirement": ("retirement",),
+    "insurance": ("life_insurance", "health_insurance", "premiums"),
+}
+
+
+# ============================================================
+# DATA MODEL
+# ============================================================
+
+@dataclass(frozen=True)
+class Band:
+    # Applies to x < upper (inclusive=False) or x <= upper (inclusive=True);
+    # upper is None for the last, open-ended band.
+    upper: Optional[float]
+    inclusive: bool
+    value: object
+
+
+@dataclass(frozen=True)
+class BandTable:
+    # Bands compiled once into sorted edges: band i covers
+    # edges[i-1] <= x < edges[i]. A "through" bound u becomes the edge
+    # nextafter(u, inf), so x == u stays in its band. Lookups are a bisect
+    # (scalar) or one searchsorted (batch) instead of a walk over the bands.
+    bands: tuple
+    edges: tuple
+    values: tuple
+    edge_array: np.ndarray = field(compare=False, repr=False)
+    int_edge_array: np.ndarray = field(compare=False, repr=False)
+    value_array: np.ndarray = field(compare=False, repr=False)
+
+    def lookup(self, x):
+        return self.values[bisect.bisect_right(self.edges, x)]
+
+    def index_batch(self, x) -> np.ndarray:
+        # Band number of each element. For integers, x >= edge exactly when
+        # x >= ceil(edge), so integer input is searched without a float copy.
+        x = np.asarray(x)
+        edges = self.int_edge_array if x.dtype.kind == "i" else self.edge_array
+        return np.searchsorted(edges, x, side="right")
+
+    def lookup_batch(self, x) -> np.ndarray:
+        # One row per element of x; premium ranges come back as (n, 2)
+        return self.value_array.take(self.index_batch(x), axis=0)
+
+
+def compile_bands(bands: tuple) -> BandTable:
+    # `bands` must be ordered with rising bounds and an open last band, as
+    # load_assumptions validates
+    edges = tuple(band.upper if not band.inclusive else math.nextafter(band.upper, math.inf)
+                  for band in bands[:-1])
+    values = tuple(band.value for band in bands)
+    edge_array = np.array(edges, dtype=float)
+    int_edge_array = np.ceil(edge_array).clip(-2 ** 62, 2 ** 62).astype(np.int64)
+    value_array = np.array(values, dtype=float)
+    for array in (edge_array, int_edge_array, value_array):
+        array.flags.writeable = False
+    return BandTable(tuple(bands), edges, values, edge_array, int_edge_array, value_array)
+
+
+@dataclass(frozen=True)
+class InsuranceRules:
+    # City tiers and lifestyle risks are keyed amounts
+    life_income_multiplier: BandTable
+    health_base_cover: BandTable
+    health_family_buffer: BandTable
+    city_tier_cover: dict
+    lifestyle_cover: dict
+    premium_cover_unit: float
+    life_premium_rates: BandTable
+    health_premium_rates: BandTable
+    # Yearly growth rates for projecting cover to retirement
+    income_growth: float
+    medical_inflation: float
+
+
+@dataclass(frozen=True)
+class Assumptions:
+    # Field names match the engine keyword arguments they fill in
+    inflation: float
+    post_ret_return: float
+    max_sip_growth: float
+    asset_returns: dict
+    volatility: dict
+    risk_alloc: dict
+    max_equity: dict
+    insurance: InsuranceRules
+    fingerprints: dict
+    path: Path
+    mtime_ns: int
+
+    def fingerprint(self, section: str = None) -> str:
+        if section is None:
+            return hashlib.sha256("".join(self.fingerprints.values()).encode()).hexdigest()
+        return self.fingerprints[section]
+
+
+# ============================================================
+# PARSING + VALIDATION
+# ============================================================
+
+def _number(value, where: str, minimum: float = None) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{where} must be a number")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{where} must be at least {minimum}")
+    return value
+
+
+def _table(data: dict, key: str, where: str) -> dict:
+    value = data.get(key)
+    if not isinstance(value, dict):
+        raise ValueError(f"{where}.{key} is missing or not a table")
+    return value
+
+
+def _amounts(data: dict, key: str, where: str, minimum: float = None) -> dict:
+    return {name: _number(v, f"{where}.{key}.{name}", minimum)
+            for name, v in _table(data, key, where).items()}
+
+
+def _bands(data: dict, key: str, where: str, read_value) -> BandTable:
+    rows = data.get(key)
+    if not isinstance(rows, list) or not rows:
+        raise ValueError(f"{where}.{key} must be a non-empty list of bands")
+    bands = []
+    for i, row in enumerate(rows):
+        at = f"{where}.{key}[{i}]"
+        bounds = [k for k in ("below", "through") if k in row]
+        last = i == len(rows) - 1
+        if last and bounds:
+            raise ValueError(f"{at} is the last band and must not have a bound")
+        if not last and len(bounds) != 1:
+            raise ValueError(f"{at} needs exactly one of 'below' or 'through'")
+        upper = _number(row[bounds[0]], f"{at}.{bounds[0]}") if bounds else None
+        if bands and upper is not None and upper <= bands[-1].upper:
+            raise ValueError(f"{at} bound must be above the previous band's")
+        bands.append(Band(upper, bounds == ["through"], read_value(row, at)))
+    return compile_bands(tuple(bands))
+
+
+def _premium_range(row: dict, at: str) -> tuple:
+    low, high = _number(row.get("low"), f"{at}.low", 0), _number(row.get("high"), f"{at}.high", 0)
+    if low > high:
+        raise ValueError(f"{at}.low must not exceed high")
+    return (low, high)
+
+
+def _section_fingerprint(raw: dict, keys: tuple) -> str:
+    payload = json.dumps({k: raw.get(k) for k in keys}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_assumptions(path=ASSUMPTIONS_PATH) -> Assumptions:
+    # Parses and validates the file. Errors name the offending key.
+    path = Path(path)
+    mtime_ns = path.stat().st_mtime_ns
+    try:
+        raw = tomllib.loads(path.read_text(encoding="utf-8"))
+    except tomllib.TOMLDecodeError as exc:
+        raise ValueError(f"{path}: {exc}") from exc
+
+    try:
+        retirement = _table(raw, "retirement", "")
+        asset_returns = _amounts(retirement, "asset_returns", "retirement", minimum=-1)
+        volatility = _amounts(retirement, "asset_volatility", "retirement", minimum=0)
+        if set(volatility) != set(asset_returns):
+            raise ValueError("retirement.asset_volatility must list the same assets as asset_returns")
+
+        risk_alloc = {}
+        for level, weights in _table(retirement, "risk_allocation", "retirement").items():
+            at = f"retirement.risk_allocation.{level}"
+            if not level.isdigit() or not isinstance(weights, dict):
+                raise ValueError(f"{at} must be a numbered table of weights")
+            if set(weights) != set(asset_returns):
+                raise ValueError(f"{at} must have a weight for each of {', '.join(asset_returns)}")
+            risk_alloc[int(level)] = {a: _number(weights[a], f"{at}.{a}", 0) for a in asset_returns}
+            if abs(sum(risk_alloc[int(level)].values()) - 1) > 1e-6:
+                raise ValueError(f"{at} weights must add up to 1")
+        if sorted(risk_alloc) != list(range(1, len(risk_alloc) + 1)):
+            raise ValueError("retirement.risk_allocation levels must be numbered 1, 2, 3, ...")
+
+        max_equity = {}
+        for level, cap in _table(retirement, "max_equity", "retirement").items():
+            if not level.isdigit():
+                raise ValueError(f"retirement.max_equity.{level} must be a risk level number")
+            max_equity[int(level)] = _number(cap, f"retirement.max_equity.{level}", 0)
+            if max_equity[int(level)] > 1:
+                raise ValueError(f"retirement.max_equity.{level} must be at most 1")
+        if set(max_equity) != set(risk_alloc):
+            raise ValueError("retirement.max_equity needs a cap for every risk_allocation level")
+
+        life = _table(raw, "life_insurance", "")
+        health = _table(raw, "health_insurance", "")
+        premiums = _table(raw, "premiums", "")
+        value = lambda row, at: _number(row.get("value"), f"{at}.value", 0)
+
+        insurance = InsuranceRules(
+            life_income_multiplier=_bands(life, "income_multiplier", "life_insurance", value),
+            health_base_cover=_bands(health, "base_cover", "health_insurance", value),
+            health_family_buffer=_bands(health, "family_buffer", "health_insurance", value),
+            city_tier_cover=_amounts(health, "city_tier", "health_insurance", minimum=0),
+            lifestyle_cover=_amounts(health, "lifestyle", "health_insurance", minimum=0),
+            premium_cover_unit=_number(premiums.get("cover_unit"), "premiums.cover_unit", 1),
+            life_premium_rates=_bands(premiums, "life", "premiums", _premium_range),
+            health_premium_rates=_bands(premiums, "health", "premiums", _premium_range),
+            income_growth=_number(life.get("income_growth"), "life_insurance.income_growth", -0.99),
+            medical_inflation=_number(health.get("medical_inflation"),
+                                      "health_insurance.medical_inflation", -0.99),
+        )
+
+        return Assumptions(
+            inflation=_number(retirement.get("inflation"), "retirement.inflation", -0.99),
+            post_ret_return=_number(retirement.get("post_retirement_return"),
+                                    "retirement.post_retirement_return", -0.99),
+            max_sip_growth=_number(retirement.get("max_sip_growth"), "retirement.max_sip_growth", 0),
+            asset_returns=asset_returns,
+            volatility=volatility,
+            risk_alloc=risk_alloc,
+            max_equity=dict(sorted(max_equity.items())),
+            insurance=insurance,
+            fingerprints={name: _section_fingerprint(raw, keys) for name, keys in SECTIONS.items()},
+            path=path,
+            mtime_ns=mtime_ns,
+        )
+    except ValueError as exc:
+        raise ValueError(f"{path}: {exc}") from exc
+
+
+# ============================================================
+# CURRENT ASSUMPTIONS + HOT RELOAD
+# ============================================================
+
+_current = load_assumptions()
+_lock = threading.Lock()
+# Why the file on disk is not in use, while the last good assumptions are
+_load_error = None
+
+
+def current_assumptions() -> Assumptions:
+    return _current
+
+
+def refresh_assumptions() -> Assumptions:
+    # Reloads the file if its mtime changed since it was last read. Call once
+    # per page run or request, not per engine call. While the file is missing
+    # or fails to parse or validate (e.g. half-saved), the last good
+    # assumptions stay in use with a warning, and load_error() says why.
+    global _current, _load_error
+    try:
+        if ASSUMPTIONS_PATH.stat().st_mtime_ns != _current.mtime_ns:
+            with _lock:
+                if ASSUMPTIONS_PATH.stat().st_mtime_ns != _current.mtime_ns:
+                    _current = load_assumptions(ASSUMPTIONS_PATH)
+        _load_error = None
+    except (OSError, ValueError) as exc:
+        _load_error = str(exc)
+        warnings.warn(f"Keeping the last good assumptions: {exc}", RuntimeWarning, stacklevel=2)
+    return _current
+
+
+def load_error() -> Optional[str]:
+    return _load_error
+
+
+def resolve(**values):
+    # Fills each None with the current assumption of the same name, e.g.
+    # inflation, risk_alloc = resolve(inflation=inflation, risk_alloc=risk_alloc)
+    current = _current
+    resolved = tuple(getattr(current, k) if v is None else v for k, v in values.items())
+    return resolved[0] if len(resolved) == 1 else resolved
+
+
+# ============================================================
+# ASSUMPTION TEXT FOR THE PAGES
+# ============================================================
+
+def format_inr(amount: float) -> str:
+    # Indian digit grouping: 1500000 -> ₹15,00,000
+    whole = str(int(round(amount)))
+    head, tail = whole[:-3], whole[-3:]
+    groups = []
+    while len(head) > 2:
+        head, groups = head[:-2], [head[-2:]] + groups
+    return "₹" + ",".join(([head] if head else []) + groups + [tail])
+
+
+def _format_unit(amount: float) -> str:
+    if amount >= 1e7 and amount % 1e7 == 0:
+        return f"₹{amount / 1e7:g} Cr"
+    if amount >= 1e5 and amount % 1e5 == 0:
+        return f"₹{amount / 1e5:g}L"
+    return format_inr(amount)
+
+
+def band_labels(bands, unit: str, minimum: int = None) -> list:
+    # Labels for integer-valued bands, e.g. "Below 30 years", "30–45 years",
+    # "Above 45 years"; counts starting at `minimum` read "3 or more dependents"
+    labels = []
+    lower = minimum
+    for i, band in enumerate(bands):
+        if band.upper is None:
+            if minimum is not None or i == 0:
+                labels.append(f"{lower or 0:g} or more {unit}")
+            elif bands[i - 1].inclusive:
+                labels.append(f"Above {bands[i - 1].upper:g} {unit}")
+            else:
+                labels.append(f"{lower:g} {unit} and above")
+            break
+        upper = band.upper if band.inclusive else band.upper - 1
+        if lower is None:
+            labels.append(f"Below {band.upper:g} {unit}" if not band.inclusive
+                          else f"Up to {band.upper:g} {unit}")
+        elif lower == upper:
+            labels.append(f"{lower:g} {unit}")
+        else:
+            labels.append(f"{lower:g}–{upper:g} {unit}")
+        lower = upper + 1
+    return labels
+
+
+def describe_retirement(a: Assumptions, life_expectancy: int = 90) -> str:
+    assets = "\n".join(f"- {name}: **{r:.0%}**" for name, r in a.asset_returns.items())
+    return f"""
+**Inflation** - {a.inflation:.0%} per year
+
+**Post-retirement returns** - Portfolio-based, or {a.post_ret_return:.0%} with FD lock-in
+
+**Life expectancy** - {life_expectancy} years
+
+**Yearly SIP step-up in a catch-up plan** - up to {a.max_sip_growth:.0%}
+
+**Asset return assumptions (annual)**
+{assets}
+"""
+
+
+def describe_insurance(rules: InsuranceRules) -> str:
+    def rows(labels, items):
+        return "\n".join(f"  – {label}: {item}" for label, item in zip(labels, items))
+
+    multipliers = rows(band_labels(rules.life_income_multiplier.bands, "dependents", minimum=0),
+                       [f"{v:g}× annual income" for v in rules.life_income_multiplier.values])
+    base = rows(band_labels(rules.health_base_cover.bands, "years"),
+                [format_inr(v) for v in rules.health_base_cover.values])
+    family = rows(band_labels(rules.health_family_buffer.bands, "dependents", minimum=0),
+                  [f"+{format_inr(v)}" for v in rules.health_family_buffer.values])
+    cities = rows([tier.replace("_", "-") for tier in rules.city_tier_cover],
+                  [f"+{format_inr(v)}" for v in rules.city_tier_cover.values()])
+    lifestyle = rows([risk.replace("_", " ").capitalize() for risk in rules.lifestyle_cover],
+                     [f"+{format_inr(v)}" for v in rules.lifestyle_cover.values()])
+    unit = _format_unit(rules.premium_cover_unit)
+    life_rates = rows(band_labels(rules.life_premium_rates.bands, "years"),
+                      [f"{format_inr(lo)} – {format_inr(hi)}" for lo, hi in
+                       rules.life_premium_rates.values])
+    health_rates = rows(band_labels(rules.health_premium_rates.bands, "years"),
+                        [f"{format_inr(lo)} – {format_inr(hi)}" for lo, hi in
+                         rules.health_premium_rates.values])
+
+    return f"""
+LIFE INSURANCE ASSUMPTIONS
+• Life insurance need is calculated using an income replacement approach.
+• Recommended cover is based on annual income and number of dependents.
+• Income multipliers used:
+{multipliers}
+• Existing life insurance is fully deducted before calculating any gap.
+
+HEALTH INSURANCE ASSUMPTIONS
+• Health insurance need increases with age due to rising medical risk.
+• Base health cover by age:
+{base}
+• Family buffer by number of dependents:
+{family}
+• City-level healthcare cost adjustment:
+{cities}
+  – Other locations: +₹0
+
+LIFESTYLE RISK ASSUMPTIONS (OPTIONAL)
+• Lifestyle inputs are optional and self-declared.
+• Only high-level risk indicators are used.
+• Risk buffers applied:
+{lifestyle}
+• No medical diagnosis or health profiling is performed.
+
+INSURANCE GAP LOGIC
+• Insurance gap = Required cover − Existing cover.
+• If gap ≤ 0, coverage is marked as Adequate.
+• If gap > 0, coverage is marked as Underinsured.
+
+PREMIUM ESTIMATION ASSUMPTIONS
+• Premiums shown are indicative yearly ranges, not policy quotes.
+• Life insurance premium rates (per {unit} cover per year):
+{life_rates}
+• Health insurance premium rates (per {unit} cover per year):
+{health_rates}
+• Premiums are calculated only on the uncovered gap.
+
+COVERAGE OVER TIME
+• Income grows {rules.income_growth:.0%} per year until retirement.
+• Health cover needs grow with medical inflation of {rules.medical_inflation:.0%} per year.
+• Age bands, dependants and premium rates are applied year by year.
+• Existing cover is held at today's amount.
+
+DISCLAIMER
+• This tool is for educational and planning purposes only.
+• Actual insurance needs and premiums may vary by insurer and individual profile.
+"""
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from assumptions import current_assumptions, resolve
+
+# Bundled synthetic sample so backtests run offline; see the file header
+SAMPLE_RETURNS = Path(__file__).parent / "data" / "sample_annual_returns.csv"
+
+
+@dataclass
+class BacktestResult:
+    windows: pd.DataFrame
+    failure_rate: float
+    worst_ending_corpus: float
+    median_ending_corpus: float
+    worst_start_year: int
+
+
+def load_annual_returns(path=SAMPLE_RETURNS) -> pd.DataFrame:
+    # CSV with a Year column and one column of decimal annual returns per
+    # asset class in the asset return assumptions. Lines starting with '#'
+    # are ignored.
+    assets = list(current_assumptions().asset_returns)
+    returns = pd.read_csv(path, comment="#", index_col="Year").sort_index()
+    missing = set(assets) - set(returns.columns)
+    if missing:
+        raise ValueError(f"Returns file is missing asset classes: {', '.join(sorted(missing))}")
+    if returns[assets].isna().any().any():
+        raise ValueError("Returns file has gaps; every year needs a return for every asset class")
+    return returns
+
+
+def rolling_withdrawal_backtest(returns: pd.DataFrame, corpus: float,
+                                first_withdrawal: float, retirement_years: int,
+                                risk: int, *, inflation: float = None,
+                                risk_alloc: dict = None) -> BacktestResult:
+    # Replays the withdrawal phase over every run of retirement_years
+    # consecutive historical years. The portfolio is rebalanced to
+    # risk_alloc[risk] each year; withdrawals are taken at year end and grow
+    # with inflation. All windows are evaluated at once on a
+    # (windows x years) view of the portfolio return series.
+    inflation, risk_alloc = resolve(inflation=inflation, risk_alloc=risk_alloc)
+    if retirement_years <= 0:
+        raise ValueError("retirement_years must be positive")
+    if retirement_years > len(returns):
+        raise ValueError(
+            f"Need at least {retirement_years} years of returns, file has {len(returns)}"
+        )
+
+    weights = pd.Series(risk_alloc[risk])
+    portfolio = returns[weights.index].to_numpy() @ weights.to_numpy()
+
+    windows = sliding_window_view(portfolio, retirement_years)
+    withdrawals = first_withdrawal * (1 + inflation) ** np.arange(retirement_years)
+
+    growth = np.cumprod(1 + windows, axis=1)
+    balances = growth * (corpus - np.cumsum(withdrawals / growth, axis=1))
+
+    failed = (balances < 0).any(axis=1)
+    years_funded = np.where(failed, np.argmax(balances < 0, axis=1), retirement_years)
+    ending = np.where(failed, 0.0, balances[:, -1])
+
+    # Worst window: runs dry soonest, then the one ending with the least
+    worst = np.lexsort((ending, years_funded))[0]
+
+    start_years = returns.index.to_numpy()[:len(windows)]
+    table = pd.DataFrame({
+        "Start year": start_years,
+        "Ending corpus": ending,
+        "Failed": failed,
+        "Years funded": years_funded,
+    })
+
+    return BacktestResult(
+        windows=table,
+        failure_rate=float(failed.mean()),
+        worst_ending_corpus=float(ending.min()),
+        median_ending_corpus=float(np.median(ending)),
+        worst_start_year=int(start_years[worst]),
+    )
@@ -0,0 +1,330 @@
+"""Run retirement and insurance plans over a client book, without Streamlit.
+
+    python -m batch_cli clients.csv plans.parquet --chunk-size 50000 --workers 4
+    python -m batch_cli clients.csv plans.parquet --outlay-report outlay.csv
+
+Input and output may be .csv or .parquet. The input is read and processed
+in chunks, and each chunk's results are appended to the output as soon as
+it is done, in input order. Either column group below may be left out, but
+a group that is present must be complete:
+
+    retirement: current_age, retirement_age, monthly_expense, current_savings,
+                risk [, fd_lockin]
+    insurance:  current_age, annual_income, dependents, existing_life_cover,
+                existing_health_cover, city_tier [, lifestyle_risks]
+
+lifestyle_risks is a ';'-separated list such as "smoking;sedentary";
+fd_lockin is true/false, yes/no or 1/0, and empty means false. Ages, risk
+and dependents must be whole numbers.
+Rows with missing, non-numeric or out-of-range inputs are still written,
+with empty results for the affected group and the reason in `error`. The
+output is written to a temporary file and renamed only when the run succeeds.
+--outlay-report also writes total and percentile premium outlay by age band
+and city tier, accumulated chunk by chunk; it needs the insurance columns.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from insurance_batch import (
+    estimate_health_premium_batch,
+    estimate_life_premium_batch,
+    insurance_gap_batch,
+    lifestyle_flags,
+)
+from assumptions import current_assumptions
+from premium_outlay import PremiumOutlay
+from retirement_batch import retirement_plan_batch
+
+LIFE_EXPECTANCY = 90
+
+RETIREMENT_COLUMNS = ["current_age", "retirement_age", "monthly_expense", "current_savings", "risk"]
+INSURANCE_COLUMNS = ["current_age", "annual_income", "dependents", "existing_life_cover",
+                     "existing_health_cover", "city_tier"]
+
+
+# ============================================================
+# CHUNK ENGINE
+# ============================================================
+
+def _has_group(columns, group: list, name: str) -> bool:
+    specific = [c for c in group if c != "current_age"]
+    present = [c for c in specific if c in columns]
+    if not present:
+        return False
+    missing = [c for c in group if c not in columns]
+    if missing:
+        raise ValueError(f"Input has some {name} columns but is missing: {', '.join(missing)}")
+    return True
+
+
+def _lifestyle(value):
+    # Accepts "smoking;sedentary" from files or a list from JSON
+    if isinstance(value, (list, tuple)):
+        return list(value) or None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return [v.strip() for v in value.split(";") if v.strip()]
+
+
+_FLAGS = {"true": True, "false": False, "yes": True, "no": False, "1": True, "0": False,
+          "1.0": True, "0.0": False}
+
+
+def _flag(column: pd.Series) -> tuple:
+    # (values, bad row mask). Empty cells are False; anything not in _FLAGS
+    # is bad rather than being read as truthy.
+    text = column.astype("string").str.strip().str.lower()
+    value = text.map(_FLAGS)
+    bad = value.isna() & text.notna() & (text != "")
+    return value.fillna(False).astype(bool).to_numpy(), bad.to_numpy()
+
+
+def _fractional(*columns) -> np.ndarray:
+    # Rows where any of the columns is not a whole number
+    return np.column_stack([np.mod(c, 1) != 0 for c in columns]).any(axis=1)
+
+
+def _first_error(checks: list) -> np.ndarray:
+    # checks is [(bad row mask, message)]; each row gets the first message
+    # that applies to it, or "" if none does
+    return np.select([bad for bad, _ in checks], [message for _, message in checks],
+                     default="").astype(object)
+
+
+def _results(out: pd.DataFrame, ok: np.ndarray, columns: dict):
+    # Nullable integer columns, empty for rows that were not planned
+    for name, values in columns.items():
+        column = pd.Series(pd.NA, index=out.index, dtype="Int64")
+        column[ok] = np.round(values).astype(np.int64)
+        out[name] = column
+
+
+def _plan_retirement(out: pd.DataFrame, compounding: str) -> np.ndarray:
+    # Appends the retirement results and returns each row's error ("" if none)
+    num = {c: pd.to_numeric(out[c], errors="coerce").to_numpy(float) for c in RETIREMENT_COLUMNS}
+    age, retirement_age = num["current_age"], num["retirement_age"]
+    fd_lockin, bad_flag = _flag(out["fd_lockin"]) if "fd_lockin" in out else (
+        np.zeros(len(out), dtype=bool), np.zeros(len(out), dtype=bool))
+    errors = _first_error([
+        (np.isnan(np.column_stack(list(num.values()))).any(axis=1),
+         "missing or non-numeric retirement input"),
+        (_fractional(age, retirement_age, num["risk"]),
+         "current_age, retirement_age and risk must be whole numbers"),
+        (bad_flag, "fd_lockin must be true/false, yes/no or 1/0"),
+        (age < 0, "current_age must not be negative"),
+        (retirement_age < age, "retirement_age must not be below current_age"),
+        (retirement_age > LIFE_EXPECTANCY, f"retirement_age must not be above {LIFE_EXPECTANCY}"),
+        ((num["monthly_expense"] < 0) | (num["current_savings"] < 0),
+         "monthly_expense and current_savings must not be negative"),
+        (~np.isin(num["risk"], list(current_assumptions().risk_alloc)),
+         f"risk must be one of {', '.join(map(str, current_assumptions().risk_alloc))}"),
+    ])
+
+    ok = errors == ""
+    plan = retirement_plan_batch(
+        num["monthly_expense"][ok],
+        (retirement_age - age)[ok].astype(np.int64),
+        (LIFE_EXPECTANCY - retirement_age)[ok].astype(np.int64),
+        num["risk"][ok].astype(np.int64),
+        num["current_savings"][ok],
+        fd_lockin=fd_lockin[ok],
+        compounding=compounding,
+    )
+
+    # NaN SIP: a shortfall with no years left to invest
+    unsolvable = np.isnan(plan["required_sip"])
+    errors[np.flatnonzero(ok)[unsolvable]] = \
+        "A shortfall cannot be closed with no years left to invest"
+    solved = errors == ""
+    _results(out, solved, {name: plan[name][~unsolvable] for name in
+                           ("required_corpus", "required_sip", "min_start_sip")})
+    return errors
+
+
+def _plan_insurance(out: pd.DataFrame) -> np.ndarray:
+    # Appends the insurance results and returns each row's error ("" if none)
+    numeric = [c for c in INSURANCE_COLUMNS if c != "city_tier"]
+    num = {c: pd.to_numeric(out[c], errors="coerce").to_numpy(float) for c in numeric}
+    values = np.column_stack(list(num.values()))
+    errors = _first_error([
+        (np.isnan(values).any(axis=1), "missing or non-numeric insurance input"),
+        (_fractional(num["current_age"], num["dependents"]),
+         "current_age and dependents must be whole numbers"),
+        ((values < 0).any(axis=1), "insurance inputs must not be negative"),
+    ])
+
+    ok = errors == ""
+    age = num["current_age"][ok].astype(np.int64)
+    lifestyle = None
+    if "lifestyle_risks" in out:
+        lifestyle = lifestyle_flags([_lifestyle(risks) for risks in out["lifestyle_risks"][ok]])
+    gap = insurance_gap_batch(
+        age,
+        num["annual_income"][ok],
+        num["dependents"][ok].astype(np.int64),
+        num["existing_life_cover"][ok],
+        num["existing_health_cover"][ok],
+        out["city_tier"].to_numpy(object)[ok],
+        lifestyle,
+    )
+    life_low, life_high = estimate_life_premium_batch(gap["life_gap"], age)
+    health_low, health_high = estimate_health_premium_batch(gap["health_gap"], age)
+    _results(out, ok, {
+        **{column: gap[column] for column in
+           ("required_life_cover", "required_health_cover", "life_gap", "health_gap")},
+        "life_premium_low": life_low,
+        "life_premium_high": life_high,
+        "health_premium_low": health_low,
+        "health_premium_high": health_high,
+    })
+    return errors
+
+
+def plan_chunk(chunk: pd.DataFrame, compounding: str = "annual") -> pd.DataFrame:
+    # Input columns are passed through; result columns are appended. Rows
+    # that cannot be planned get empty results and a reason in "error".
+    retirement = _has_group(chunk.columns, RETIREMENT_COLUMNS, "retirement")
+    insurance = _has_group(chunk.columns, INSURANCE_COLUMNS, "insurance")
+    if not (retirement or insurance):
+        raise ValueError("Input needs the retirement columns, the insurance columns, or both")
+
+    out = chunk.reset_index(drop=True)
+    errors = []
+    if retirement:
+        errors.append(_plan_retirement(out, compounding))
+    if insurance:
+        errors.append(_plan_insurance(out))
+
+    error = pd.Series(["; ".join(e for e in row if e) for row in zip(*errors)],
+                      index=out.index, dtype="string")
+    out["error"] = error.mask(error == "")
+    return out
+
+
+# ============================================================
+# STREAMING I/O
+# ============================================================
+
+def read_chunks(path, chunk_size: int):
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported input format {suffix!r}; use .csv or .parquet")
+
+
+class ChunkWriter:
+    # Appends DataFrames to a .csv or .parquet file. Parquet chunks are cast
+    # to the first chunk's schema so the file stays readable as one table.
+    # Chunks go to a temporary file next to `path`, which replaces `path`
+    # only when the with block exits without an error.
+    def __init__(self, path):
+        self.path = Path(path)
+        self.suffix = self.path.suffix.lower()
+        if self.suffix not in (".csv", ".parquet"):
+            raise ValueError(f"Unsupported output format {self.suffix!r}; use .csv or .parquet")
+        self.partial = self.path.with_name(f".{self.path.stem}.partial{self.path.suffix}")
+        self._parquet = None
+        self._started = False
+
+    def write(self, df: pd.DataFrame):
+        if self.suffix == ".csv":
+            df.to_csv(self.partial, mode="a" if self._started else "w",
+                      header=not self._started, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._parquet is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self._parquet = pq.ParquetWriter(self.partial, table.schema)
+            else:
+                table = pa.Table.from_pandas(df, schema=self._parquet.schema, preserve_index=False)
+            self._parquet.write_table(table)
+        self._started = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        if exc_type is None and self._started:
+            os.replace(self.partial, self.path)
+        else:
+            self.partial.unlink(missing_ok=True)
+
+
+def run(input_path, output_path, *, chunk_size: int = 50_000, workers: int = 1,
+        compounding: str = "annual", outlay: PremiumOutlay = None) -> int:
+    # Returns the number of rows written. With workers > 1 at most
+    # 2 * workers chunks are in flight, so memory stays bounded on large books.
+    # Each written chunk is also added to `outlay`, if given.
+    rows = 0
+    with ChunkWriter(output_path) as writer:
+        def write(result):
+            nonlocal rows
+            writer.write(result)
+            if outlay is not None:
+                outlay.add(result)
+            rows += len(result)
+
+        if workers <= 1:
+            for chunk in read_chunks(input_path, chunk_size):
+                write(plan_chunk(chunk, compounding))
+            return rows
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in read_chunks(input_path, chunk_size):
+                pending.append(pool.submit(plan_chunk, chunk, compounding))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="client profiles, .csv or .parquet")
+    parser.add_argument("output", help="results file, .csv or .parquet")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--compounding", choices=["annual", "monthly"], default="annual")
+    parser.add_argument("--outlay-report", metavar="PATH",
+                        help="also write premium outlay by age band and city tier as .csv")
+    args = parser.parse_args(argv)
+
+    outlay = PremiumOutlay() if args.outlay_report else None
+    start = time.perf_counter()
+    try:
+        rows = run(args.input, args.output, chunk_size=args.chunk_size,
+                   workers=args.workers, compounding=args.compounding, outlay=outlay)
+        if outlay is not None:
+            outlay.result().to_csv(args.outlay_report, index=False)
+    except (ValueError, ImportError) as exc:
+        parser.exit(1, f"error: {exc}\n")
+    elapsed = time.perf_counter() - start
+
+    print(f"{rows:,} rows in {elapsed:.2f} s ({rows / elapsed:,.0f} rows/s) "
+          f"-> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Scalar vs batch retirement engines on a synthetic client book.
+
+    python -m benchmarks.batch_speedup --profiles 100000 --scalar-sample 2000
+
+The scalar engines take minutes at 1e5 profiles, so they are timed on a
+random sample and the per-profile cost is scaled up to the full book.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from assumptions import current_assumptions
+from retirement_engine import (
+    portfolio_return,
+    required_corpus_portfolio,
+    required_monthly_sip,
+    min_start_sip_for_overshoot,
+)
+from retirement_batch import retirement_plan_batch
+
+
+def synthetic_profiles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    current_age = rng.integers(22, 56, n)
+    retirement_age = np.minimum(current_age + rng.integers(5, 40, n), 75)
+    return {
+        "monthly_expense_today": rng.integers(20, 300, n) * 1000.0,
+        "years_to_ret": retirement_age - current_age,
+        "retirement_years": 90 - retirement_age,
+        "risk": rng.integers(1, 6, n),
+        "current_savings": rng.integers(0, 200, n) * 50_000.0,
+    }
+
+
+def scalar_plan(monthly_expense_today, years_to_ret, retirement_years, risk, current_savings):
+    required = required_corpus_portfolio(monthly_expense_today, years_to_ret, retirement_years, risk)
+    sip = required_monthly_sip(required, current_savings, years_to_ret, portfolio_return(risk))
+    min_start_sip_for_overshoot(sip, years_to_ret, current_assumptions().max_sip_growth)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--scalar-sample", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    profiles = synthetic_profiles(args.profiles, args.seed)
+
+    start = time.perf_counter()
+    retirement_plan_batch(**profiles)
+    batch_s = time.perf_counter() - start
+
+    sample = min(args.scalar_sample, args.profiles)
+    start = time.perf_counter()
+    for i in range(sample):
+        scalar_plan(*(int(v[i]) if v.dtype.kind == "i" else float(v[i])
+                      for v in profiles.values()))
+    scalar_s = (time.perf_counter() - start) / sample * args.profiles
+
+    print(f"profiles          {args.profiles:,}")
+    print(f"batch             {batch_s:8.2f} s")
+    print(f"scalar (scaled)   {scalar_s:8.2f} s  (timed on {sample:,} profiles)")
+    print(f"speedup           {scalar_s / batch_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
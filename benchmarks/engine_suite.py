@@ -0,0 +1,251 @@
+"""Timing and memory regression suite for the engines.
+
+    python -m benchmarks.engine_suite                  # compare with baseline
+    python -m benchmarks.engine_suite --save           # record a new baseline
+
+Reports each case's median time per call and peak memory, and exits with
+status 1 when a case is slower than --threshold x its machine-specific baseline.
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from allocation_optimizer import optimize_allocation
+from benchmarks.batch_speedup import synthetic_profiles
+from health_insurance import calculate_required_health_cover
+from insurance_batch import insurance_gap_batch
+from insurance_inputs import InsuranceInputs
+from premium_estimator import estimate_health_premium
+from premium_outlay import PremiumOutlay
+from retirement_batch import retirement_plan_batch, sensitivity_grid
+from retirement_engine import portfolio_return, required_corpus_portfolio, required_monthly_sip
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+AGES = {"young": 25, "old": 50}
+HORIZONS = {"short": 5, "long": 30}
+RISKS = range(1, 6)
+BOOK_SIZE = 100_000
+
+
+# ============================================================
+# CASES
+# ============================================================
+# Each case builds its inputs once and returns (run, calls): run() does
+# `calls` engine calls, so timings can be reported per call.
+
+def _retirement_grid():
+    return [
+        (50_000.0, horizon, 90 - age - horizon, risk, 500_000.0)
+        for age, horizon, risk in itertools.product(AGES.values(), HORIZONS.values(), RISKS)
+    ]
+
+
+def corpus_scalar():
+    grid = _retirement_grid()
+
+    def run():
+        for expense, years, retired, risk, _ in grid:
+            required_corpus_portfolio(expense, years, retired, risk)
+    return run, len(grid)
+
+
+def sip_scalar():
+    grid = [
+        (required_corpus_portfolio(expense, years, retired, risk), savings, years,
+         portfolio_return(risk))
+        for expense, years, retired, risk, savings in _retirement_grid()
+    ]
+
+    def run():
+        for required, savings, years, r in grid:
+            required_monthly_sip(required, savings, years, r)
+            required_monthly_sip(required, savings, years, r, compounding="monthly", step_up=0.1)
+    return run, 2 * len(grid)
+
+
+def _insurance_grid():
+    lifestyles = [None, ["smoking"], ["sedentary", "high_stress"]]
+    return [
+        InsuranceInputs(age, 1_200_000, dependents, 0, 500_000, tier, lifestyle)
+        for age, dependents, tier, lifestyle in itertools.product(
+            (25, 40, 55), (0, 2), ("Tier_1", "Tier_2", "Tier_3"), lifestyles)
+    ]
+
+
+def health_cover_scalar():
+    grid = _insurance_grid()
+
+    def run():
+        for inputs in grid:
+            calculate_required_health_cover(inputs)
+    return run, len(grid)
+
+
+def health_premium_scalar():
+    grid = [(gap, age) for gap in (0, 500_000, 2_500_000) for age in (25, 30, 45, 46, 60)]
+
+    def run():
+        for gap, age in grid:
+            estimate_health_premium(gap, age)
+    return run, len(grid)
+
+
+def insurance_gap_book():
+    rng = np.random.default_rng(0)
+    book = {
+        "age": rng.integers(18, 70, BOOK_SIZE),
+        "annual_income": rng.integers(3, 60, BOOK_SIZE) * 100_000.0,
+        "dependents": rng.integers(0, 5, BOOK_SIZE),
+        "existing_life_cover": rng.integers(0, 20, BOOK_SIZE) * 500_000.0,
+        "existing_health_cover": rng.integers(0, 10, BOOK_SIZE) * 250_000.0,
+        "city_tier": np.array(["Tier_1", "Tier_2", "Tier_3"], dtype=object)[rng.integers(0, 3, BOOK_SIZE)],
+        "lifestyle": {risk: rng.random(BOOK_SIZE) < 0.2
+                      for risk in ("smoking", "sedentary", "high_stress")},
+    }
+
+    def run():
+        insurance_gap_batch(**book)
+    return run, BOOK_SIZE
+
+
+def premium_outlay_book():
+    rng = np.random.default_rng(0)
+    book = pd.DataFrame({
+        "current_age": rng.integers(18, 70, BOOK_SIZE),
+        "city_tier": np.array(["Tier_1", "Tier_2", "Tier_3"], dtype=object)[rng.integers(0, 3, BOOK_SIZE)],
+        "life_gap": rng.integers(0, 40, BOOK_SIZE) * 500_000.0,
+        "health_gap": rng.integers(0, 10, BOOK_SIZE) * 250_000.0,
+    })
+
+    def run():
+        outlay = PremiumOutlay()
+        for start in range(0, BOOK_SIZE, 50_000):
+            outlay.add(book.iloc[start:start + 50_000])
+        outlay.result()
+    return run, BOOK_SIZE
+
+
+def retirement_plan_book():
+    profiles = synthetic_profiles(BOOK_SIZE, seed=0)
+
+    def run():
+        retirement_plan_batch(**profiles)
+    return run, BOOK_SIZE
+
+
+def sensitivity_heatmap():
+    ages, expenses = range(31, 76), [40_000 + 2_000 * i for i in range(50)]
+
+    def run():
+        sensitivity_grid(30, 500_000, ages, expenses, RISKS)
+    return run, len(ages) * len(expenses) * len(RISKS)
+
+
+def allocation_optimizer():
+    def run():
+        optimize_allocation(50_000, 25, 30, 500_000, max_weights={"Equity": 0.6})
+    return run, 1
+
+
+CASES = {
+    "corpus_scalar": corpus_scalar,
+    "sip_scalar": sip_scalar,
+    "health_cover_scalar": health_cover_scalar,
+    "health_premium_scalar": health_premium_scalar,
+    "retirement_plan_book": retirement_plan_book,
+    "insurance_gap_book": insurance_gap_book,
+    "premium_outlay_book": premium_outlay_book,
+    "sensitivity_heatmap": sensitivity_heatmap,
+    "allocation_optimizer": allocation_optimizer,
+}
+
+
+# ============================================================
+# MEASUREMENT
+# ============================================================
+
+def measure(case, repeat: int = 9) -> dict:
+    run, calls = case()
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    runs = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+    median = runs[len(runs) // 2]
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "seconds_per_call": median / calls,
+        "seconds_per_run": median,
+        "best_seconds_per_run": runs[0],
+        "peak_bytes": peak,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    # Names of cases slower than threshold x baseline
+    return [
+        name for name, result in results.items()
+        if name in baseline and result["seconds_per_call"] > threshold * baseline[name]["seconds_per_call"]
+    ]
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:7.2f} {unit}"
+    return f"{seconds / 1e-9:7.1f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="fail when a case takes more than this x its baseline time")
+    parser.add_argument("--only", default="", help="run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if args.only in name]
+    baseline = json.loads(args.baseline.read_text())["cases"] if args.baseline.exists() else {}
+
+    results = {}
+    print(f"{'case':<24} {'per call':>12} {'per run':>12} {'peak mem':>10} {'vs base':>8}")
+    for name in names:
+        results[name] = result = measure(CASES[name], repeat=args.repeat)
+        base = baseline.get(name)
+        ratio = f"{result['seconds_per_call'] / base['seconds_per_call']:7.2f}x" if base else "      -"
+        print(f"{name:<24} {_format_time(result['seconds_per_call']):>12} "
+              f"{_format_time(result['seconds_per_run']):>12} "
+              f"{result['peak_bytes'] / 1024:8.0f} KB {ratio:>8}")
+
+    if args.save:
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cases": {**baseline, **results},
+        }, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    slower = compare(results, baseline, args.threshold)
+    if slower:
+        print(f"Slower than {args.threshold}x baseline: {', '.join(slower)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
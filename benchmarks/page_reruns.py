@@ -0,0 +1,233 @@
+"""Script runs, server CPU and bytes sent for one scripted session per page.
+
+    python -m benchmarks.page_reruns --app-dir /path/to/checkout
+
+Starts `streamlit run app.py` headless from --app-dir and drives each page
+over the websocket the way the browser does: values typed into a form wait
+for its submit button, widgets inside a fragment rerun only that fragment,
+everything else reruns the page. When a step needs a widget the page is no
+longer showing (results that vanished after a rerun), the calculate button
+is pressed first, as a user would. Point --app-dir at a checkout of an
+older commit to compare before and after. Server CPU is read from /proc,
+so this runs on Linux only. Needs websockets (requirements-dev.txt).
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+try:
+    import websockets
+except ImportError:
+    sys.exit("The page benchmarks need the websockets package: "
+             "pip install -r requirements-dev.txt")
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+
+# (page, calculate button, steps); a step sets a widget by label or clicks a button
+SESSIONS = [
+    ("retirement", "Calculate my retirement plan", [
+        ("set", "Current age", 35),
+        ("set", "Planned retirement age", 58),
+        ("set", "Desired monthly expense after retirement (today’s value)", 80_000),
+        ("set", "Current monthly investment", 40_000),
+        ("set", "Retirement savings accumulated so far", 1_500_000),
+        ("set", "Risk tolerance", 4),
+        ("click", "Calculate my retirement plan"),
+        ("set", "Maximum equity share", 0.6),
+        ("set", "Minimum savings / liquid share", 0.1),
+        ("click", "Add current inputs as a scenario"),
+    ]),
+    ("insurance", "Check my insurance adequacy", [
+        ("set", "Age", 40),
+        ("set", "Annual income (₹)", 1_800_000),
+        ("set", "Number of dependants", 3),
+        ("set", "Existing life insurance cover (₹)", 5_000_000),
+        ("set", "Existing health insurance cover (₹)", 500_000),
+        ("click", "Check my insurance adequacy"),
+    ]),
+]
+
+_DONE = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+
+def _server_cpu(pid):
+    # utime + stime of the server process, in seconds
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rpartition(")")[2].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class _Session:
+    def __init__(self, ws, page):
+        self.ws = ws
+        self.page = page
+        self.widgets = {}      # label -> (kind, proto, form_id, fragment_id)
+        self.committed = {}    # label -> value the server has seen
+        self.pending = {}      # form_id -> {label: value} waiting for submit
+        self.runs = {"full": 0, "fragment": 0}
+        self.bytes = 0
+        self.first_element = None   # perf_counter() when the first element arrived
+
+    def _state(self, label, value, trigger=False):
+        kind, proto, _, _ = self.widgets[label]
+        state = BackMsg().rerun_script.widget_states.widgets.add()
+        state.id = proto.id
+        if trigger:
+            state.trigger_value = True
+        elif kind == "number_input":
+            if proto.data_type == NumberInput.INT:
+                state.int_value = int(value)
+            else:
+                state.double_value = float(value)
+        elif kind == "slider":
+            state.double_array_value.data.append(float(value))
+        else:
+            raise ValueError(f"Cannot set a {kind} widget")
+        return state
+
+    async def _rerun(self, trigger=None, fragment_id=""):
+        msg = BackMsg()
+        client = msg.rerun_script
+        # By name every time; the hash in the first new_session is provisional
+        client.page_name = self.page
+        client.fragment_id = fragment_id
+        for label, value in self.committed.items():
+            if label in self.widgets:
+                client.widget_states.widgets.append(self._state(label, value))
+        if trigger is not None:
+            client.widget_states.widgets.append(self._state(trigger, None, trigger=True))
+        await self.ws.send(msg.SerializeToString())
+        if not fragment_id:
+            self.widgets = {}
+        await self._read()
+
+    async def _read(self):
+        while True:
+            data = await asyncio.wait_for(self.ws.recv(), 120)
+            self.bytes += len(data)
+            fm = ForwardMsg()
+            fm.ParseFromString(data)
+            kind = fm.WhichOneof("type")
+            if kind == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                if self.first_element is None:
+                    self.first_element = time.perf_counter()
+                element = fm.delta.new_element
+                widget = element.WhichOneof("type")
+                proto = getattr(element, widget)
+                if getattr(proto, "id", "") and getattr(proto, "label", ""):
+                    self.widgets[proto.label] = (widget, proto, getattr(proto, "form_id", ""),
+                                                 fm.delta.fragment_id)
+            elif kind == "script_finished":
+                status = fm.script_finished
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError(f"{self.page} failed to compile")
+                if status in _DONE:
+                    self.runs["fragment" if status == _DONE[1] else "full"] += 1
+                    return
+
+    async def open(self):
+        await self._rerun()
+
+    async def step(self, action, label, value=None):
+        _, proto, form_id, fragment_id = self.widgets[label]
+        if action == "set":
+            if form_id:
+                self.pending.setdefault(form_id, {})[label] = value
+                return
+            self.committed[label] = value
+            await self._rerun(fragment_id=fragment_id)
+        else:
+            # Submitting a form commits everything typed into it
+            if "FormSubmitter" in proto.id:
+                self.committed.update(self.pending.pop(form_id, {}))
+            await self._rerun(trigger=label, fragment_id=fragment_id)
+
+
+async def _drive(port, pid, page, calculate, steps):
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream",
+                                  subprotocols=["streamlit"], max_size=None) as ws:
+        session = _Session(ws, page)
+        await session.open()
+        cpu = _server_cpu(pid)
+        start = time.perf_counter()
+        for action, label, *value in steps:
+            if label not in session.widgets:
+                await session.step("click", calculate)
+            await session.step(action, label, *value)
+        return {
+            "full": session.runs["full"],
+            "fragment": session.runs["fragment"],
+            "cpu_ms": (_server_cpu(pid) - cpu) * 1000,
+            "wall_ms": (time.perf_counter() - start) * 1000,
+            "kb": session.bytes / 1024,
+        }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(app_dir, port):
+    return subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def _wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("streamlit did not start")
+
+
+async def _run(port, pid, args):
+    await _wait_ready(port)
+    results = {}
+    for page, calculate, steps in SESSIONS:
+        if args.page and page != args.page:
+            continue
+        # First session warms imports and caches; only the rest are timed
+        rounds = [await _drive(port, pid, page, calculate, steps) for _ in range(args.rounds + 1)]
+        results[page] = rounds[1:]
+
+    print(f"{os.path.abspath(args.app_dir)}, median of {args.rounds} sessions")
+    print(f"{'page':<12} {'full runs':>10} {'fragment':>9} {'CPU ms':>9} {'wall ms':>9} {'KB sent':>9}")
+    for page, rounds in results.items():
+        def median(key):
+            return sorted(r[key] for r in rounds)[len(rounds) // 2]
+        print(f"{page:<12} {median('full'):>10} {median('fragment'):>9} {median('cpu_ms'):>9.0f} "
+              f"{median('wall_ms'):>9.0f} {median('kb'):>9.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=".", help="checkout whose app.py is served")
+    parser.add_argument("--page", choices=[page for page, _, _ in SESSIONS])
+    parser.add_argument("--rounds", type=int, default=5, help="timed sessions per page")
+    args = parser.parse_args(argv)
+
+    port = _free_port()
+    server = _start_server(args.app_dir, port)
+    try:
+        asyncio.run(_run(port, server.pid, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cold-start time to first paint and per-rerun payload of each page.
+
+    python -m benchmarks.page_startup --app-dir /path/to/checkout --trials 5
+
+Every trial starts a fresh `streamlit run app.py` from --app-dir, so the
+first visit pays for the page's imports. First paint is the time from the
+rerun request to the first element arriving; ready is when the script
+finishes. A second, warm rerun with no input changes measures the bytes
+sent on every full rerun. Point --app-dir at a checkout of an older commit
+to compare before and after.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# Exits with an install hint when websockets is missing
+from benchmarks.page_reruns import _free_port, _Session, _start_server, _wait_ready, websockets
+
+# Page names as the browser sends them; "" is app.py
+PAGES = {"home": "", "retirement": "retirement", "insurance": "insurance"}
+
+
+async def _trial(port, page):
+    await _wait_ready(port)
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream",
+                                  subprotocols=["streamlit"], max_size=None) as ws:
+        session = _Session(ws, page)
+        start = time.perf_counter()
+        await session.open()
+        cold = {
+            "paint_ms": (session.first_element - start) * 1000,
+            "ready_ms": (time.perf_counter() - start) * 1000,
+        }
+        sent = session.bytes
+        start = time.perf_counter()
+        await session.open()
+        return {
+            **cold,
+            "rerun_ms": (time.perf_counter() - start) * 1000,
+            "rerun_kb": (session.bytes - sent) / 1024,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=".", help="checkout whose app.py is served")
+    parser.add_argument("--page", choices=list(PAGES))
+    parser.add_argument("--trials", type=int, default=5, help="fresh servers per page")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, page in PAGES.items():
+        if args.page and name != args.page:
+            continue
+        results[name] = []
+        for _ in range(args.trials):
+            port = _free_port()
+            server = _start_server(args.app_dir, port)
+            try:
+                results[name].append(asyncio.run(_trial(port, page)))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(f"{os.path.abspath(args.app_dir)}, median of {args.trials} cold starts")
+    print(f"{'page':<12} {'paint ms':>9} {'ready ms':>9} {'rerun ms':>9} {'rerun KB':>9}")
+    for name, trials in results.items():
+        def median(key):
+            return sorted(t[key] for t in trials)[len(trials) // 2]
+        print(f"{name:<12} {median('paint_ms'):>9.0f} {median('ready_ms'):>9.0f} "
+              f"{median('rerun_ms'):>9.0f} {median('rerun_kb'):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
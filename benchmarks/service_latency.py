@@ -0,0 +1,130 @@
+"""p50/p99 latency of the engine_server endpoints from a local client.
+
+    python -m benchmarks.service_latency --requests 500 --concurrency 8
+
+Starts engine_server on a free port in a subprocess unless --url points at
+one already running. Each client keeps one keep-alive connection open;
+Monte Carlo requests are mixed in at --mc-every so their effect on the
+fast endpoints shows up in the tail.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.batch_speedup import synthetic_profiles
+
+
+def _profiles(n, seed=0):
+    cols = synthetic_profiles(n, seed)
+    rng = np.random.default_rng(seed + 1)
+    retirement_age = 90 - cols["retirement_years"]
+    current_age = retirement_age - cols["years_to_ret"]
+    tiers = np.array(["Tier_1", "Tier_2", "Tier_3"])
+    return [
+        {
+            "current_age": int(current_age[i]),
+            "retirement_age": int(retirement_age[i]),
+            "monthly_expense": float(cols["monthly_expense_today"][i]),
+            "current_savings": float(cols["current_savings"][i]),
+            "risk": int(cols["risk"][i]),
+            "monthly_sip": 25_000.0,
+            "annual_income": int(rng.integers(3, 60)) * 100_000,
+            "dependents": int(rng.integers(0, 5)),
+            "existing_life_cover": int(rng.integers(0, 20)) * 500_000,
+            "existing_health_cover": int(rng.integers(0, 10)) * 250_000,
+            "city_tier": str(tiers[rng.integers(0, 3)]),
+        }
+        for i in range(n)
+    ]
+
+
+async def _post(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    if status != 200:
+        raise RuntimeError(f"{path} returned {status}")
+
+
+async def _client(host, port, jobs, timings):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path, payload in jobs:
+            start = time.perf_counter()
+            await _post(reader, writer, host, path, payload)
+            timings.setdefault(path, []).append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def _run(host, port, args):
+    profiles = _profiles(args.requests)
+    jobs = []
+    for i, profile in enumerate(profiles):
+        if args.mc_every and i % args.mc_every == 0:
+            jobs.append(("/monte-carlo", {**profile, "paths": args.mc_paths, "seed": i}))
+        jobs.append(("/retirement", profile))
+        jobs.append(("/insurance", profile))
+        if i % 10 == 0:
+            jobs.append(("/retirement/batch", {"profiles": profiles[i:i + args.batch_size]}))
+
+    timings = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, jobs[c::args.concurrency], timings) for c in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(jobs):,} requests in {elapsed:.2f} s, concurrency {args.concurrency}")
+    print(f"{'endpoint':<20} {'n':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for path, values in sorted(timings.items()):
+        ms = np.array(values) * 1000
+        print(f"{path:<20} {len(ms):>6} {np.percentile(ms, 50):>9.2f} {np.percentile(ms, 99):>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="running server, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--requests", type=int, default=500, help="profiles to send")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--mc-every", type=int, default=50, help="0 disables Monte Carlo")
+    parser.add_argument("--mc-paths", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        server = subprocess.Popen([sys.executable, "-m", "engine_server", "--port", "0"],
+                                  stdout=subprocess.PIPE, text=True)
+        url = urlsplit(server.stdout.readline().split()[-1])
+        host, port = url.hostname, url.port
+
+    try:
+        asyncio.run(_run(host, port, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+
+import retirement_engine
+from assumptions import current_assumptions
+from insurance_gap import calculate_insurance_gap as _calculate_insurance_gap
+
+# The LRU caches below serve engine_server; the Streamlit pages cache with
+# st.cache_data under the same size and TTL settings
+CACHE_MAXSIZE = int(os.environ.get("ENGINE_CACHE_SIZE", 1024))
+CACHE_TTL = float(os.environ["ENGINE_CACHE_TTL"]) if os.environ.get("ENGINE_CACHE_TTL") else None
+
+
+# ============================================================
+# CANONICAL KEYS
+# ============================================================
+
+def _canonical(value):
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _canonical(value.tolist())
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(v) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {"__dataclass__": type(value).__name__,
+                **_canonical(dataclasses.asdict(value))}
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+def canonical_key(*parts) -> str:
+    # Same inputs give the same key regardless of dict ordering or whether a
+    # number arrived as int, float or a NumPy scalar.
+    payload = json.dumps(_canonical(parts), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def assumptions_fingerprint(section: str = None) -> str:
+    # Content hash of the assumptions file, or of one section of it
+    # ("retirement" or "insurance"), so editing one section keeps results
+    # cached under the other.
+    return current_assumptions().fingerprint(section)
+
+
+# ============================================================
+# BOUNDED LRU WITH TTL
+# ============================================================
+
+class LRUCache:
+    def __init__(self, maxsize: int = CACHE_MAXSIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Returns (found, value)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+def memoize(maxsize: int = CACHE_MAXSIZE, ttl: float = CACHE_TTL,
+            fingerprint=assumptions_fingerprint):
+    # The key covers every bound argument, including assumption keyword
+    # arguments left at their defaults, plus fingerprint() for assumptions
+    # the function reads from module state. Cached values are shared between
+    # callers and must not be mutated.
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = LRUCache(maxsize, ttl)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = canonical_key(func.__qualname__, bound.arguments,
+                                fingerprint() if fingerprint else None)
+            found, value = cache.get(key)
+            if not found:
+                value = func(*args, **kwargs)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+# ============================================================
+# CACHED ENGINES
+# ============================================================
+
+def _retirement_fingerprint() -> str:
+    return assumptions_fingerprint("retirement")
+
+
+def _insurance_fingerprint() -> str:
+    return assumptions_fingerprint("insurance")
+
+
+required_corpus_portfolio = memoize(fingerprint=_retirement_fingerprint)(
+    retirement_engine.required_corpus_portfolio)
+required_corpus_fd_lockin = memoize(fingerprint=_retirement_fingerprint)(
+    retirement_engine.required_corpus_fd_lockin)
+# Reads no assumptions, so its entries survive any edit to the file
+required_monthly_sip = memoize(fingerprint=None)(retirement_engine.required_monthly_sip)
+catch_up_plan = memoize(fingerprint=_retirement_fingerprint)(retirement_engine.catch_up_plan)
+calculate_insurance_gap = memoize(fingerprint=_insurance_fingerprint)(_calculate_insurance_gap)
+
+CACHED_ENGINES = {
+    "required_corpus_portfolio": required_corpus_portfolio,
+    "required_corpus_fd_lockin": required_corpus_fd_lockin,
+    "required_monthly_sip": required_monthly_sip,
+    "catch_up_plan": catch_up_plan,
+    "calculate_insurance_gap": calculate_insurance_gap,
+}
+
+
+def cache_stats() -> dict:
+    return {name: func.cache.stats() for name, func in CACHED_ENGINES.items()}
+
+
+def clear_caches():
+    for func in CACHED_ENGINES.values():
+        func.cache_clear()
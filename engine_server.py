@@ -0,0 +1,347 @@
+"""Local JSON HTTP service for the retirement and insurance engines.
+
+    python -m engine_server --port 8765 --workers 2
+
+Endpoints (all POST bodies and responses are JSON):
+
+    GET  /health
+    POST /retirement          one profile   -> corpus, SIP, minimum start SIP
+    POST /retirement/batch    {"profiles": [...]}, vectorized
+    POST /insurance           one profile   -> cover gaps and premium ranges
+    POST /insurance/batch     {"profiles": [...]}
+    POST /monte-carlo         one profile + monthly_sip [, paths, seed]
+
+Profile fields are the batch_cli column names. Single-profile fields out
+of range get a 400; batch profiles that cannot be planned get null results
+and an "error" entry, as in batch_cli. Monte Carlo and the batch endpoints
+run in a process pool so the event loop keeps serving other requests
+meanwhile.
+Edits to assumptions.toml apply from the next request; /health reports the
+fingerprint of the assumptions in use, and why the file on disk is not in
+use while it is missing or broken.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+import pandas as pd
+
+from assumptions import current_assumptions, load_error, refresh_assumptions
+from batch_cli import INSURANCE_COLUMNS, LIFE_EXPECTANCY, RETIREMENT_COLUMNS, plan_chunk
+from engine_cache import (
+    calculate_insurance_gap,
+    required_corpus_fd_lockin,
+    required_corpus_portfolio,
+    required_monthly_sip,
+)
+from insurance_inputs import InsuranceInputs
+from monte_carlo import simulate_portfolio_withdrawal
+from premium_estimator import estimate_health_premium, estimate_life_premium
+from retirement_engine import min_start_sip_for_overshoot, portfolio_return
+
+MAX_BODY = 16 * 1024 * 1024
+MAX_PATHS = 100_000
+MAX_AMOUNT = 1e13      # rupees; larger amounts are rejected as input errors
+MAX_DEPENDENTS = 50
+
+log = logging.getLogger("engine_server")
+
+
+class RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================================
+# REQUEST VALIDATION
+# ============================================================
+# Single profiles are checked here, before any engine runs, so extreme
+# values come back as a 400 naming the field instead of overflowing inside
+# an engine.
+
+def _field(profile: dict, name: str, low: float, high: float, kind=float):
+    value = profile[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low:,} and {high:,}")
+    return kind(value)
+
+
+def _ages(profile: dict) -> tuple:
+    age = _field(profile, "current_age", 0, LIFE_EXPECTANCY, int)
+    retirement_age = _field(profile, "retirement_age", age, LIFE_EXPECTANCY, int)
+    return age, retirement_age
+
+
+def _risk(profile: dict) -> int:
+    levels = current_assumptions().risk_alloc
+    return _field(profile, "risk", min(levels), max(levels), int)
+
+
+# ============================================================
+# ENDPOINT HANDLERS
+# ============================================================
+
+def retirement(profile: dict) -> dict:
+    age, retirement_age = _ages(profile)
+    years_to_ret = retirement_age - age
+    retirement_years = LIFE_EXPECTANCY - retirement_age
+    risk = _risk(profile)
+    monthly_expense = _field(profile, "monthly_expense", 0, MAX_AMOUNT)
+    current_savings = _field(profile, "current_savings", 0, MAX_AMOUNT)
+    compounding = profile.get("compounding", "annual")
+
+    if profile.get("fd_lockin", False):
+        required = required_corpus_fd_lockin(monthly_expense, years_to_ret,
+                                             retirement_years, compounding=compounding)
+    else:
+        required = required_corpus_portfolio(monthly_expense, years_to_ret,
+                                             retirement_years, risk, compounding=compounding)
+    sip = required_monthly_sip(required, current_savings, years_to_ret,
+                               portfolio_return(risk), compounding=compounding)
+    return {
+        "required_corpus": round(required),
+        "required_sip": sip,
+        "min_start_sip": min_start_sip_for_overshoot(sip, years_to_ret,
+                                                     current_assumptions().max_sip_growth),
+    }
+
+
+def insurance(profile: dict) -> dict:
+    age = _field(profile, "current_age", 0, LIFE_EXPECTANCY, int)
+    gap = calculate_insurance_gap(InsuranceInputs(
+        age=age,
+        annual_income=_field(profile, "annual_income", 0, MAX_AMOUNT),
+        dependents=_field(profile, "dependents", 0, MAX_DEPENDENTS, int),
+        existing_life_cover=_field(profile, "existing_life_cover", 0, MAX_AMOUNT),
+        existing_health_cover=_field(profile, "existing_health_cover", 0, MAX_AMOUNT),
+        city_tier=profile["city_tier"],
+        lifestyle_risks=profile.get("lifestyle_risks"),
+    ))
+    life_low, life_high = estimate_life_premium(gap["life_gap"], age)
+    health_low, health_high = estimate_health_premium(gap["health_gap"], age)
+    return {
+        **gap,
+        "life_premium_low": life_low,
+        "life_premium_high": life_high,
+        "health_premium_low": health_low,
+        "health_premium_high": health_high,
+    }
+
+
+def _batch(body: dict, columns: list, result_columns: list, compounding: str = "annual") -> dict:
+    profiles = body.get("profiles")
+    if not isinstance(profiles, list) or not profiles:
+        raise ValueError("Body needs a non-empty 'profiles' list")
+    frame = pd.DataFrame(profiles)
+    missing = [c for c in columns if c not in frame]
+    if missing:
+        raise ValueError(f"Profiles are missing: {', '.join(missing)}")
+    optional = [c for c in ("fd_lockin", "lifestyle_risks") if c in frame]
+    result = plan_chunk(frame[columns + optional], compounding)
+    # Rows that could not be planned have null results and an "error"
+    return {"results": result[result_columns + ["error"]].to_dict(orient="records")}
+
+
+def retirement_batch(body: dict) -> dict:
+    return _batch(body, RETIREMENT_COLUMNS, ["required_corpus", "required_sip", "min_start_sip"],
+                  body.get("compounding", "annual"))
+
+
+def insurance_batch(body: dict) -> dict:
+    return _batch(body, INSURANCE_COLUMNS, [
+        "required_life_cover", "required_health_cover", "life_gap", "health_gap",
+        "life_premium_low", "life_premium_high", "health_premium_low", "health_premium_high",
+    ])
+
+
+def monte_carlo(profile: dict) -> dict:
+    paths = int(profile.get("paths", 10_000))
+    if not 0 < paths <= MAX_PATHS:
+        raise ValueError(f"paths must be between 1 and {MAX_PATHS:,}")
+    age, retirement_age = _ages(profile)
+    result = simulate_portfolio_withdrawal(
+        _field(profile, "monthly_expense", 0, MAX_AMOUNT),
+        retirement_age - age,
+        LIFE_EXPECTANCY - retirement_age,
+        _risk(profile),
+        _field(profile, "current_savings", 0, MAX_AMOUNT),
+        _field(profile, "monthly_sip", 0, MAX_AMOUNT),
+        paths=paths,
+        seed=int(profile.get("seed", 0)),
+    )
+    return {
+        "paths": result.paths,
+        "seed": result.seed,
+        "success_probability": result.success_probability,
+        "ending_corpus_percentiles": {str(p): v for p, v in result.ending_corpus_percentiles.items()},
+    }
+
+
+ROUTES = {
+    "/retirement": retirement,
+    "/insurance": insurance,
+}
+# Slow or large requests; parsed and run in the process pool
+POOLED_ROUTES = {
+    "/retirement/batch": retirement_batch,
+    "/insurance/batch": insurance_batch,
+    "/monte-carlo": monte_carlo,
+}
+
+
+def _call(handler, body: bytes):
+    # Pool workers are separate processes with their own copy of the assumptions
+    refresh_assumptions()
+    payload = json.loads(body or b"{}")
+    if not isinstance(payload, dict):
+        raise ValueError("Body must be a JSON object")
+    return handler(payload)
+
+
+# ============================================================
+# HTTP/1.1 OVER ASYNCIO STREAMS
+# ============================================================
+
+async def _read_request(reader):
+    # Returns (method, path, headers, body), or None when the client closed
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Bad Content-Length")
+    if length > MAX_BODY:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, target.split("?", 1)[0], headers, body
+
+
+def _response(status: HTTPStatus, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, separators=(",", ":"), default=float).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+class EngineServer:
+    def __init__(self, workers: int = 2):
+        # Forked workers would inherit open client sockets and hold connections
+        # open after the server closes them; forkserver workers start clean
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("forkserver"),
+        )
+
+    async def dispatch(self, method: str, path: str, body: bytes):
+        assumptions = refresh_assumptions()
+        if method == "GET" and path == "/health":
+            return {"status": "ok", "assumptions": assumptions.fingerprint(),
+                    "assumptions_error": load_error()}
+        handler = ROUTES.get(path) or POOLED_ROUTES.get(path)
+        if handler is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No endpoint {path}")
+        if method != "POST":
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{path} only accepts POST")
+
+        try:
+            if path in POOLED_ROUTES:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.pool, _call, handler, body)
+            return _call(handler, body)
+        except KeyError as exc:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Missing field {exc.args[0]!r}")
+        except (ValueError, TypeError) as exc:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(exc))
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, payload = HTTPStatus.OK, await self.dispatch(method, path, body)
+                except RequestError as exc:
+                    keep_alive = False
+                    status, payload = exc.status, {"error": str(exc)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception:
+                    # A bug in an engine must still get the client a response
+                    log.exception("Unhandled error serving a request")
+                    keep_alive = False
+                    status, payload = (HTTPStatus.INTERNAL_SERVER_ERROR,
+                                       {"error": "Internal server error"})
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port)
+        bound = server.sockets[0].getsockname()[1]
+        print(f"Serving on http://{host}:{bound}", flush=True)
+
+        # Stop on SIGTERM as well as Ctrl+C so the pool workers get shut down
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(sig, stop.set)
+        async with server:
+            await stop.wait()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    parser.add_argument("--workers", type=int, default=2, help="Monte Carlo and batch processes")
+    args = parser.parse_args(argv)
+
+    server = EngineServer(args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,24 @@
+from assumptions import InsuranceRules, current_assumptions
 from insurance_inputs import InsuranceInputs
 
-def calculate_required_health_cover(inputs: InsuranceInputs) -> float:
+def calculate_required_health_cover(inputs: InsuranceInputs,
+                                    rules: InsuranceRules = None) -> float:
+    rules = rules or current_assumptions().insurance
     age = inputs.age
     dependents = inputs.dependents
     city_tier = inputs.city_tier
     lifestyle = inputs.lifestyle_risks or []
 
-    if age < 30:
-        base_cover = 1000000
-    elif age <= 45:
-        base_cover = 1500000
-    else:
-        base_cover = 2500000
+    base_cover = rules.health_base_cover.lookup(age)
 
-    if dependents >= 2:
-        base_cover += 500000
+    base_cover += rules.health_family_buffer.lookup(dependents)
 
-    if city_tier == "Tier_1":
-        base_cover += 500000
-    elif city_tier == "Tier_2":
-        base_cover += 250000
-    else:
-        base_cover += 0
-    
+    # Tiers not in the assumptions add nothing
+    base_cover += rules.city_tier_cover.get(city_tier, 0)
 
-    if "smoking" in lifestyle:
-        base_cover += 500000
-    if "sedentary" in lifestyle:
-        base_cover += 250000
-    if "high_stress" in lifestyle:
-        base_cover += 250000
+    # Each declared risk counts once
+    for risk, buffer in rules.lifestyle_cover.items():
+        if risk in lifestyle:
+            base_cover += buffer
 
     return base_cover
@@ -0,0 +1,101 @@
+import numpy as np
+
+from assumptions import BandTable, InsuranceRules, current_assumptions
+
+
+# ============================================================
+# BATCH INSURANCE ENGINES — ONE ELEMENT PER CUSTOMER
+# ============================================================
+# Every function here mirrors the scalar version in life_insurance,
+# health_insurance, insurance_gap and premium_estimator and matches it
+# element-wise. Inputs are columns (arrays or Series of equal length);
+# lifestyle risks are boolean flag columns keyed by risk name. Banded rules are looked up with one
+# searchsorted per table. Rules left as None come from the current
+# assumptions.
+
+def lifestyle_flags(lifestyle_risks, rules: InsuranceRules = None) -> dict:
+    # Per-customer risk lists (None for none) -> one flag column per risk the
+    # rules know; other names are ignored, as in the scalar engine
+    rules = rules or current_assumptions().insurance
+    lifestyle_risks = [risks or () for risks in lifestyle_risks]
+    return {
+        risk: np.array([risk in risks for risks in lifestyle_risks], dtype=bool)
+        for risk in rules.lifestyle_cover
+    }
+
+
+def required_life_cover_batch(annual_income, dependents, *,
+                              rules: InsuranceRules = None) -> np.ndarray:
+    rules = rules or current_assumptions().insurance
+    multiplier = rules.life_income_multiplier.lookup_batch(dependents)
+    return np.asarray(annual_income, dtype=float) * multiplier
+
+
+def required_health_cover_batch(age, dependents, city_tier, lifestyle: dict = None, *,
+                                rules: InsuranceRules = None) -> np.ndarray:
+    rules = rules or current_assumptions().insurance
+    lifestyle = lifestyle or {}
+    city_tier = np.asarray(city_tier, dtype=object)
+
+    cover = rules.health_base_cover.lookup_batch(age)
+    cover += rules.health_family_buffer.lookup_batch(dependents)
+
+    # Tiers not in the assumptions add nothing
+    cover += np.select([city_tier == tier for tier in rules.city_tier_cover],
+                       list(rules.city_tier_cover.values()), default=0)
+
+    for risk, buffer in rules.lifestyle_cover.items():
+        if risk in lifestyle:
+            cover += np.where(np.asarray(lifestyle[risk], dtype=bool), buffer, 0)
+    return cover
+
+
+def insurance_gap_batch(age, annual_income, dependents, existing_life_cover,
+                        existing_health_cover, city_tier, lifestyle: dict = None, *,
+                        rules: InsuranceRules = None) -> dict:
+    # Same keys as calculate_insurance_gap, each an array over customers
+    rules = rules or current_assumptions().insurance
+    existing_life_cover = np.asarray(existing_life_cover, dtype=float)
+    existing_health_cover = np.asarray(existing_health_cover, dtype=float)
+
+    required_life = required_life_cover_batch(annual_income, dependents, rules=rules)
+    required_health = required_health_cover_batch(age, dependents, city_tier, lifestyle,
+                                                  rules=rules)
+
+    # Gap calculation (never negative)
+    life_gap = np.maximum(0, required_life - existing_life_cover)
+    health_gap = np.maximum(0, required_health - existing_health_cover)
+
+    return {
+        "required_life_cover": required_life,
+        "required_health_cover": required_health,
+        "existing_life_cover": existing_life_cover,
+        "existing_health_cover": existing_health_cover,
+        "life_gap": life_gap,
+        "health_gap": health_gap,
+        "life_status": np.where(life_gap == 0, "Adequate", "Underinsured"),
+        "health_status": np.where(health_gap == 0, "Adequate", "Underinsured"),
+    }
+
+
+def _estimate_premium_batch(gap, age, rate_bands: BandTable, cover_unit: float) -> tuple:
+    gap = np.asarray(gap, dtype=float)
+    units = gap / cover_unit
+    rates = rate_bands.lookup_batch(age)
+    # np.round halves to even, like round() in the scalar version
+    low = np.where(gap > 0, np.round(units * rates[:, 0]), 0).astype(np.int64)
+    high = np.where(gap > 0, np.round(units * rates[:, 1]), 0).astype(np.int64)
+    return low, high
+
+
+def estimate_life_premium_batch(life_gap, age, *, rules: InsuranceRules = None) -> tuple:
+    # (low, high) arrays of yearly premium
+    rules = rules or current_assumptions().insurance
+    return _estimate_premium_batch(life_gap, age, rules.life_premium_rates,
+                                   rules.premium_cover_unit)
+
+
+def estimate_health_premium_batch(health_gap, age, *, rules: InsuranceRules = None) -> tuple:
+    rules = rules or current_assumptions().insurance
+    return _estimate_premium_batch(health_gap, age, rules.health_premium_rates,
+                                   rules.premium_cover_unit)
@@ -1,12 +1,14 @@
+from assumptions import InsuranceRules, current_assumptions
 from insurance_inputs import InsuranceInputs
 from life_insurance import calculate_required_life_cover
 from health_insurance import calculate_required_health_cover
 
-def calculate_insurance_gap(inputs: InsuranceInputs) -> dict:
+def calculate_insurance_gap(inputs: InsuranceInputs, rules: InsuranceRules = None) -> dict:
+    rules = rules or current_assumptions().insurance
 
     # Required coverage
-    required_life = calculate_required_life_cover(inputs)
-    required_health = calculate_required_health_cover(inputs)
+    required_life = calculate_required_life_cover(inputs, rules)
+    required_health = calculate_required_health_cover(inputs, rules)
 
     # Gap calculation (never negative)
     life_gap = max(0, required_life - inputs.existing_life_cover)
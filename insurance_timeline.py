@@ -0,0 +1,77 @@
+import numpy as np
+
+from assumptions import InsuranceRules, current_assumptions
+from insurance_batch import (
+    estimate_health_premium_batch,
+    estimate_life_premium_batch,
+    lifestyle_flags,
+    required_health_cover_batch,
+    required_life_cover_batch,
+)
+from insurance_inputs import InsuranceInputs
+
+
+# ============================================================
+# COVERAGE OVER TIME — ONE ELEMENT PER YEAR TO RETIREMENT
+# ============================================================
+# Year t runs at age inputs.age + t, for t = 0 .. retirement_age - age - 1,
+# so year 0 matches calculate_insurance_gap and the premium estimators.
+# Each year:
+#   - income grows by income_growth, and life cover is income × the
+#     multiplier for the dependents still dependent that year
+#   - health cover is the banded need at that age and dependent count,
+#     grown by medical_inflation from today's amounts
+#   - existing cover stays at today's amount
+# All years go through the batch engines at once.
+
+def coverage_timeline(inputs: InsuranceInputs, retirement_age: int, *,
+                      independent_in=(), income_growth: float = None,
+                      medical_inflation: float = None,
+                      rules: InsuranceRules = None) -> dict:
+    # independent_in: years from now at which each dependent stops being
+    # dependent; dependents not listed stay dependent until retirement.
+    # Growth rates left as None come from the rules.
+    rules = rules or current_assumptions().insurance
+    income_growth = rules.income_growth if income_growth is None else income_growth
+    medical_inflation = rules.medical_inflation if medical_inflation is None else medical_inflation
+
+    years = retirement_age - inputs.age
+    if years <= 0:
+        raise ValueError("retirement_age must be above the current age")
+    independent_in = np.sort(np.asarray(independent_in, dtype=float))
+    if len(independent_in) > inputs.dependents:
+        raise ValueError(f"independent_in lists {len(independent_in)} dependents, "
+                         f"but there are only {inputs.dependents}")
+    if (independent_in < 0).any():
+        raise ValueError("independent_in must not be negative")
+
+    t = np.arange(years)
+    age = inputs.age + t
+    dependents = inputs.dependents - np.searchsorted(independent_in, t, side="right")
+    annual_income = inputs.annual_income * (1 + income_growth) ** t
+
+    required_life = required_life_cover_batch(annual_income, dependents, rules=rules)
+    required_health = required_health_cover_batch(
+        age, dependents, np.full(years, inputs.city_tier, dtype=object),
+        lifestyle_flags([inputs.lifestyle_risks], rules), rules=rules,
+    ) * (1 + medical_inflation) ** t
+
+    # Gap calculation (never negative)
+    life_gap = np.maximum(0, required_life - inputs.existing_life_cover)
+    health_gap = np.maximum(0, required_health - inputs.existing_health_cover)
+    life_low, life_high = estimate_life_premium_batch(life_gap, age, rules=rules)
+    health_low, health_high = estimate_health_premium_batch(health_gap, age, rules=rules)
+
+    return {
+        "age": age,
+        "dependents": dependents,
+        "annual_income": annual_income,
+        "required_life_cover": required_life,
+        "required_health_cover": required_health,
+        "life_gap": life_gap,
+        "health_gap": health_gap,
+        "life_premium_low": life_low,
+        "life_premium_high": life_high,
+        "health_premium_low": health_low,
+        "health_premium_high": health_high,
+    }
@@ -1,15 +1,13 @@
+from assumptions import InsuranceRules, current_assumptions
 from insurance_inputs import InsuranceInputs
 
-def calculate_required_life_cover(inputs: InsuranceInputs) -> float:
+def calculate_required_life_cover(inputs: InsuranceInputs,
+                                  rules: InsuranceRules = None) -> float:
+    rules = rules or current_assumptions().insurance
 
     income = inputs.annual_income
     dependents = inputs.dependents
 
-    if dependents >= 3:
-        multiplier = 15
-    elif dependents >= 1:
-        multiplier = 12
-    else:
-        multiplier = 10
+    multiplier = rules.life_income_multiplier.lookup(dependents)
 
     return income * multiplier
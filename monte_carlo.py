@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from assumptions import current_assumptions, resolve
+
+
+def __getattr__(name):
+    # Annual volatility per asset class now lives in assumptions.toml
+    if name == "ASSET_VOLATILITY":
+        return current_assumptions().volatility
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@dataclass
+class MonteCarloResult:
+    paths: int
+    seed: int
+    success_probability: float
+    ending_corpus_percentiles: dict
+
+
+def _lognormal_params(mean, vol):
+    # Lognormal gross returns whose arithmetic mean and volatility match the
+    # assumptions, so the average path tracks the deterministic engine.
+    sigma2 = np.log1p((vol / (1 + mean)) ** 2)
+    return np.log1p(mean) - sigma2 / 2, np.sqrt(sigma2)
+
+
+def _portfolio_gross_returns(rng, n_paths, n_years, allocation, asset_returns, volatility):
+    # (paths x years) gross portfolio returns, rebalanced to `allocation` every year
+    gross = np.zeros((n_paths, n_years))
+    draw = np.empty((n_paths, n_years))
+    for asset, weight in allocation.items():
+        if weight == 0:
+            continue
+        mu, sigma = _lognormal_params(asset_returns[asset], volatility[asset])
+        rng.standard_normal(out=draw)
+        draw *= sigma
+        draw += mu
+        np.exp(draw, out=draw)
+        draw *= weight
+        gross += draw
+    return gross
+
+
+def simulate_portfolio_withdrawal(monthly_expense_today: float, years_to_ret: int,
+                                  retirement_years: int, risk: int,
+                                  current_savings: float, monthly_sip: float, *,
+                                  paths: int = 10_000, seed: int = 0,
+                                  chunk_size: int = 50_000,
+                                  percentiles: tuple = (5, 50, 95),
+                                  volatility: dict = None,
+                                  inflation: float = None,
+                                  risk_alloc: dict = None,
+                                  asset_returns: dict = None) -> MonteCarloResult:
+    # Accumulate with a flat SIP until retirement, then withdraw the inflated
+    # expense every year until the horizon ends. A path fails as soon as the
+    # corpus goes negative and stays at zero afterwards.
+    #
+    # Paths are simulated chunk_size at a time, so peak memory is about
+    # chunk_size x total years floats no matter how many paths are asked
+    # for. Each chunk gets its own child of SeedSequence(seed), which makes
+    # a run reproducible for a given (seed, chunk_size).
+    volatility, inflation, risk_alloc, asset_returns = resolve(
+        volatility=volatility, inflation=inflation,
+        risk_alloc=risk_alloc, asset_returns=asset_returns)
+    allocation = risk_alloc[risk]
+    n_years = years_to_ret + retirement_years
+    first_withdrawal = monthly_expense_today * 12 * (1 + inflation) ** years_to_ret
+    withdrawals = first_withdrawal * (1 + inflation) ** np.arange(retirement_years)
+
+    n_chunks = -(-paths // chunk_size)
+    child_seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    ending = np.empty(paths)
+    survived = np.empty(paths, dtype=bool)
+    for i, child in enumerate(child_seeds):
+        start = i * chunk_size
+        n = min(chunk_size, paths - start)
+        gross = _portfolio_gross_returns(np.random.default_rng(child), n, n_years,
+                                         allocation, asset_returns, volatility)
+
+        C = np.full(n, float(current_savings))
+        for t in range(years_to_ret):
+            C = C * gross[:, t] + 12 * monthly_sip
+
+        alive = np.ones(n, dtype=bool)
+        for k in range(retirement_years):
+            C = C * gross[:, years_to_ret + k] - withdrawals[k]
+            alive &= C >= 0
+            C = np.where(alive, C, 0.0)
+
+        ending[start:start + n] = C
+        survived[start:start + n] = alive
+
+    return MonteCarloResult(
+        paths=paths,
+        seed=seed,
+        success_probability=float(survived.mean()),
+        ending_corpus_percentiles={
+            p: float(v) for p, v in zip(percentiles, np.percentile(ending, percentiles))
+        },
+    )
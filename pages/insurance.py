@@ -1,163 +1,39 @@
 import streamlit as st
-import pandas as pd
-import altair as alt
+from assumptions import describe_insurance, load_error, refresh_assumptions
 from insurance_inputs import InsuranceInputs
-from life_insurance import calculate_required_life_cover
-from health_insurance import calculate_required_health_cover
+from insurance_gap import calculate_insurance_gap
+from insurance_timeline import coverage_timeline
 from premium_estimator import estimate_life_premium, estimate_health_premium
+from engine_cache import CACHE_MAXSIZE, CACHE_TTL
+from profiling import start_profiling, render_profile_panel
+from ui_bootstrap import altair, apply_theme, pandas
+
+apply_theme("planner")
+prof = start_profiling("insurance")
+
+# Picks up edits to assumptions.toml; while the file is missing or broken
+# the last good assumptions stay in use and the page says so
+A = refresh_assumptions()
+if load_error():
+    st.warning(f"Could not reload the planning assumptions; using the last version "
+               f"that loaded. {load_error()}")
 
 
 # ============================================================
-# GLOBAL UI: FONT SCALE + BLUE ACCENTS
+# CACHED ENGINE CALLS (SHARED ACROSS SESSIONS)
 # ============================================================
-st.markdown("""
-<style>
-/* ===== GLOBAL TEXT SCALE ===== */
-html, body, [class*="css"] {
-    font-size: 17px;
-}
-
-/* =============================
-   GLOBAL ACCENT COLOR (KEY FIX)
-   ============================= */
-:root {
-    accent-color: #10b981;
-}
-
-/* =============================
-   BASE APP
-   ============================= */
-.stApp {
-    background-color: #0f172a;
-    color: #e5e7eb;
-}
-
-/* =============================
-   HEADINGS
-   ============================= */
-h1, h2, h3 {
-    color: #f8fafc;
-}
-
-/* =============================
-   CONTAINERS (CARDS)
-   ============================= */
-div[data-testid="stContainer"] {
-    background-color: #111827;
-    border-radius: 18px;
-    border: 1px solid #1f2937;
-    padding: 26px;
-}
-div[data-testid="stContainer"]:hover {
-    box-shadow: 0 0 0 1px #10b981;
-}
-
-/* NUMBER INPUT WRAPPER FIX */
-div[data-testid="stNumberInput"] {
-    overflow: visible;
-    border-radius: 14px;
-}
-div[data-testid="stNumberInput"] > div {
-    border-radius: 14px;
-    overflow: hidden;
-}
-
-/* INPUT FIELD */
-input[type="number"],
-input[type="text"] {
-    background-color: #020617 !important;
-    color: #e5e7eb !important;
-    border: 1px solid #1f2937 !important;
-    border-right: none !important;
-    border-radius: 14px 0 0 14px !important;
-}
-
-/* FOCUS */
-input[type="number"]:focus,
-input[type="text"]:focus {
-    border-color: #10b981 !important;
-    outline: none !important;
-    box-shadow: none !important;
-}
-
-/* Kill BaseWeb wrapper borders */
-div[data-baseweb="base-input"],
-div[data-baseweb="input"] {
-    border: none !important;
-    box-shadow: none !important;
-}
-
-/* MINUS BUTTON */
-button[data-testid="stNumberInputStepDown"] {
-    background-color: #020617 !important;
-    color: #ffffff !important;
-    border-top: 1px solid #1f2937 !important;
-    border-bottom: 1px solid #1f2937 !important;
-    border-left: 1px solid #1f2937 !important;
-    border-right: none !important;
-    margin-left: -1px !important;
-    border-radius: 0 !important;
-}
-
-/* PLUS BUTTON */
-button[data-testid="stNumberInputStepUp"] {
-    background-color: #020617 !important;
-    color: #ffffff !important;
-    border: 1px solid #1f2937 !important;
-    border-left: none !important;
-    margin-left: -1px !important;
-    border-radius: 0 14px 14px 0 !important;
-}
-
-/* HOVER */
-button[data-testid="stNumberInputStepUp"]:hover,
-button[data-testid="stNumberInputStepDown"]:hover {
-    background-color: #10b981 !important;
-    color: #020617 !important;
-}
-
-/* =============================
-   PRIMARY BUTTON
-   ============================= */
-.stButton > button {
-    background-color: #10b981;
-    color: #022c22;
-    border-radius: 12px;
-    font-weight: 700;
-    border: none;
-    padding: 0.8rem 1.6rem;
-}
-.stButton > button:hover {
-    background-color: #059669;
-}
-
-/* =============================
-   METRICS
-   ============================= */
-[data-testid="stMetricValue"] {
-    color: #5eead4;
-    font-weight: 800;
-}
-
-/* =============================
-   SCROLLBAR
-   ============================= */
-::-webkit-scrollbar {
-    width: 8px;
-}
-::-webkit-scrollbar-thumb {
-    background: #10b981;
-    border-radius: 10px;
-}
-
-/* =============================
-   PROGRESS BAR
-   ============================= */
-div[data-testid="stProgress"] > div > div {
-    background-color: #10b981 !important;
-}
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data(max_entries=CACHE_MAXSIZE, ttl=CACHE_TTL, show_spinner=False)
+def assess_insurance(age, income, dependants, life_cover, health_cover,
+                     city_tier, lifestyle_risks, assumptions):
+    return calculate_insurance_gap(InsuranceInputs(
+        age=age,
+        annual_income=income,
+        dependents=dependants,
+        existing_life_cover=life_cover,
+        existing_health_cover=health_cover,
+        city_tier=city_tier,
+        lifestyle_risks=list(lifestyle_risks)
+    ))
 
 
 # ============================================================
@@ -176,8 +52,9 @@ st.divider()
 # ============================================================
 col_inputs, col_right = st.columns([1.2, 1])
 
+# Inputs sit in a form, so editing a field does not rerun the page
 with col_inputs:
-    with st.container(border=True):
+    with st.form("insurance_inputs", border=True):
         st.markdown("###  Your Details")
 
         age = st.number_input(
@@ -218,7 +95,7 @@ with col_inputs:
 
         st.markdown("---")
 
-        check_clicked = st.button(
+        check_clicked = st.form_submit_button(
             "Check my insurance adequacy",
             use_container_width=True
         )
@@ -245,64 +122,154 @@ with col_right:
 
         # Layer 3: Technical assumptions
         with st.expander("Technical Assumptions (Detailed)"):
-            st.text("""
-LIFE INSURANCE ASSUMPTIONS
-• Life insurance need is calculated using an income replacement approach.
-• Recommended cover is based on annual income and number of dependents.
-• Income multipliers used:
-  – 0 dependents: 10× annual income
-  – 1–2 dependents: 12× annual income
-  – 3 or more dependents: 15× annual income
-• Existing life insurance is fully deducted before calculating any gap.
-
-HEALTH INSURANCE ASSUMPTIONS
-• Health insurance need increases with age due to rising medical risk.
-• Base health cover by age:
-  – Below 30 years: ₹5,00,000
-  – 30–45 years: ₹10,00,000
-  – Above 45 years: ₹15,00,000
-• Additional family buffer of ₹2,50,000 is added per dependent.
-• City-level healthcare cost adjustment:
-  – Tier-1 (Metro): +₹5,00,000
-  – Tier-2: +₹2,50,000
-  – Tier-3 / Rural: +₹0
-
-LIFESTYLE RISK ASSUMPTIONS (OPTIONAL)
-• Lifestyle inputs are optional and self-declared.
-• Only high-level risk indicators are used.
-• Risk buffers applied:
-  – Smoking: +₹5,00,000
-  – Sedentary lifestyle: +₹2,50,000
-  – High stress: +₹2,50,000
-• No medical diagnosis or health profiling is performed.
-
-INSURANCE GAP LOGIC
-• Insurance gap = Required cover − Existing cover.
-• If gap ≤ 0, coverage is marked as Adequate.
-• If gap > 0, coverage is marked as Underinsured.
-
-PREMIUM ESTIMATION ASSUMPTIONS
-• Premiums shown are indicative yearly ranges, not policy quotes.
-• Life insurance premium rates (per ₹10L cover per year):
-  – Below 30 years: ₹500 – ₹800
-  – 30–45 years: ₹800 – ₹1,200
-  – Above 45 years: ₹1,500 – ₹2,500
-• Health insurance premium rates (per ₹10L cover per year):
-  – Below 30 years: ₹6,000 – ₹8,000
-  – 30–45 years: ₹8,000 – ₹12,000
-  – Above 45 years: ₹15,000 – ₹25,000
-• Premiums are calculated only on the uncovered gap.
-
-DISCLAIMER
-• This tool is for educational and planning purposes only.
-• Actual insurance needs and premiums may vary by insurer and individual profile.
-""")
+            st.text(describe_insurance(A.insurance))
+
+
+# ============================================================
+# ASSESSMENT KEPT ACROSS RERUNS
+# ============================================================
+# Computed once per submit and kept in session_state; recomputed from the
+# stored inputs if the assumptions file changes.
+
+def assess(inputs: dict) -> dict:
+    with prof.span("assess_insurance"):
+        gap = assess_insurance(
+            inputs["age"], inputs["income"], inputs["dependants"], inputs["life_cover"],
+            inputs["health_cover"], inputs["city_tier"], inputs["lifestyle_risks"],
+            A.fingerprint("insurance")
+        )
+    with prof.span("estimate_life_premium"):
+        life_premium = estimate_life_premium(gap["life_gap"], inputs["age"])
+    with prof.span("estimate_health_premium"):
+        health_premium = estimate_health_premium(gap["health_gap"], inputs["age"])
+    return {
+        "inputs": inputs,
+        "assumptions": A.fingerprint("insurance"),
+        "gap": gap,
+        "life_premium": life_premium,
+        "health_premium": health_premium,
+    }
+
+
+if check_clicked:
+    st.session_state.insurance_assessment = assess({
+        "age": age,
+        "income": income,
+        "dependants": dependants,
+        "life_cover": life_cover,
+        "health_cover": health_cover,
+        "city_tier": city.replace(" ", "_"),
+        "lifestyle_risks": tuple(risk.lower().replace(" ", "_") for risk in lifestyle),
+    })
+elif "insurance_assessment" in st.session_state and \
+        st.session_state.insurance_assessment["assumptions"] != A.fingerprint("insurance"):
+    st.session_state.insurance_assessment = assess(st.session_state.insurance_assessment["inputs"])
+
+assessment = st.session_state.get("insurance_assessment")
+
+
+# ============================================================
+# COVERAGE OVER TIME (YEAR BY YEAR TO RETIREMENT)
+# ============================================================
+# A fragment: changing the retirement age or when dependants become
+# independent reruns only this section
+
+def cover_chart(df, required: str, existing: str, title: str):
+    alt = altair()
+    long = df.melt(id_vars="Age", value_vars=[required, existing], var_name="Type",
+                   value_name="Amount")
+    return alt.Chart(long).mark_line().encode(
+        x=alt.X("Age:Q", axis=alt.Axis(format="d")),
+        y=alt.Y("Amount:Q", title="Cover (₹)"),
+        color=alt.Color("Type:N", legend=alt.Legend(orient="bottom", title=None)),
+        strokeDash=alt.StrokeDash("Type:N", legend=None),
+    ).properties(title=title)
+
+
+@st.fragment
+def coverage_timeline_section(inputs: dict):
+    pd, alt = pandas(), altair()
+
+    with st.container(border=True):
+        st.caption(
+            "How your cover needs and premiums may change every year until you retire, "
+            "as income grows, medical costs rise and dependants become independent."
+        )
+
+        retirement_age = st.slider(
+            "Planned retirement age", inputs["age"] + 1, 75, max(60, inputs["age"] + 1),
+            help="Cover is projected for every year until this age"
+        )
 
+        independent_in = []
+        if inputs["dependants"]:
+            st.markdown("**Years until each dependant is financially independent**")
+            cols = st.columns(min(inputs["dependants"], 5))
+            for i in range(inputs["dependants"]):
+                years = cols[i % len(cols)].number_input(
+                    f"Dependant {i + 1}", 0, 60, None, placeholder="Stays dependent",
+                    help="Leave empty if they stay dependent until you retire"
+                )
+                if years is not None:
+                    independent_in.append(years)
+
+        with prof.span("coverage_timeline"):
+            timeline = coverage_timeline(InsuranceInputs(
+                age=inputs["age"],
+                annual_income=inputs["income"],
+                dependents=inputs["dependants"],
+                existing_life_cover=inputs["life_cover"],
+                existing_health_cover=inputs["health_cover"],
+                city_tier=inputs["city_tier"],
+                lifestyle_risks=list(inputs["lifestyle_risks"])
+            ), retirement_age, independent_in=independent_in, rules=A.insurance)
+
+        with prof.span("coverage timeline chart", "chart"):
+            df = pd.DataFrame({
+                "Age": timeline["age"],
+                "Required life cover": timeline["required_life_cover"].round(),
+                "Existing life cover": inputs["life_cover"],
+                "Required health cover": timeline["required_health_cover"].round(),
+                "Existing health cover": inputs["health_cover"],
+                "Yearly premium (low)": timeline["life_premium_low"] + timeline["health_premium_low"],
+                "Yearly premium (high)": timeline["life_premium_high"] + timeline["health_premium_high"],
+            })
+
+            col_life, col_health = st.columns(2)
+            col_life.altair_chart(
+                cover_chart(df, "Required life cover", "Existing life cover", "Life Insurance Cover"),
+                use_container_width=True
+            )
+            col_health.altair_chart(
+                cover_chart(df, "Required health cover", "Existing health cover",
+                            "Health Insurance Cover"),
+                use_container_width=True
+            )
+
+            st.altair_chart(
+                alt.Chart(df).mark_area(opacity=0.5).encode(
+                    x=alt.X("Age:Q", axis=alt.Axis(format="d")),
+                    y=alt.Y("Yearly premium (low):Q", title="Yearly premium (₹)"),
+                    y2="Yearly premium (high):Q",
+                    tooltip=["Age", "Yearly premium (low)", "Yearly premium (high)"]
+                ).properties(title="Estimated Yearly Premium to Close Both Gaps"),
+                use_container_width=True
+            )
+
+        last = df.iloc[-1].astype(int)
+        st.caption(
+            f"At age {last['Age']}: required life cover ₹{last['Required life cover']:,}, "
+            f"required health cover ₹{last['Required health cover']:,}, "
+            f"premium ₹{last['Yearly premium (low)']:,} – ₹{last['Yearly premium (high)']:,} a year. "
+            f"Assumes {A.insurance.income_growth:.0%} yearly income growth and "
+            f"{A.insurance.medical_inflation:.0%} medical inflation, with existing cover "
+            "held at today's amount."
+        )
 
 # ============================================================
 # NOT CALCULATED STATE
 # ============================================================
-if not check_clicked:
+if assessment is None:
     st.info(
         "Enter your details and click **Check my insurance adequacy** "
         "to see your coverage status."
@@ -311,28 +278,19 @@ if not check_clicked:
 # ============================================================
 # RESULTS
 # ============================================================
-if check_clicked:
-
-    # ----------------------------
-    # DUMMY LOGIC (Now integrated to actual logic)
-    # ----------------------------
-    inputs = InsuranceInputs(
-        age=age,
-        annual_income=income,
-        dependents=dependants,
-        existing_life_cover=life_cover,
-        existing_health_cover=health_cover,
-        city_tier=city.replace(" ", "_"),
-        lifestyle_risks=[risk.lower().replace(" ", "_") for risk in lifestyle]
-    )
+if assessment is not None:
+    # pandas and Altair load with the first result
+    pd, alt = pandas(), altair()
 
-    required_life = calculate_required_life_cover(inputs)
-    required_health = calculate_required_health_cover(inputs)
+    life_cover = assessment["inputs"]["life_cover"]
+    health_cover = assessment["inputs"]["health_cover"]
+    gap = assessment["gap"]
 
-    life_gap = required_life - life_cover
-    health_gap = required_health - health_cover
+    required_life = gap["required_life_cover"]
+    required_health = gap["required_health_cover"]
 
-    
+    life_gap = gap["life_gap"]
+    health_gap = gap["health_gap"]
 
     # ============================================================
     # SUMMARY CARDS (RIGHT SIDE)
@@ -403,19 +361,20 @@ if check_clicked:
 
 
     with col_h_chart:
-        df = pd.DataFrame({
-            "Type": ["Current", "Required"],
-            "Amount": [health_cover, required_health]
-        })
-
-        st.altair_chart(
-            alt.Chart(df).mark_bar().encode(
-                x=alt.X("Type", axis=alt.Axis(labelAngle=0)),
-                y="Amount",
-                color="Type"
-            ).properties(title="Health Insurance Cover"),
-            use_container_width=True
-        )
+        with prof.span("health cover chart", "chart"):
+            df = pd.DataFrame({
+                "Type": ["Current", "Required"],
+                "Amount": [health_cover, required_health]
+            })
+
+            st.altair_chart(
+                alt.Chart(df).mark_bar().encode(
+                    x=alt.X("Type", axis=alt.Axis(labelAngle=0)),
+                    y="Amount",
+                    color="Type"
+                ).properties(title="Health Insurance Cover"),
+                use_container_width=True
+            )
 
     # ============================================================
     # LIFE INSURANCE DETAILS + CHART
@@ -443,19 +402,20 @@ if check_clicked:
             )
 
     with col_l_chart:
-        df = pd.DataFrame({
-            "Type": ["Current", "Required"],
-            "Amount": [life_cover, required_life]
-        })
-
-        st.altair_chart(
-            alt.Chart(df).mark_bar().encode(
-                x=alt.X("Type", axis=alt.Axis(labelAngle=0)),
-                y="Amount",
-                color="Type"
-            ).properties(title="Life Insurance Cover"),
-            use_container_width=True
-        )
+        with prof.span("life cover chart", "chart"):
+            df = pd.DataFrame({
+                "Type": ["Current", "Required"],
+                "Amount": [life_cover, required_life]
+            })
+
+            st.altair_chart(
+                alt.Chart(df).mark_bar().encode(
+                    x=alt.X("Type", axis=alt.Axis(labelAngle=0)),
+                    y="Amount",
+                    color="Type"
+                ).properties(title="Life Insurance Cover"),
+                use_container_width=True
+            )
 
     # ============================================================
     # PREMIUM ESTIMATOR (BOTTOM SECTION)
@@ -478,7 +438,7 @@ if check_clicked:
         # LIFE INSURANCE PREMIUM
         # ----------------------------
         if life_gap > 0:
-            life_low, life_high = estimate_life_premium(life_gap, age)
+            life_low, life_high = assessment["life_premium"]
 
             col_lp1, col_lp2 = st.columns(2)
 
@@ -505,7 +465,7 @@ if check_clicked:
         # HEALTH INSURANCE PREMIUM
         # ----------------------------
         if health_gap > 0:
-            health_low, health_high = estimate_health_premium(health_gap, age)
+            health_low, health_high = assessment["health_premium"]
 
             col_hp1, col_hp2 = st.columns(2)
 
@@ -533,6 +493,16 @@ if check_clicked:
             "Actual premiums depend on insurer, policy features, and underwriting."
         )
 
+    # ============================================================
+    # COVERAGE OVER TIME
+    # ============================================================
+
+    st.divider()
+
+    st.markdown("## Your Coverage Over Time")
+
+    coverage_timeline_section(assessment["inputs"])
+
     # ============================================================
     # FINAL INSIGHTS (OVERALL SUMMARY)
     # ============================================================
@@ -598,3 +568,5 @@ if check_clicked:
             "This summary is based on the information provided and uses simplified assumptions. "
             "It is meant to guide awareness, not replace professional advice."
         )
+
+render_profile_panel(prof)
@@ -1,6 +1,21 @@
+import numpy as np
 import streamlit as st
-import pandas as pd
-import altair as alt
+from assumptions import describe_retirement, load_error, refresh_assumptions
+from retirement_engine import (
+    portfolio_return,
+    required_corpus_portfolio,
+    required_corpus_fd_lockin,
+    required_monthly_sip,
+    catch_up_plan,
+    system_risk_level,
+    blended_risk,
+)
+from retirement_batch import sensitivity_grid, earliest_retirement_age
+from monte_carlo import simulate_portfolio_withdrawal
+from allocation_optimizer import optimize_allocation
+from engine_cache import CACHE_MAXSIZE, CACHE_TTL
+from ui_bootstrap import altair, apply_theme, pandas
+from profiling import start_profiling, render_profile_panel
 
 # ============================================================
 # PAGE CONFIG
@@ -9,314 +24,15 @@ st.set_page_config(
     page_title="Retirement Simulator",
     layout="wide"
 )
+apply_theme("planner")
+prof = start_profiling("retirement")
 
-# ============================================================
-# GLOBAL THEME — MATCHES MAIN APP
-# ============================================================
-st.markdown("""
-<style>
-/* ===== GLOBAL TEXT SCALE ===== */
-html, body, [class*="css"] {
-    font-size: 17px;   /* default is ~14px */
-}
-
-/* =============================
-   GLOBAL ACCENT COLOR (KEY FIX)
-   ============================= */
-:root {
-    accent-color: #10b981;
-}
-
-/* =============================
-   BASE APP
-   ============================= */
-.stApp {
-    background-color: #0f172a;
-    color: #e5e7eb;
-}
-
-/* =============================
-   HEADINGS
-   ============================= */
-h1, h2, h3 {
-    color: #f8fafc;
-}
-
-/* =============================
-   CONTAINERS (CARDS)
-   ============================= */
-div[data-testid="stContainer"] {
-    background-color: #111827;
-    border-radius: 18px;
-    border: 1px solid #1f2937;
-    padding: 26px;
-}
-div[data-testid="stContainer"]:hover {
-    box-shadow: 0 0 0 1px #10b981;
-}
-
-/* NUMBER INPUT WRAPPER FIX */
-/* NUMBER INPUT WRAPPER FIX */
-div[data-testid="stNumberInput"] {
-    overflow: visible;
-    border-radius: 14px;
-}
-
-div[data-testid="stNumberInput"] > div {
-    border-radius: 14px;
-    overflow: hidden;
-}
-/* NUMBER INPUT WRAPPER FIX */
-div[data-testid="stNumberInput"] {
-    overflow: visible;
-    border-radius: 14px;
-}
-
-div[data-testid="stNumberInput"] > div {
-    border-radius: 14px;
-    overflow: hidden;
-}
-
-/* INPUT FIELD */
-input[type="number"],
-input[type="text"] {
-    background-color: #020617 !important;
-    color: #e5e7eb !important;
-
-    border: 1px solid #1f2937 !important;
-    border-right: none !important;
-
-    border-radius: 14px 0 0 14px !important;
-}
-
-/* FOCUS */
-input[type="number"]:focus,
-input[type="text"]:focus {
-    border-color: #10b981 !important;
-    outline: none !important;
-    box-shadow: none !important;
-}
-/* INPUT FIELD */
-/* FOCUS */
-input[type="number"]:focus,
-input[type="text"]:focus {
-    border-color: #10b981 !important;
-    outline: none !important;
-    box-shadow: none !important;
-}
-
-/* Kill BaseWeb wrapper borders */
-div[data-baseweb="base-input"],
-div[data-baseweb="input"] {
-    border: none !important;
-    box-shadow: none !important;
-}
-
-div[data-baseweb="base-input"]:hover,
-div[data-baseweb="base-input"]:focus,
-div[data-baseweb="base-input"]:focus-within,
-div[data-baseweb="input"]:hover,
-div[data-baseweb="input"]:focus,
-div[data-baseweb="input"]:focus-within {
-    border: none !important;
-    box-shadow: none !important;
-}
-
-/* MINUS BUTTON */
-button[data-testid="stNumberInputStepDown"] {
-    background-color: #020617 !important;
-    color: #ffffff !important;
-
-    border-top: 1px solid #1f2937 !important;
-    border-bottom: 1px solid #1f2937 !important;
-    border-left: 1px solid #1f2937 !important;
-    border-right: none !important;
-
-    margin-left: -1px !important;   /* 🔥 KEY FIX */
-    border-radius: 0 !important;
-}
-
-/* PLUS BUTTON */
-button[data-testid="stNumberInputStepUp"] {
-    background-color: #020617 !important;
-    color: #ffffff !important;
-
-    border: 1px solid #1f2937 !important;
-    border-left: none !important;
-
-    margin-left: -1px !important;   /* 🔥 KEY FIX */
-    border-radius: 0 14px 14px 0 !important;
-}
-
-/* PLUS BUTTON FOCUS STATE - Match input border color */
-input[type="number"]:focus ~ div button[data-testid="stNumberInputStepUp"],
-input[type="text"]:focus ~ div button[data-testid="stNumberInputStepUp"] {
-    border-color: #10b981 !important;
-}
-
-/* MINUS BUTTON FOCUS STATE - Match input border color */
-input[type="number"]:focus ~ div button[data-testid="stNumberInputStepDown"],
-input[type="text"]:focus ~ div button[data-testid="stNumberInputStepDown"] {
-    border-color: #10b981 !important;
-}
-
-/* HOVER */
-button[data-testid="stNumberInputStepUp"]:hover,
-button[data-testid="stNumberInputStepDown"]:hover {
-    background-color: #10b981 !important;
-    color: #020617 !important;
-}
-
-/* FOCUS */
-input[type="number"]:focus,
-input[type="text"]:focus {
-    border-color: #10b981 !important;
-    outline: none !important;
-    box-shadow: none !important;
-}
-
-
-
-/* =============================
-   PRIMARY BUTTON
-   ============================= */
-.stButton > button {
-    background-color: #10b981;
-    color: #022c22;
-    border-radius: 12px;
-    font-weight: 700;
-    border: none;
-    padding: 0.8rem 1.6rem;
-}
-.stButton > button:hover {
-    background-color: #059669;
-}
-
-/* =============================
-   METRICS
-   ============================= */
-[data-testid="stMetricValue"] {
-    color: #5eead4;
-    font-weight: 800;
-}
-
-
-
-/* =============================
-   SCROLLBAR
-   ============================= */
-::-webkit-scrollbar {
-    width: 8px;
-}
-::-webkit-scrollbar-thumb {
-    background: #10b981;
-    border-radius: 10px;
-}
-            
-            /* ===== NUMBER INPUT + / − BUTTON BORDER ===== */
-button[data-testid="stNumberInputStepUp"],
-button[data-testid="stNumberInputStepDown"] {
-    background-color: #020617 !important;    /* dark background */
-    color: #ffffff !important;
-    padding: 0.25rem 0.25rem !important;
-}
-
-
-
-/* =============================
-   PROGRESS BAR — HARD RESET
-   ============================= */
-
-/* Kill Streamlit default wrapper */
-div[data-testid="stProgress"] {
-    background: transparent !important;
-    padding: 0 !important;
-}
-
-/* Kill BaseWeb progress visuals */
-div[data-testid="stProgress"] div[role="progressbar"] {
-    background: transparent !important;
-    border: none !important;
-    box-shadow: none !important;
-}
-
-/* Track */
-div[data-testid="stProgress"] > div {
-    background-color: #020617 !important;
-    height: 12px !important;
-    border-radius: 999px !important;
-    overflow: hidden !important;
-}
-
-/* Fill */
-div[data-testid="stProgress"] > div > div {
-    background-color: #10b981 !important;
-    height: 100% !important;
-    border-radius: 999px !important;
-}
-
-/* Nuclear option — remove ALL outlines */
-div[data-testid="stProgress"],
-div[data-testid="stProgress"] *,
-div[data-testid="stProgress"] *::before,
-div[data-testid="stProgress"] *::after {
-    border: none !important;
-    outline: none !important;
-    box-shadow: none !important;
-}
-
-</style>
-""", unsafe_allow_html=True)
-
-
-
-# ============================================================
-# CONSTANTS (UNCHANGED)
-# ============================================================
-INFLATION = 0.06
-POST_RET_RETURN = 0.05
-MAX_SIP_GROWTH = 0.15
-
-ASSET_RETURNS = {
-    "Equity": 0.12,
-    "Debt": 0.07,
-    "Gold": 0.06,
-    "Savings": 0.04
-}
-
-RISK_ALLOC = {
-    1: {"Equity": 0.25, "Debt": 0.45, "Gold": 0.10, "Savings": 0.20},
-    2: {"Equity": 0.35, "Debt": 0.40, "Gold": 0.10, "Savings": 0.15},
-    3: {"Equity": 0.50, "Debt": 0.30, "Gold": 0.10, "Savings": 0.10},
-    4: {"Equity": 0.65, "Debt": 0.20, "Gold": 0.10, "Savings": 0.05},
-    5: {"Equity": 0.75, "Debt": 0.10, "Gold": 0.10, "Savings": 0.05},
-}
-
-# ============================================================
-# ALTAR DARK THEME (GLOBAL)
-# ============================================================
-alt.themes.register(
-    "dark_emerald",
-    lambda: {
-        "config": {
-            "background": "transparent",
-            "axis": {
-                "labelColor": "#9ca3af",
-                "titleColor": "#e5e7eb",
-                "gridColor": "#1f2937",
-                "tickColor": "#374151",
-            },
-            "legend": {
-                "labelColor": "#e5e7eb",
-                "titleColor": "#e5e7eb"
-            },
-            "range": {
-                "category": ["#10b981", "#5eead4", "#34d399", "#059669"]
-            }
-        }
-    }
-)
-alt.themes.enable("dark_emerald")
+# Picks up edits to assumptions.toml; while the file is missing or broken
+# the last good assumptions stay in use and the page says so
+A = refresh_assumptions()
+if load_error():
+    st.warning(f"Could not reload the planning assumptions; using the last version "
+               f"that loaded. {load_error()}")
 
 # ============================================================
 # HEADER
@@ -326,99 +42,138 @@ st.markdown("Understand how much money you’ll need for retirement — and how
 st.divider()
 
 # ============================================================
-# RETIREMENT CORPUS ENGINES (ONLY THIS LOGIC CHANGED)
+# CACHED ENGINE CALLS (SHARED ACROSS SESSIONS)
 # ============================================================
+# `assumptions` is only part of the cache key, so results computed under
+# different assumptions are never served.
 
-def portfolio_return(risk):
-    return sum(RISK_ALLOC[risk][a] * ASSET_RETURNS[a] for a in ASSET_RETURNS)
-
-
-def required_corpus_portfolio(monthly_expense_today, years_to_ret, retirement_years, risk):
-    annual = monthly_expense_today * 12 * ((1 + INFLATION) ** years_to_ret)
-    r = portfolio_return(risk)
-
-    def survives(C):
-        E = annual
-        for _ in range(retirement_years):
-            C = C * (1 + r) - E
-            if C < 0:
-                return False
-            E *= (1 + INFLATION)
-        return True
-
-    lo, hi = 0, 1e11
-    for _ in range(100):
-        mid = (lo + hi) / 2
-        hi = mid if survives(mid) else hi
-        lo = lo if survives(mid) else mid
-    return hi
-
-
-def required_corpus_fd_lockin(monthly_expense_today, years_to_ret, retirement_years):
-    annual = monthly_expense_today * 12 * ((1 + INFLATION) ** years_to_ret)
-
-    def survives(C):
-        E = annual
-        for _ in range(retirement_years):
-            C = C * (1 + POST_RET_RETURN) - E
-            if C < 0:
-                return False
-            E *= (1 + INFLATION)
-        return True
-
-    lo, hi = 0, 1e11
-    for _ in range(100):
-        mid = (lo + hi) / 2
-        hi = mid if survives(mid) else hi
-        lo = lo if survives(mid) else mid
-    return hi
+@st.cache_data(max_entries=CACHE_MAXSIZE, ttl=CACHE_TTL, show_spinner=False)
+def solve_retirement(monthly_expense, years_to_ret, retirement_years, user_risk,
+                     portfolio_style, current_savings, current_monthly_investment,
+                     compounding, assumptions):
+    required = (
+        required_corpus_portfolio(monthly_expense, years_to_ret, retirement_years, user_risk,
+                                  compounding=compounding)
+        if portfolio_style
+        else required_corpus_fd_lockin(monthly_expense, years_to_ret, retirement_years,
+                                       compounding=compounding)
+    )
+    r_user = portfolio_return(user_risk)
+    required_sip = required_monthly_sip(required, current_savings, years_to_ret, r_user,
+                                        compounding=compounding)
+    plan = catch_up_plan(current_monthly_investment, required_sip, years_to_ret)
+    return required, required_sip, plan
+
+
+@st.cache_data(max_entries=CACHE_MAXSIZE, ttl=CACHE_TTL, show_spinner=False)
+def stress_test(monthly_expense, years_to_ret, retirement_years, user_risk,
+                current_savings, required_sip, assumptions):
+    return simulate_portfolio_withdrawal(
+        monthly_expense, years_to_ret, retirement_years, user_risk,
+        current_savings, required_sip, paths=10_000, seed=42
+    )
 
 
 # ============================================================
-# SIP + SUPPORTING ENGINES (UNCHANGED)
+# RESULTS KEPT ACROSS RERUNS
 # ============================================================
+# Everything the results section shows is computed once per submit and kept
+# in session_state, so later reruns (scenario edits, optimizer sliders,
+# switching tabs) only redraw. Results are recomputed from the stored inputs
+# if the assumptions file changes.
+
+def plan_retirement(inputs: dict) -> dict:
+    # The ledger and backtest need pandas; loaded with the first plan
+    from retirement_ledger import build_ledger
+    from backtest import load_annual_returns, rolling_withdrawal_backtest
+
+    years_to_ret = inputs["retirement_age"] - inputs["current_age"]
+    retirement_years = 90 - inputs["retirement_age"]
+    portfolio = inputs["retirement_style"].startswith("Portfolio")
+    result = {
+        "inputs": inputs,
+        "assumptions": A.fingerprint("retirement"),
+        "years_to_ret": years_to_ret,
+        "retirement_years": retirement_years,
+    }
 
-def required_monthly_sip(required_corpus, current_savings, years, annual_return):
-    lo, hi = 0, 300_000
-    for _ in range(100):
-        mid = (lo + hi) / 2
-        C = current_savings
-        for _ in range(years):
-            C = C * (1 + annual_return) + 12 * mid
-        hi = mid if C >= required_corpus else hi
-        lo = lo if C >= required_corpus else mid
-    return int(hi)
+    with prof.span("solve_retirement"):
+        result["required"], result["required_sip"], result["plan"] = solve_retirement(
+            inputs["monthly_expense"], years_to_ret, retirement_years, inputs["user_risk"],
+            portfolio, inputs["current_savings"], inputs["current_monthly_investment"],
+            inputs["compounding"], A.fingerprint("retirement")
+        )
 
+    result["search"] = None
+    if inputs["find_age"]:
+        with prof.span("earliest_retirement_age"):
+            result["search"] = earliest_retirement_age(
+                inputs["current_age"], inputs["current_savings"],
+                inputs["current_monthly_investment"], inputs["monthly_expense"],
+                inputs["user_risk"], compounding=inputs["compounding"]
+            )
 
-def min_start_sip_for_overshoot(required_sip, years, stepup, overshoot_factor=1.10):
-    lo, hi = 0, required_sip
-    for _ in range(60):
-        mid = (lo + hi) / 2
-        sip = mid
-        for _ in range(years):
-            sip = min(sip * (1 + stepup), required_sip * overshoot_factor)
-        hi = mid if sip >= required_sip * overshoot_factor else hi
-        lo = lo if sip >= required_sip * overshoot_factor else mid
-    return int(hi)
+    result["stress"] = None
+    if portfolio:
+        with prof.span("stress_test (Monte Carlo)"):
+            result["stress"] = stress_test(
+                inputs["monthly_expense"], years_to_ret, retirement_years, inputs["user_risk"],
+                inputs["current_savings"], result["required_sip"], A.fingerprint("retirement")
+            )
 
+    result["sens_ages"] = np.arange(inputs["current_age"] + 1,
+                                    min(inputs["current_age"] + 50, 75) + 1)
+    result["sens_expenses"] = np.linspace(0.5, 1.5, 50) * inputs["monthly_expense"]
+    with prof.span("sensitivity_grid"):
+        result["sens"] = sensitivity_grid(
+            inputs["current_age"], inputs["current_savings"], result["sens_ages"],
+            result["sens_expenses"], range(1, 6),
+            fd_lockin=not portfolio,
+            compounding=inputs["compounding"]
+        )
 
-def system_risk_level(current_age, retirement_age, is_behind):
-    years = retirement_age - current_age
-    base = 4 if years > 25 else 3 if years > 15 else 2
-    return min(5, base + 1) if is_behind else base
+    r_user = portfolio_return(inputs["user_risk"])
+    with prof.span("build_ledger"):
+        result["ledger"] = build_ledger(
+            inputs["current_age"], inputs["retirement_age"], inputs["current_savings"],
+            result["required_sip"], inputs["monthly_expense"],
+            accumulation_return=r_user,
+            withdrawal_return=r_user if portfolio else A.post_ret_return
+        )
 
+    result["backtest"] = None
+    if portfolio:
+        with prof.span("load_annual_returns", "data"):
+            returns = load_annual_returns()
+        result["backtest_years"] = len(returns)
+        if retirement_years <= len(returns):
+            with prof.span("rolling_withdrawal_backtest"):
+                result["backtest"] = rolling_withdrawal_backtest(
+                    returns, result["required"],
+                    inputs["monthly_expense"] * 12 * (1 + A.inflation) ** years_to_ret,
+                    retirement_years, inputs["user_risk"]
+                )
 
-def blended_risk(user_risk, system_risk):
-    return max(1, min(5, round(0.6 * user_risk + 0.4 * system_risk)))
+    return result
 
 
 # ============================================================
 # INPUTS
 # ============================================================
+# Inputs sit in a form, so editing a field does not rerun the page; the
+# submit button sends them all at once.
+risk_labels = {
+    1: "Very Conservative",
+    2: "Conservative",
+    3: "Balanced",
+    4: "Growth Oriented",
+    5: "Aggressive"
+}
+
 col_inputs, col_info = st.columns([1, 1])
 
 with col_inputs:
-    with st.container(border=True):
+    with st.form("retirement_inputs", border=True):
         current_age = st.number_input(
             "Current age",
             min_value=18,
@@ -428,10 +183,10 @@ with col_inputs:
         )
         retirement_age = st.number_input(
             "Planned retirement age",
-            min_value=current_age + 1,
+            min_value=19,
             max_value=75,
             value=60,
-            help="Age at which you plan to retire"
+            help="Age at which you plan to retire; must be after your current age"
         )
 
         monthly_expense = st.number_input(
@@ -447,13 +202,23 @@ with col_inputs:
                 "Portfolio Withdrawal (Systematic)",
                 "FD Lock-In (Conservative)"
             ],
+            captions=[
+                " Corpus stays invested; withdrawals rise with inflation.",
+                " Corpus locked into FD; safer but depletes faster."
+            ],
             help="Determines how your retirement corpus is handled after retirement."
 )
 
-        if retirement_style.startswith("Portfolio"):
-            st.caption(" Corpus stays invested; withdrawals rise with inflation.")
-        else:
-            st.caption(" Corpus locked into FD; safer but depletes faster.")
+        precision_mode = st.radio(
+            "Precision mode",
+            ["Annual", "Monthly"],
+            horizontal=True,
+            help="Annual treats each year's SIPs and withdrawals as one year-end amount. "
+                 "Monthly compounds every month, which is closer to how money actually moves. "
+                 "Corpus, SIP and what-if grid use monthly steps; "
+                 "the stress test, ledger and backtest stay yearly."
+        )
+        compounding = precision_mode.lower()
 
 
 
@@ -468,43 +233,170 @@ with col_inputs:
             min_value=1,
             max_value=5,
             value=3,
-            help="Higher risk may mean higher returns, but more volatility"
+            help="Higher risk may mean higher returns, but more volatility. "
+                 + ", ".join(f"{level}: {label}" for level, label in risk_labels.items())
         )
 
-        risk_labels = {
-            1: "Very Conservative",
-            2: "Conservative",
-            3: "Balanced",
-            4: "Growth Oriented",
-            5: "Aggressive"
-        }
+        st.markdown("---")
+
+        calculate = st.form_submit_button("Calculate my retirement plan", use_container_width=True)
+        find_age = st.toggle(
+            "When can I retire?",
+            help="Also checks every retirement age up to 75 against your current monthly investment."
+        )
 
-        st.caption(f"Your risk profile: **{risk_labels[user_risk]}**")
+# Widget values inside a form only change on submit, so these are the
+# inputs of the last submitted form
+inputs = {
+    "current_age": current_age,
+    "retirement_age": retirement_age,
+    "monthly_expense": monthly_expense,
+    "retirement_style": retirement_style,
+    "compounding": compounding,
+    "current_monthly_investment": current_monthly_investment,
+    "current_savings": current_savings,
+    "user_risk": user_risk,
+    "find_age": find_age,
+}
 
-        st.markdown("---")
+if calculate:
+    if retirement_age <= current_age:
+        col_inputs.error("Planned retirement age must be after your current age.")
+    else:
+        st.session_state.retirement_plan = plan_retirement(inputs)
+elif "retirement_plan" in st.session_state and \
+        st.session_state.retirement_plan["assumptions"] != A.fingerprint("retirement"):
+    st.session_state.retirement_plan = plan_retirement(st.session_state.retirement_plan["inputs"])
+
+result = st.session_state.get("retirement_plan")
 
-        calculate = st.button("Calculate my retirement plan", use_container_width=True)
+# pandas and Altair load with the first result, after the inputs have painted
+if result is not None:
+    pd, alt = pandas(), altair()
 
 # ============================================================
-# CALCULATION
+# EARLIEST RETIREMENT AGE
 # ============================================================
-if calculate:
-    years_to_ret = retirement_age - current_age
-    retirement_years = 90 - retirement_age
+if result is not None and result["search"] is not None:
+    search = result["search"]
+    with st.container(border=True):
+        st.markdown("### When can I retire?")
 
-    required = (
-        required_corpus_portfolio(monthly_expense, years_to_ret, retirement_years, user_risk)
-        if retirement_style.startswith("Portfolio")
-        else required_corpus_fd_lockin(monthly_expense, years_to_ret, retirement_years)
-    )
+        c1, c2 = st.columns(2)
+        for col, style, label in (
+            (c1, "portfolio", "Portfolio Withdrawal"),
+            (c2, "fd_lockin", "FD Lock-In"),
+        ):
+            earliest = search["earliest"][style]
+            col.metric(f"Earliest age — {label}", earliest if earliest else "Not by 75")
+
+        with prof.span("feasibility table", "data"):
+            ages = search["retirement_ages"]
+            feasibility_df = pd.concat([
+                pd.DataFrame({
+                    "Retirement age": ages,
+                    "Strategy": label,
+                    "Required SIP (₹)": search["required_sip"][style],
+                })
+                for style, label in (("portfolio", "Portfolio Withdrawal"),
+                                     ("fd_lockin", "FD Lock-In"))
+            ], ignore_index=True)
+
+        with prof.span("feasibility chart", "chart"):
+            curve = alt.Chart(feasibility_df).mark_line(strokeWidth=3).encode(
+                x=alt.X("Retirement age:Q", scale=alt.Scale(domain=[int(ages[0]), int(ages[-1])])),
+                y=alt.Y("Required SIP (₹):Q", scale=alt.Scale(type="symlog")),
+                color=alt.Color("Strategy:N", scale=alt.Scale(range=["#22c55e", "#38bdf8"])),
+                tooltip=["Retirement age:Q", "Strategy:N", "Required SIP (₹):Q"]
+            )
+            budget = alt.Chart(pd.DataFrame({
+                "Current SIP": [result["inputs"]["current_monthly_investment"]]
+            })).mark_rule(
+                color="#facc15", strokeDash=[6, 4]
+            ).encode(y="Current SIP:Q")
 
-    progress = max(0.0, min(current_savings / required, 1.0)) if required > 0 else 0.0
+            st.altair_chart((curve + budget).properties(height=300), use_container_width=True)
 
-    r_user = portfolio_return(user_risk)
-    required_sip = required_monthly_sip(required, current_savings, years_to_ret, r_user)
+        st.caption(
+            "Required monthly investment for each retirement age. You can retire at any age "
+            "where the curve is at or below your current investment (dashed line)."
+        )
+
+
+# ============================================================
+# ALLOCATION OPTIMIZER (BEYOND THE FIVE RISK BUCKETS)
+# ============================================================
+# A fragment: moving its sliders reruns only this section
+
+@st.fragment
+def allocation_optimizer_section(result: dict):
+    inputs = result["inputs"]
+    required_sip = result["required_sip"]
+    user_risk = inputs["user_risk"]
+
+    with st.expander("Could a different mix lower my SIP?"):
+        c1, c2 = st.columns(2)
+        max_equity = c1.slider(
+            "Maximum equity share", 0.0, 1.0, A.max_equity[user_risk], 0.05,
+            help="Upper limit on equity in the suggested mix."
+        )
+        min_savings = c2.slider(
+            "Minimum savings / liquid share", 0.0, 0.5, 0.0, 0.05,
+            help="Keep at least this much in savings or liquid funds."
+        )
+
+        with prof.span("optimize_allocation"):
+            best_mix = optimize_allocation(
+                inputs["monthly_expense"], result["years_to_ret"], result["retirement_years"],
+                inputs["current_savings"],
+                min_weights={"Savings": min_savings}, max_weights={"Equity": max_equity},
+                fd_lockin=not inputs["retirement_style"].startswith("Portfolio"),
+                compounding=inputs["compounding"]
+            )
+
+        c1, c2 = st.columns(2)
+        c1.metric("Required SIP with your risk level", f"₹{required_sip:,}")
+        c2.metric("Required SIP with the best mix", f"₹{best_mix.required_sip:,}",
+                  delta=f"₹{best_mix.required_sip - required_sip:,}", delta_color="inverse")
+
+        st.dataframe(
+            pd.DataFrame({
+                "Asset Class": list(best_mix.weights),
+                "Risk-level mix": [A.risk_alloc[user_risk][a] for a in best_mix.weights],
+                "Best mix": list(best_mix.weights.values()),
+            }),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Risk-level mix": st.column_config.NumberColumn(format="percent"),
+                "Best mix": st.column_config.NumberColumn(format="percent"),
+            }
+        )
+        st.caption(
+            f"Searched {best_mix.candidates:,} mixes in 2.5% steps within your limits. "
+            "With steady assumed returns the lowest SIP always comes from the highest-return "
+            "mix allowed, so the equity limit matters most; higher equity also means bigger swings."
+        )
+
+
+# ============================================================
+# CALCULATION RESULTS
+# ============================================================
+if result is not None:
+    current_age = result["inputs"]["current_age"]
+    retirement_age = result["inputs"]["retirement_age"]
+    retirement_style = result["inputs"]["retirement_style"]
+    current_monthly_investment = result["inputs"]["current_monthly_investment"]
+    current_savings = result["inputs"]["current_savings"]
+    user_risk = result["inputs"]["user_risk"]
+    years_to_ret = result["years_to_ret"]
+    retirement_years = result["retirement_years"]
+    required, required_sip, plan = result["required"], result["required_sip"], result["plan"]
+
+    progress = max(0.0, min(current_savings / required, 1.0)) if required > 0 else 0.0
 
     is_behind = current_monthly_investment < required_sip
-    min_start_sip = min_start_sip_for_overshoot(required_sip, years_to_ret, MAX_SIP_GROWTH)
+    min_start_sip = plan.min_start_sip
     can_recover = current_monthly_investment >= min_start_sip
 
     system_risk = system_risk_level(current_age, retirement_age, is_behind)
@@ -516,19 +408,7 @@ if calculate:
     with col_info:
         with st.container(border=True):
             st.markdown("### Our Assumptions")
-            st.markdown("""
-        **Inflation** - 6% per year
-                        
-        **Post-retirement returns** - Portfolio-based or FD-based (depending on strategy)
-                        
-        **Life expectancy** - 90 years
-                        
-        **Asset return assumptions (annual)**
-        - Equity: **12%**
-        - Debt: **7%**
-        - Gold: **6%**
-        - Savings / Liquid: **4%**
-        """)
+            st.markdown(describe_retirement(A))
 
 
         with st.container(border=True):
@@ -616,64 +496,64 @@ if calculate:
         # ============================================================
     # SIP PATH (FIXED: INSIDE EXPANDER + SMALLER POINTS)
     # ============================================================
-    years = list(range(1, years_to_ret + 1))
-    sip = current_monthly_investment
-    cap = 1.10 * required_sip
-    catchup = []
-
-    for _ in years:
-        catchup.append(int(sip))
-        sip = min(sip * (1 + MAX_SIP_GROWTH), cap)
-
-    df = pd.DataFrame({
-        "Years till retirement": years,
-        "Current SIP": [current_monthly_investment] * years_to_ret,
-        "Required SIP": [required_sip] * years_to_ret,
-        "Catch-up Path": catchup
-    })
+    with prof.span("catch-up table", "data"):
+        df = pd.DataFrame({
+            "Years till retirement": range(1, years_to_ret + 1),
+            "Current SIP": [current_monthly_investment] * years_to_ret,
+            "Required SIP": [required_sip] * years_to_ret,
+            "Catch-up Path": plan.path
+        })
 
     if is_behind and can_recover:
         with st.expander(" How to close the gap (overshoot path)"):
 
-            line_df = df.melt(
-                "Years till retirement",
-                var_name="Type",
-                value_name="Monthly SIP"
-            )
+            with prof.span("catch-up melt", "data"):
+                line_df = df.melt(
+                    "Years till retirement",
+                    var_name="Type",
+                    value_name="Monthly SIP"
+                )
 
-            # ---- Lines for ALL paths ----
-            lines = alt.Chart(line_df).mark_line(
-                strokeWidth=3
-            ).encode(
-                x="Years till retirement:Q",
-                y="Monthly SIP:Q",
-                color=alt.Color(
-                    "Type:N",
-                    scale=alt.Scale(
-                        domain=["Catch-up Path", "Current SIP", "Required SIP"],
-                        range=["#22c55e", "#38bdf8", "#facc15"]
+            with prof.span("catch-up chart", "chart"):
+                # ---- Lines for ALL paths ----
+                lines = alt.Chart(line_df).mark_line(
+                    strokeWidth=3
+                ).encode(
+                    x="Years till retirement:Q",
+                    y="Monthly SIP:Q",
+                    color=alt.Color(
+                        "Type:N",
+                        scale=alt.Scale(
+                            domain=["Catch-up Path", "Current SIP", "Required SIP"],
+                            range=["#22c55e", "#38bdf8", "#facc15"]
+                        )
                     )
                 )
-            )
 
-            # ---- Points ONLY for Catch-up Path (smaller & clean) ----
-            points = alt.Chart(
-                line_df[line_df["Type"] == "Catch-up Path"]
-            ).mark_circle(
-                size=42,                 # ✅ FIXED (was too big)
-                filled=True,
-                stroke="#020617",
-                strokeWidth=1.5
-            ).encode(
-                x="Years till retirement:Q",
-                y="Monthly SIP:Q",
-                color=alt.value("#22c55e")
-            )
+                # ---- Points ONLY for Catch-up Path (smaller & clean) ----
+                points = alt.Chart(
+                    line_df[line_df["Type"] == "Catch-up Path"]
+                ).mark_circle(
+                    size=42,                 # ✅ FIXED (was too big)
+                    filled=True,
+                    stroke="#020617",
+                    strokeWidth=1.5
+                ).encode(
+                    x="Years till retirement:Q",
+                    y="Monthly SIP:Q",
+                    color=alt.value("#22c55e")
+                )
 
-            st.altair_chart(
-                (lines + points).properties(height=320),
-                use_container_width=True
-            )
+                st.altair_chart(
+                    (lines + points).properties(height=320),
+                    use_container_width=True
+                )
+
+            if plan.cap_year is not None:
+                st.caption(
+                    f"Growing your SIP by {A.max_sip_growth:.0%} a year, it reaches "
+                    f"₹{plan.cap:,}/month in year {plan.cap_year} and stays there."
+                )
 
 
 
@@ -685,20 +565,20 @@ if calculate:
             st.markdown("### Where your monthly investment goes")
             st.markdown(
             f"""
-            **Your risk choice:** {user_risk}  
+            **Your risk choice:** {user_risk} ({risk_labels[user_risk]})  
             **System suggested risk:** {system_risk}  
             **Blended risk used:** {final_risk}
             """
         )
 
-        alloc = RISK_ALLOC[final_risk]
+        alloc = A.risk_alloc[final_risk]
         alloc_df = pd.DataFrame({
             "Asset Class": alloc.keys(),
             "Monthly Amount (₹)": [required_sip * v for v in alloc.values()]
         })
 
         c1, c2 = st.columns(2)
-        with c1:
+        with c1, prof.span("allocation pie", "chart"):
             pie = alt.Chart(alloc_df).mark_arc(innerRadius=55).encode(
     theta=alt.Theta("Monthly Amount (₹):Q", stack=True),
     color=alt.Color(
@@ -721,6 +601,123 @@ if calculate:
         with c2:
             st.dataframe(alloc_df, hide_index=True, use_container_width=True)
 
+    allocation_optimizer_section(result)
+
+    # ============================================================
+    # MARKET VOLATILITY CHECK (MONTE CARLO)
+    # ============================================================
+    if result["stress"] is not None:
+        with st.expander("Stress-test this plan against market ups and downs"):
+            mc = result["stress"]
+
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Chance money lasts till 90", f"{mc.success_probability*100:.0f}%")
+            c2.metric("Median corpus left at 90", f"₹{mc.ending_corpus_percentiles[50]/1e7:.2f} Cr")
+            c3.metric("Good-case corpus left at 90", f"₹{mc.ending_corpus_percentiles[95]/1e7:.2f} Cr")
+
+            st.caption(
+                "10,000 simulated market paths where each asset class returns its assumed "
+                "average with yearly swings, investing the required SIP until retirement. "
+                "The plan above assumes steady returns; real markets can run out early after "
+                "a bad sequence of years."
+            )
+
+    # ============================================================
+    # WHAT-IF SENSITIVITY (RETIREMENT AGE x EXPENSE x RISK)
+    # ============================================================
+    with st.expander("What if I retire earlier or spend less?"):
+        sens_ages, sens_expenses, sens = result["sens_ages"], result["sens_expenses"], result["sens"]
+
+        with prof.span("sensitivity table", "data"):
+            age_idx, exp_idx, risk_idx = np.indices(sens["required_sip"].shape)
+            sens_df = pd.DataFrame({
+                "Retirement age": sens_ages[age_idx.ravel()],
+                "Monthly expense (₹)": np.round(sens_expenses[exp_idx.ravel()]),
+                "Risk": risk_idx.ravel() + 1,
+                "Required SIP (₹)": sens["required_sip"].ravel(),
+                "Required corpus (₹ Cr)": np.round(sens["required_corpus"].ravel() / 1e7, 2),
+            })
+
+        with prof.span("sensitivity heatmap", "chart"):
+            risk_param = alt.param(
+                name="risk",
+                value=user_risk,
+                bind=alt.binding_range(min=1, max=5, step=1, name="Risk level ")
+            )
+
+            heatmap = alt.Chart(sens_df).mark_rect().encode(
+                x=alt.X("Retirement age:O", axis=alt.Axis(labelAngle=0, labelOverlap=True)),
+                y=alt.Y("Monthly expense (₹):O", sort="descending",
+                        axis=alt.Axis(format=",.0f", labelOverlap=True)),
+                color=alt.Color("Required SIP (₹):Q", scale=alt.Scale(scheme="viridis")),
+                tooltip=["Retirement age:O", "Monthly expense (₹):Q", "Required SIP (₹):Q",
+                         "Required corpus (₹ Cr):Q"]
+            ).add_params(risk_param).transform_filter(
+                alt.datum.Risk == risk_param
+            ).properties(height=420)
+
+            st.altair_chart(heatmap, use_container_width=True)
+        st.caption(
+            "Required monthly investment for every combination of retirement age and "
+            "monthly expense (today's value). Move the slider to change the risk level."
+        )
+
+    # ============================================================
+    # YEAR-BY-YEAR LEDGER
+    # ============================================================
+    with st.expander("Year-by-year ledger (till age 90)"):
+        ledger = result["ledger"]
+
+        st.caption(
+            "Investing the required SIP until retirement, then withdrawing your "
+            "inflation-adjusted expenses every year. All amounts in ₹."
+        )
+        st.dataframe(ledger, hide_index=True, use_container_width=True, height=360)
+        with prof.span("ledger CSV", "data"):
+            ledger_csv = ledger.to_csv(index=False)
+        st.download_button(
+            "Download ledger (CSV)",
+            ledger_csv,
+            file_name="retirement_ledger.csv",
+            mime="text/csv",
+            on_click="ignore"
+        )
+
+    # ============================================================
+    # HISTORICAL ROLLING-WINDOW BACKTEST
+    # ============================================================
+    if retirement_style.startswith("Portfolio"):
+        with st.expander("How would this corpus hold up over past market stretches?"):
+            bt = result["backtest"]
+            if bt is None:
+                st.info(f"The returns dataset has only {result['backtest_years']} years; "
+                        f"a {retirement_years}-year retirement needs more history.")
+            else:
+                c1, c2, c3 = st.columns(3)
+                c1.metric("Periods where money ran out", f"{bt.failure_rate*100:.0f}%")
+                c2.metric("Median corpus left at 90", f"₹{bt.median_ending_corpus/1e7:.2f} Cr")
+                c3.metric("Worst period starts in year", f"{bt.worst_start_year}")
+
+                with prof.span("backtest bars", "chart"):
+                    bars = alt.Chart(bt.windows).mark_bar().encode(
+                        x=alt.X("Start year:O", axis=alt.Axis(labelAngle=0, labelOverlap=True)),
+                        y=alt.Y("Years funded:Q", scale=alt.Scale(domain=[0, retirement_years])),
+                        color=alt.Color(
+                            "Failed:N",
+                            scale=alt.Scale(domain=[False, True], range=["#10b981", "#f87171"]),
+                            legend=alt.Legend(title="Ran out early")
+                        ),
+                        tooltip=["Start year:O", "Years funded:Q", "Ending corpus:Q"]
+                    ).properties(height=280)
+
+                    st.altair_chart(bars, use_container_width=True)
+                st.caption(
+                    f"Your required corpus replayed over every {retirement_years}-year stretch of "
+                    f"annual returns in the dataset ({len(bt.windows)} periods), using your risk "
+                    "allocation. The bundled dataset is a synthetic sample; load real index "
+                    "returns with the same columns for a true historical check."
+                )
+
     with st.container(border=False):
         with st.expander("How your retirement money is used"):
             st.markdown("""
@@ -747,3 +744,155 @@ with st.container(border=False):
         Both models ensure the corpus lasts till age 90.
         """)
 
+# ============================================================
+# SCENARIO COMPARISON
+# ============================================================
+# A fragment: editing the table, adding rows and switching tabs rerun only
+# this section. "Add current inputs" uses the last submitted form.
+
+@st.fragment
+def scenario_section(inputs: dict):
+    from scenarios import MAX_SCENARIOS, SCENARIO_FIELDS, evaluate_scenarios, scenario_key
+
+    pd = pandas()
+    st.divider()
+    st.markdown("## Compare scenarios")
+    st.caption(
+        f"Save up to {MAX_SCENARIOS} variants of your inputs and compare them side by side. "
+        "Edit any cell to try a change; only edited scenarios are recalculated."
+    )
+
+    if "scenario_rows" not in st.session_state:
+        st.session_state.scenario_rows = []
+        st.session_state.scenario_editor = 0
+        st.session_state.scenario_results = {}
+
+    scenario_columns = ["name", *SCENARIO_FIELDS]
+    edited = st.data_editor(
+        pd.DataFrame(st.session_state.scenario_rows, columns=scenario_columns).astype({
+            "name": str, "current_age": float, "retirement_age": float, "monthly_expense": float,
+            "current_savings": float, "current_monthly_investment": float, "risk": float,
+            "fd_lockin": bool,
+        }),
+        key=f"scenario_editor_{st.session_state.scenario_editor}",
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "name": st.column_config.TextColumn("Scenario"),
+            "current_age": st.column_config.NumberColumn("Age", min_value=18, max_value=65, step=1),
+            "retirement_age": st.column_config.NumberColumn("Retire at", min_value=19, max_value=75, step=1),
+            "monthly_expense": st.column_config.NumberColumn("Monthly expense (₹)", min_value=0, step=1000),
+            "current_savings": st.column_config.NumberColumn("Savings (₹)", min_value=0, step=50000),
+            "current_monthly_investment": st.column_config.NumberColumn("Monthly SIP (₹)", min_value=0, step=1000),
+            "risk": st.column_config.NumberColumn("Risk", min_value=1, max_value=5, step=1),
+            "fd_lockin": st.column_config.CheckboxColumn("FD lock-in"),
+        }
+    )
+
+    c1, c2 = st.columns(2)
+    if c1.button("Add current inputs as a scenario", use_container_width=True,
+                 disabled=len(edited) >= MAX_SCENARIOS):
+        portfolio = inputs["retirement_style"].startswith("Portfolio")
+        st.session_state.scenario_rows = edited.to_dict("records") + [{
+            "name": f"Retire at {inputs['retirement_age']}, risk {inputs['user_risk']}, "
+                    f"{'Portfolio' if portfolio else 'FD'}",
+            "current_age": inputs["current_age"],
+            "retirement_age": inputs["retirement_age"],
+            "monthly_expense": inputs["monthly_expense"],
+            "current_savings": inputs["current_savings"],
+            "current_monthly_investment": inputs["current_monthly_investment"],
+            "risk": inputs["user_risk"],
+            "fd_lockin": not portfolio,
+        }]
+        st.session_state.scenario_editor += 1
+        st.rerun(scope="fragment")
+    if c2.button("Clear scenarios", use_container_width=True, disabled=edited.empty):
+        st.session_state.scenario_rows = []
+        st.session_state.scenario_editor += 1
+        st.rerun(scope="fragment")
+
+    complete = edited.dropna(subset=SCENARIO_FIELDS)
+    valid = complete[(complete["current_age"] < complete["retirement_age"])
+                     & (complete["retirement_age"] < 90)]
+    if len(valid) < len(edited):
+        st.warning("Rows with missing values or a retirement age outside (age, 90) are skipped.")
+
+    scenarios = [
+        {**row, "current_age": int(row["current_age"]), "retirement_age": int(row["retirement_age"]),
+         "risk": int(row["risk"]), "fd_lockin": bool(row["fd_lockin"])}
+        for row in valid.to_dict("records")
+    ]
+
+    if scenarios:
+        keys = [scenario_key(scenario, inputs["compounding"]) for scenario in scenarios]
+        known = st.session_state.scenario_results
+        stale = [i for i, key in enumerate(keys) if key not in known]
+        if stale:
+            with prof.span(f"evaluate_scenarios ({len(stale)} changed)"):
+                fresh = evaluate_scenarios([scenarios[i] for i in stale],
+                                           compounding=inputs["compounding"])
+            known.update({keys[i]: result for i, result in zip(stale, fresh)})
+        st.session_state.scenario_results = {key: known[key] for key in keys}
+        results = [known[key] for key in keys]
+        labels = [f"{i + 1}. {scenario['name'] or 'Scenario'}" for i, scenario in enumerate(scenarios)]
+
+        summary_tab, charts_tab, ledgers_tab = st.tabs(["Summary", "Charts", "Ledgers"])
+
+        with summary_tab:
+            st.dataframe(
+                pd.DataFrame({
+                    "Scenario": labels,
+                    "Strategy": ["FD Lock-In" if s["fd_lockin"] else "Portfolio" for s in scenarios],
+                    "Retire at": [s["retirement_age"] for s in scenarios],
+                    "Required corpus (₹ Cr)": [round(r["required_corpus"] / 1e7, 2) for r in results],
+                    "Required SIP (₹)": [r["required_sip"] for r in results],
+                    "Current SIP (₹)": [int(s["current_monthly_investment"]) for s in scenarios],
+                    "Minimum start SIP (₹)": [r["min_start_sip"] for r in results],
+                    "Catch-up": [r["status"] for r in results],
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+
+        with charts_tab, prof.span("scenario charts", "chart"):
+            alt = altair()
+            sip_df = pd.DataFrame({
+                "Scenario": labels,
+                "Required SIP (₹)": [r["required_sip"] for r in results],
+                "Current SIP (₹)": [s["current_monthly_investment"] for s in scenarios],
+            })
+            bars = alt.Chart(sip_df).mark_bar(color="#10b981").encode(
+                x=alt.X("Scenario:N", sort=labels, axis=alt.Axis(labelAngle=0, labelLimit=160)),
+                y="Required SIP (₹):Q",
+                tooltip=["Scenario:N", "Required SIP (₹):Q", "Current SIP (₹):Q"]
+            )
+            ticks = alt.Chart(sip_df).mark_tick(color="#facc15", thickness=3, size=40).encode(
+                x=alt.X("Scenario:N", sort=labels),
+                y="Current SIP (₹):Q"
+            )
+            st.altair_chart((bars + ticks).properties(height=280), use_container_width=True)
+            st.caption("Bars: required monthly SIP. Yellow ticks: the SIP each scenario invests today.")
+
+            balances = pd.concat([
+                result["ledger"][["Age", "Closing balance"]].assign(Scenario=label)
+                for label, result in zip(labels, results)
+            ], ignore_index=True)
+            lines = alt.Chart(balances).mark_line(strokeWidth=2.5).encode(
+                x=alt.X("Age:Q", scale=alt.Scale(zero=False)),
+                y=alt.Y("Closing balance:Q", title="Corpus (₹)"),
+                color=alt.Color("Scenario:N", sort=labels),
+                tooltip=["Scenario:N", "Age:Q", "Closing balance:Q"]
+            ).properties(height=320)
+            st.altair_chart(lines, use_container_width=True)
+            st.caption("Corpus each year when the required SIP is invested until retirement.")
+
+        with ledgers_tab:
+            chosen = st.selectbox("Scenario", labels)
+            st.dataframe(results[labels.index(chosen)]["ledger"], hide_index=True,
+                         use_container_width=True, height=360)
+
+
+scenario_section(inputs)
+
+render_profile_panel(prof)
@@ -1,16 +1,14 @@
-def estimate_life_premium(life_gap: float, age: int) -> tuple:
- 
-    if life_gap <= 0:
+from assumptions import BandTable, InsuranceRules, current_assumptions
+
+
+def _estimate_premium(gap: float, age: int, rate_bands: BandTable, cover_unit: float) -> tuple:
+
+    if gap <= 0:
         return (0, 0)
 
-    units = life_gap / 10_00_000
+    units = gap / cover_unit
 
-    if age < 30:
-        rate_range = (500, 800)
-    elif age <= 45:
-        rate_range = (800, 1200)
-    else:
-        rate_range = (1500, 2500)
+    rate_range = rate_bands.lookup(age)
 
     low = round(units * rate_range[0])
     high = round(units * rate_range[1])
@@ -18,22 +16,11 @@ def estimate_life_premium(life_gap: float, age: int) -> tuple:
     return (low, high)
 
 
-def estimate_health_premium(health_gap: float, age: int) -> tuple:
-
-
-    if health_gap <= 0:
-        return (0, 0)
+def estimate_life_premium(life_gap: float, age: int, rules: InsuranceRules = None) -> tuple:
+    rules = rules or current_assumptions().insurance
+    return _estimate_premium(life_gap, age, rules.life_premium_rates, rules.premium_cover_unit)
 
-    units = health_gap / 10_00_000
 
-    if age < 30:
-        rate_range = (6000, 8000)
-    elif age <= 45:
-        rate_range = (8000, 12000)
-    else:
-        rate_range = (15000, 25000)
-
-    low = round(units * rate_range[0])
-    high = round(units * rate_range[1])
-
-    return (low, high)
+def estimate_health_premium(health_gap: float, age: int, rules: InsuranceRules = None) -> tuple:
+    rules = rules or current_assumptions().insurance
+    return _estimate_premium(health_gap, age, rules.health_premium_rates, rules.premium_cover_unit)
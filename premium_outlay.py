@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from assumptions import (
+    Band, BandTable, InsuranceRules, band_labels, compile_bands, current_assumptions,
+)
+from insurance_batch import estimate_health_premium_batch, estimate_life_premium_batch
+
+PERCENTILES = (50, 90, 99)
+
+OUTLAY_INPUTS = ["current_age", "city_tier", "life_gap", "health_gap"]
+_SUMS = ["life_premium_low", "life_premium_high", "health_premium_low", "health_premium_high",
+         "total_premium_low", "total_premium_high"]
+
+
+def rate_bands(rules: InsuranceRules) -> BandTable:
+    # Age bands split at every age where a life or a health premium rate
+    # changes; the band values are the band numbers
+    bounds = {}
+    for table in (rules.life_premium_rates, rules.health_premium_rates):
+        for edge, band in zip(table.edges, table.bands):
+            bounds[edge] = Band(band.upper, band.inclusive, None)
+    bands = [bounds[edge] for edge in sorted(bounds)] + [Band(None, False, None)]
+    return compile_bands(tuple(Band(band.upper, band.inclusive, i)
+                               for i, band in enumerate(bands)))
+
+
+# ============================================================
+# GROUPED PREMIUM OUTLAY OVER A BOOK
+# ============================================================
+# Feed chunks of a book to add() as they are read. Each chunk goes through
+# the batch premium estimators once; per (age band, city tier) group only
+# running sums are kept, plus each customer's total (life + health) low and
+# high premium when percentiles are asked for. Pass percentiles=() to keep
+# memory constant in the size of the book.
+
+class PremiumOutlay:
+    def __init__(self, *, age_bands: BandTable = None, percentiles=PERCENTILES,
+                 rules: InsuranceRules = None):
+        self.rules = rules or current_assumptions().insurance
+        # By default no group straddles an age where a premium rate changes
+        self.age_bands = age_bands or rate_bands(self.rules)
+        self.percentiles = tuple(percentiles)
+        self._sums = None
+        self._totals = {}   # (band, city tier) -> list of (k, 2) arrays
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        missing = [c for c in OUTLAY_INPUTS if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Premium outlay needs the columns: {', '.join(missing)}")
+        # Rows the batch CLI could not plan have no gaps and are left out
+        chunk = chunk.dropna(subset=["life_gap", "health_gap"])
+
+        age = chunk["current_age"].to_numpy()
+        life_low, life_high = estimate_life_premium_batch(chunk["life_gap"], age, rules=self.rules)
+        health_low, health_high = estimate_health_premium_batch(chunk["health_gap"], age,
+                                                                rules=self.rules)
+        frame = pd.DataFrame({
+            "band": self.age_bands.index_batch(age),
+            # Missing tiers get their own group rather than being dropped
+            "city_tier": chunk["city_tier"].fillna("Unknown").astype(str).to_numpy(),
+            "customers": 1,
+            "life_premium_low": life_low,
+            "life_premium_high": life_high,
+            "health_premium_low": health_low,
+            "health_premium_high": health_high,
+            "total_premium_low": life_low + health_low,
+            "total_premium_high": life_high + health_high,
+        })
+        grouped = frame.groupby(["band", "city_tier"], sort=False)
+
+        sums = grouped[["customers", *_SUMS]].sum()
+        self._sums = sums if self._sums is None else self._sums.add(sums, fill_value=0)
+
+        if self.percentiles:
+            totals = frame[["total_premium_low", "total_premium_high"]].to_numpy()
+            for key, rows in grouped.indices.items():
+                self._totals.setdefault(key, []).append(totals[rows])
+
+    def _percentile_columns(self, parts: list) -> dict:
+        if not self.percentiles:
+            return {}
+        totals = np.concatenate(parts)
+        columns = {}
+        for p, (low, high) in zip(self.percentiles,
+                                  np.percentile(totals, self.percentiles, axis=0)):
+            columns[f"total_premium_low_p{p:g}"] = low
+            columns[f"total_premium_high_p{p:g}"] = high
+        return columns
+
+    def result(self) -> pd.DataFrame:
+        # One row per age band and city tier, in band order, then an "All"
+        # row for the whole book. Sums are yearly premium outlay in rupees.
+        if self._sums is None:
+            raise ValueError("No rows were added")
+        labels = band_labels(self.age_bands.bands, "years")
+        sums = self._sums.sort_index().astype(np.int64)
+
+        rows = [
+            {"age_band": labels[band], "city_tier": tier, **row,
+             **self._percentile_columns(self._totals.get((band, tier)))}
+            for (band, tier), row in sums.iterrows()
+        ]
+        rows.append({"age_band": "All", "city_tier": "All", **sums.sum(),
+                     **self._percentile_columns([t for parts in self._totals.values()
+                                                 for t in parts])})
+        return pd.DataFrame(rows)
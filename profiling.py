@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Opt in with SIMULATOR_PROFILE=1 for every session, or ?profile=1 per session
+PROFILE_ENV = "SIMULATOR_PROFILE"
+PROFILE_LOG = Path(os.environ.get("SIMULATOR_PROFILE_LOG",
+                                  Path(__file__).parent / "logs" / "profile.jsonl"))
+PROFILE_LOG_BYTES = 1_000_000
+PROFILE_LOG_BACKUPS = 5
+
+_TRUE = ("1", "true", "yes", "on")
+
+
+def _span_logger() -> logging.Logger:
+    # One handler per process; pages are re-executed on every rerun
+    logger = logging.getLogger("simulator.profile")
+    if not logger.handlers:
+        PROFILE_LOG.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(PROFILE_LOG, maxBytes=PROFILE_LOG_BYTES,
+                                      backupCount=PROFILE_LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class Profiler:
+    # Collects timing spans for one rerun of a page. When disabled, span()
+    # costs one attribute check.
+    def __init__(self, page: str, enabled: bool):
+        self.page = page
+        self.enabled = enabled
+        self.spans = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "engine"):
+        # kind groups spans in the breakdown: "engine", "data" or "chart"
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({"span": name, "kind": kind,
+                               "ms": (time.perf_counter() - start) * 1000})
+
+    def breakdown(self) -> "pd.DataFrame":
+        # pandas is only needed when profiling is on
+        import pandas as pd
+
+        total = (time.perf_counter() - self._start) * 1000
+        table = pd.DataFrame(self.spans, columns=["span", "kind", "ms"])
+        table = pd.concat([table, pd.DataFrame([
+            {"span": "other page code", "kind": "page",
+             "ms": max(total - table["ms"].sum(), 0.0)},
+            {"span": "rerun total", "kind": "total", "ms": total},
+        ])], ignore_index=True)
+        table["share"] = table["ms"] / total
+        return table
+
+    def flush(self, breakdown: "pd.DataFrame"):
+        logger = _span_logger()
+        run = uuid.uuid4().hex[:12]
+        ts = time.time()
+        for row in breakdown.itertuples(index=False):
+            logger.info(json.dumps({"ts": ts, "page": self.page, "run": run, "span": row.span,
+                                    "kind": row.kind, "ms": round(row.ms, 3)}))
+
+
+def start_profiling(page: str) -> Profiler:
+    enabled = (os.environ.get(PROFILE_ENV, "").lower() in _TRUE
+               or st.query_params.get("profile", "").lower() in _TRUE)
+    return Profiler(page, enabled)
+
+
+def render_profile_panel(profiler: Profiler):
+    # Call last on the page so the rerun total covers everything above it
+    if not profiler.enabled:
+        return
+    breakdown = profiler.breakdown()
+    profiler.flush(breakdown)
+    with st.expander(f"Rerun profile ({breakdown['ms'].iloc[-1]:.0f} ms)"):
+        st.dataframe(
+            breakdown,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "ms": st.column_config.NumberColumn("Time (ms)", format="%.2f"),
+                "share": st.column_config.ProgressColumn("Share", min_value=0.0, max_value=1.0,
+                                                         format="percent"),
+            },
+        )
+        st.caption(f"Spans are also appended to {PROFILE_LOG}")
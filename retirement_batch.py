@@ -0,0 +1,262 @@
+import numpy as np
+
+from assumptions import resolve
+from retirement_engine import portfolio_return
+
+
+# ============================================================
+# BATCH ENGINES — ONE ELEMENT PER CLIENT PROFILE
+# ============================================================
+# Every function here mirrors the scalar version in retirement_engine and
+# matches it element-wise. Horizons may differ per profile; the closed-form
+# annuity factors take a per-element number of years, so nothing loops over
+# years. Assumption arguments left as None come from the current assumptions.
+
+def portfolio_return_batch(risk, *, risk_alloc: dict = None,
+                           asset_returns: dict = None) -> np.ndarray:
+    risk_alloc, asset_returns = resolve(risk_alloc=risk_alloc, asset_returns=asset_returns)
+    table = np.full(max(risk_alloc) + 1, np.nan)
+    for level in risk_alloc:
+        table[level] = portfolio_return(level, risk_alloc=risk_alloc,
+                                        asset_returns=asset_returns)
+    return table[np.asarray(risk, dtype=np.int64)]
+
+
+def monthly_factor_batch(annual_return) -> np.ndarray:
+    # Value of 12 month-end payments of 1 relative to one payment of 12 at
+    # year end. Converts annual-step annuity values to monthly-step ones.
+    annual_return = np.asarray(annual_return, dtype=float)
+    monthly = (1 + annual_return) ** (1 / 12) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(annual_return == 0, 1.0, annual_return / (12 * monthly))
+
+
+def growing_annuity_pv_batch(first_withdrawal, r, years, *,
+                             inflation: float = None,
+                             compounding: str = "annual") -> np.ndarray:
+    inflation = resolve(inflation=inflation)
+    first_withdrawal, r, years = np.broadcast_arrays(
+        np.asarray(first_withdrawal, dtype=float),
+        np.asarray(r, dtype=float),
+        np.asarray(years, dtype=np.int64),
+    )
+    level = np.abs(r - inflation) < 1e-12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = (1 + inflation) / (1 + r)
+        pv = np.where(
+            level,
+            first_withdrawal * years / (1 + r),
+            first_withdrawal * (1 - q ** years) / (r - inflation),
+        )
+    if compounding == "monthly":
+        # Monthly withdrawals of first_withdrawal / 12 leave the corpus
+        # earlier than one year-end withdrawal
+        pv = pv * monthly_factor_batch(r)
+    elif compounding != "annual":
+        raise ValueError(f"Unknown compounding {compounding!r}; use 'annual' or 'monthly'")
+    # The scalar solver falls back to bisection for negative values, which
+    # converges to zero.
+    return np.where(years > 0, np.maximum(pv, 0.0), 0.0)
+
+
+def required_corpus_portfolio_batch(monthly_expense_today, years_to_ret,
+                                    retirement_years, risk, *,
+                                    inflation: float = None,
+                                    risk_alloc: dict = None,
+                                    asset_returns: dict = None,
+                                    compounding: str = "annual") -> np.ndarray:
+    inflation, risk_alloc, asset_returns = resolve(inflation=inflation, risk_alloc=risk_alloc,
+                                                   asset_returns=asset_returns)
+    annual = np.asarray(monthly_expense_today, dtype=float) * 12 * (
+        (1 + inflation) ** np.asarray(years_to_ret, dtype=float))
+    r = portfolio_return_batch(risk, risk_alloc=risk_alloc, asset_returns=asset_returns)
+    return growing_annuity_pv_batch(annual, r, retirement_years, inflation=inflation,
+                                    compounding=compounding)
+
+
+def required_corpus_fd_lockin_batch(monthly_expense_today, years_to_ret,
+                                    retirement_years, *,
+                                    inflation: float = None,
+                                    post_ret_return: float = None,
+                                    compounding: str = "annual") -> np.ndarray:
+    inflation, post_ret_return = resolve(inflation=inflation, post_ret_return=post_ret_return)
+    annual = np.asarray(monthly_expense_today, dtype=float) * 12 * (
+        (1 + inflation) ** np.asarray(years_to_ret, dtype=float))
+    return growing_annuity_pv_batch(annual, post_ret_return, retirement_years,
+                                    inflation=inflation, compounding=compounding)
+
+
+def required_monthly_sip_batch(required_corpus, current_savings, years, annual_return, *,
+                               compounding: str = "annual", step_up: float = 0.0) -> np.ndarray:
+    # Whole rupees, rounded up, as floats. Where the scalar engine raises (a shortfall
+    # with no years left to invest) the element is NaN, so one such profile
+    # does not fail the batch.
+    required_corpus, current_savings, years, annual_return = np.broadcast_arrays(
+        np.asarray(required_corpus, dtype=float),
+        np.asarray(current_savings, dtype=float),
+        np.asarray(years, dtype=np.int64),
+        np.asarray(annual_return, dtype=float),
+    )
+    shortfall = required_corpus - current_savings * (1 + annual_return) ** years
+    unsolvable = (shortfall > 0) & (years <= 0)
+
+    if compounding == "annual":
+        factor = np.full(years.shape, 12.0)
+    elif compounding == "monthly":
+        factor = 12 * monthly_factor_batch(annual_return)
+    else:
+        raise ValueError(f"Unknown compounding {compounding!r}; use 'annual' or 'monthly'")
+
+    level = np.abs(annual_return - step_up) < 1e-12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(
+            level,
+            years * (1 + annual_return) ** (years - 1),
+            ((1 + annual_return) ** years - (1 + step_up) ** years) / (annual_return - step_up),
+        )
+        sip = np.ceil(shortfall / (factor * annuity))
+    return np.where(unsolvable, np.nan, np.where(shortfall > 0, sip, 0.0))
+
+
+def min_start_sip_for_overshoot_batch(required_sip, years, stepup,
+                                      overshoot_factor: float = 1.10) -> np.ndarray:
+    # NaN required SIPs stay NaN
+    required_sip = np.asarray(required_sip, dtype=float)
+    years = np.maximum(np.asarray(years, dtype=np.int64), 0)
+    cap = required_sip * overshoot_factor
+    return np.trunc(np.minimum(cap / (1 + stepup) ** years, required_sip))
+
+
+def retirement_plan_batch(monthly_expense_today, years_to_ret, retirement_years,
+                          risk, current_savings, *, fd_lockin=False,
+                          inflation: float = None,
+                          post_ret_return: float = None,
+                          max_sip_growth: float = None,
+                          risk_alloc: dict = None,
+                          asset_returns: dict = None,
+                          compounding: str = "annual") -> dict:
+    # Resolved once so every part of the plan uses the same assumptions
+    inflation, post_ret_return, max_sip_growth, risk_alloc, asset_returns = resolve(
+        inflation=inflation, post_ret_return=post_ret_return, max_sip_growth=max_sip_growth,
+        risk_alloc=risk_alloc, asset_returns=asset_returns)
+    monthly_expense_today, years_to_ret, retirement_years, risk, current_savings, fd_lockin = (
+        np.broadcast_arrays(
+            np.asarray(monthly_expense_today, dtype=float),
+            np.asarray(years_to_ret, dtype=np.int64),
+            np.asarray(retirement_years, dtype=np.int64),
+            np.asarray(risk, dtype=np.int64),
+            np.asarray(current_savings, dtype=float),
+            np.asarray(fd_lockin, dtype=bool),
+        )
+    )
+
+    required = np.where(
+        fd_lockin,
+        required_corpus_fd_lockin_batch(monthly_expense_today, years_to_ret,
+                                        retirement_years, inflation=inflation,
+                                        post_ret_return=post_ret_return,
+                                        compounding=compounding),
+        required_corpus_portfolio_batch(monthly_expense_today, years_to_ret,
+                                        retirement_years, risk, inflation=inflation,
+                                        risk_alloc=risk_alloc,
+                                        asset_returns=asset_returns,
+                                        compounding=compounding),
+    )
+    r_user = portfolio_return_batch(risk, risk_alloc=risk_alloc, asset_returns=asset_returns)
+    required_sip = required_monthly_sip_batch(required, current_savings, years_to_ret, r_user,
+                                              compounding=compounding)
+    min_start_sip = min_start_sip_for_overshoot_batch(required_sip, years_to_ret, max_sip_growth)
+
+    return {
+        "required_corpus": required,
+        "required_sip": required_sip,
+        "min_start_sip": min_start_sip,
+    }
+
+
+# ============================================================
+# SENSITIVITY GRID (RETIREMENT AGE x MONTHLY EXPENSE x RISK)
+# ============================================================
+
+def sensitivity_grid(current_age: int, current_savings: float, retirement_ages,
+                     monthly_expenses, risks, *, fd_lockin: bool = False,
+                     life_expectancy: int = 90,
+                     inflation: float = None,
+                     post_ret_return: float = None,
+                     risk_alloc: dict = None,
+                     asset_returns: dict = None,
+                     compounding: str = "annual") -> dict:
+    # One broadcasted evaluation; result arrays have shape
+    # (len(retirement_ages), len(monthly_expenses), len(risks)).
+    inflation, post_ret_return, risk_alloc, asset_returns = resolve(
+        inflation=inflation, post_ret_return=post_ret_return,
+        risk_alloc=risk_alloc, asset_returns=asset_returns)
+    ages = np.asarray(retirement_ages, dtype=np.int64)[:, None, None]
+    expenses = np.asarray(monthly_expenses, dtype=float)[None, :, None]
+    risks = np.asarray(risks, dtype=np.int64)[None, None, :]
+    if np.any(ages <= current_age):
+        raise ValueError("Every retirement age must be after the current age")
+
+    years_to_ret = ages - current_age
+    retirement_years = life_expectancy - ages
+    if fd_lockin:
+        required = required_corpus_fd_lockin_batch(expenses, years_to_ret, retirement_years,
+                                                   inflation=inflation,
+                                                   post_ret_return=post_ret_return,
+                                                   compounding=compounding)
+        required = np.broadcast_to(required, np.broadcast_shapes(required.shape, risks.shape))
+    else:
+        required = required_corpus_portfolio_batch(expenses, years_to_ret, retirement_years, risks,
+                                                   inflation=inflation, risk_alloc=risk_alloc,
+                                                   asset_returns=asset_returns,
+                                                   compounding=compounding)
+    r = portfolio_return_batch(risks, risk_alloc=risk_alloc, asset_returns=asset_returns)
+    # Every retirement age is after current_age, so every SIP is solvable
+    required_sip = required_monthly_sip_batch(required, current_savings, years_to_ret, r,
+                                              compounding=compounding).astype(np.int64)
+
+    return {"required_corpus": required, "required_sip": required_sip}
+
+
+# ============================================================
+# EARLIEST ACHIEVABLE RETIREMENT AGE
+# ============================================================
+
+RETIREMENT_STYLES = ("portfolio", "fd_lockin")
+
+
+def earliest_retirement_age(current_age: int, current_savings: float,
+                            current_monthly_investment: float, monthly_expense: float,
+                            risk: int, *, max_age: int = 75, life_expectancy: int = 90,
+                            inflation: float = None,
+                            post_ret_return: float = None,
+                            risk_alloc: dict = None,
+                            asset_returns: dict = None,
+                            compounding: str = "annual") -> dict:
+    # Required SIP for every retirement age from current_age + 1 to max_age,
+    # under both retirement styles, in one broadcasted pass. An age is
+    # feasible when today's monthly investment covers its required SIP.
+    # "earliest" maps each style to the first feasible age, or None.
+    ages = np.arange(current_age + 1, max_age + 1)
+    if ages.size == 0:
+        raise ValueError("current_age must be below max_age")
+
+    plan = retirement_plan_batch(
+        monthly_expense, ages - current_age, life_expectancy - ages, risk, current_savings,
+        fd_lockin=np.array([[False], [True]]),
+        inflation=inflation, post_ret_return=post_ret_return, risk_alloc=risk_alloc,
+        asset_returns=asset_returns, compounding=compounding,
+    )
+    required_sip = plan["required_sip"].astype(np.int64)
+    feasible = required_sip <= current_monthly_investment
+
+    return {
+        "retirement_ages": ages,
+        "required_corpus": dict(zip(RETIREMENT_STYLES, plan["required_corpus"])),
+        "required_sip": dict(zip(RETIREMENT_STYLES, required_sip)),
+        "feasible": dict(zip(RETIREMENT_STYLES, feasible)),
+        "earliest": {
+            style: int(ages[np.argmax(ok)]) if ok.any() else None
+            for style, ok in zip(RETIREMENT_STYLES, feasible)
+        },
+    }
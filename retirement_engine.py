@@ -0,0 +1,228 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from assumptions import current_assumptions
+
+# Assumption defaults live in assumptions.toml. Every engine argument left
+# as None is filled from the current assumptions when the engine is called;
+# these scalar engines run once per profile, so they check for None inline
+# instead of going through assumptions.resolve().
+_ASSUMPTION_NAMES = {
+    "INFLATION": "inflation",
+    "POST_RET_RETURN": "post_ret_return",
+    "MAX_SIP_GROWTH": "max_sip_growth",
+    "ASSET_RETURNS": "asset_returns",
+    "RISK_ALLOC": "risk_alloc",
+}
+
+
+def __getattr__(name):
+    # The old module constants now read the current assumptions
+    if name in _ASSUMPTION_NAMES:
+        return getattr(current_assumptions(), _ASSUMPTION_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ============================================================
+# RETIREMENT CORPUS ENGINES
+# ============================================================
+
+def portfolio_return(risk: int, *, risk_alloc: dict = None,
+                     asset_returns: dict = None) -> float:
+    if risk_alloc is None or asset_returns is None:
+        A = current_assumptions()
+        risk_alloc = A.risk_alloc if risk_alloc is None else risk_alloc
+        asset_returns = A.asset_returns if asset_returns is None else asset_returns
+    return sum(risk_alloc[risk][a] * asset_returns[a] for a in asset_returns)
+
+
+def growing_annuity_pv(first_withdrawal: float, r: float, years: int, *,
+                       inflation: float = None) -> float:
+    # Smallest corpus that funds `years` year-end withdrawals starting at
+    # `first_withdrawal` and growing with inflation, at a constant return r.
+    if inflation is None:
+        inflation = current_assumptions().inflation
+    if years <= 0:
+        return 0.0
+    if abs(r - inflation) < 1e-12:
+        return first_withdrawal * years / (1 + r)
+    q = (1 + inflation) / (1 + r)
+    return first_withdrawal * (1 - q ** years) / (r - inflation)
+
+
+def _bisect_corpus(annual, r, retirement_years, inflation):
+    # Original search, kept as a fallback for inputs the closed form can't handle
+    def survives(C):
+        E = annual
+        for _ in range(retirement_years):
+            C = C * (1 + r) - E
+            if C < 0:
+                return False
+            E *= (1 + inflation)
+        return True
+
+    lo, hi = 0, 1e11
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        hi = mid if survives(mid) else hi
+        lo = lo if survives(mid) else mid
+    return hi
+
+
+def _solve_corpus(annual, r, retirement_years, inflation):
+    try:
+        corpus = growing_annuity_pv(annual, r, retirement_years, inflation=inflation)
+    except OverflowError:
+        # Float ** raises instead of returning inf
+        corpus = math.inf
+    if not math.isfinite(corpus) or corpus < 0:
+        return _bisect_corpus(annual, r, retirement_years, inflation)
+    return corpus
+
+
+def monthly_rate(annual_return: float) -> float:
+    return (1 + annual_return) ** (1 / 12) - 1
+
+
+def growing_annuity_pv_monthly(first_monthly_withdrawal: float, r: float, years: int, *,
+                               inflation: float = None) -> float:
+    # Monthly-step version of growing_annuity_pv: 12 * years month-end
+    # withdrawals, raised with inflation once a year, discounted at the
+    # monthly equivalent of r.
+    if inflation is None:
+        inflation = current_assumptions().inflation
+    if years <= 0:
+        return 0.0
+    months = 12 * years
+    discount = np.cumprod(np.full(months, 1 / (1 + monthly_rate(r))))
+    withdrawals = first_monthly_withdrawal * (1 + inflation) ** (np.arange(months) // 12)
+    return max(float(withdrawals @ discount), 0.0)
+
+
+def _corpus(monthly_expense_today, years_to_ret, retirement_years, r, inflation, compounding):
+    annual = monthly_expense_today * 12 * ((1 + inflation) ** years_to_ret)
+    if compounding == "monthly":
+        return growing_annuity_pv_monthly(annual / 12, r, retirement_years, inflation=inflation)
+    if compounding == "annual":
+        return _solve_corpus(annual, r, retirement_years, inflation)
+    raise ValueError(f"Unknown compounding {compounding!r}; use 'annual' or 'monthly'")
+
+
+def required_corpus_portfolio(monthly_expense_today: float, years_to_ret: int,
+                              retirement_years: int, risk: int, *,
+                              inflation: float = None,
+                              risk_alloc: dict = None,
+                              asset_returns: dict = None,
+                              compounding: str = "annual") -> float:
+    A = current_assumptions()
+    inflation = A.inflation if inflation is None else inflation
+    r = portfolio_return(risk, risk_alloc=A.risk_alloc if risk_alloc is None else risk_alloc,
+                         asset_returns=A.asset_returns if asset_returns is None else asset_returns)
+    return _corpus(monthly_expense_today, years_to_ret, retirement_years, r, inflation, compounding)
+
+
+def required_corpus_fd_lockin(monthly_expense_today: float, years_to_ret: int,
+                              retirement_years: int, *,
+                              inflation: float = None,
+                              post_ret_return: float = None,
+                              compounding: str = "annual") -> float:
+    A = current_assumptions()
+    inflation = A.inflation if inflation is None else inflation
+    post_ret_return = A.post_ret_return if post_ret_return is None else post_ret_return
+    return _corpus(monthly_expense_today, years_to_ret, retirement_years,
+                   post_ret_return, inflation, compounding)
+
+
+# ============================================================
+# SIP + SUPPORTING ENGINES
+# ============================================================
+
+def contribution_factor(annual_return: float, compounding: str = "annual") -> float:
+    # Year-end value of one year of monthly contributions of 1 per month
+    if compounding == "annual":
+        return 12.0
+    if compounding == "monthly":
+        if annual_return == 0:
+            return 12.0
+        return annual_return / monthly_rate(annual_return)
+    raise ValueError(f"Unknown compounding {compounding!r}; use 'annual' or 'monthly'")
+
+
+def stepped_annuity_factor(annual_return: float, step_up: float, years: int) -> float:
+    # Sum over contribution years k of (1 + step_up)^k * (1 + r)^(years - 1 - k)
+    if years <= 0:
+        return 0.0
+    if abs(annual_return - step_up) < 1e-12:
+        return years * (1 + annual_return) ** (years - 1)
+    return ((1 + annual_return) ** years - (1 + step_up) ** years) / (annual_return - step_up)
+
+
+def required_monthly_sip(required_corpus: float, current_savings: float,
+                         years: int, annual_return: float, *,
+                         compounding: str = "annual", step_up: float = 0.0) -> int:
+    # First-year monthly SIP that grows current_savings into required_corpus.
+    # The SIP is raised by step_up every year. Rounded up to a whole rupee,
+    # so the plan never falls short of the corpus.
+    shortfall = required_corpus - current_savings * (1 + annual_return) ** years
+    if shortfall <= 0:
+        return 0
+    if years <= 0:
+        raise ValueError("A shortfall cannot be closed with no years left to invest")
+    factor = contribution_factor(annual_return, compounding)
+    return math.ceil(shortfall / (factor * stepped_annuity_factor(annual_return, step_up, years)))
+
+
+def min_start_sip_for_overshoot(required_sip: float, years: int, stepup: float,
+                                overshoot_factor: float = 1.10) -> int:
+    # Smallest start SIP that, stepped up every year, reaches the capped
+    # overshoot level (required_sip * overshoot_factor) within `years`.
+    cap = required_sip * overshoot_factor
+    return int(min(cap / (1 + stepup) ** max(years, 0), required_sip))
+
+
+@dataclass
+class CatchUpPlan:
+    min_start_sip: int
+    cap: int
+    cap_year: Optional[int]
+    path: np.ndarray
+
+
+def catch_up_plan(current_sip: float, required_sip: float, years: int,
+                  stepup: float = None,
+                  overshoot_factor: float = 1.10) -> CatchUpPlan:
+    # Path of monthly SIPs for years 1..years that starts at current_sip and
+    # steps up each year, never above the overshoot cap. cap_year is the
+    # 1-based year the SIP first reaches the cap, or None if it never does.
+    if stepup is None:
+        stepup = current_assumptions().max_sip_growth
+    cap = required_sip * overshoot_factor
+
+    # cumprod multiplies year by year, so a SIP landing exactly on the cap
+    # or on a whole rupee rounds the same as stepping it up by hand
+    stepped = np.cumprod(np.r_[current_sip, np.full(max(years - 1, 0), 1 + stepup)])[:max(years, 0)]
+    reached = np.flatnonzero(stepped >= cap)
+
+    # Year 1 is always today's SIP; later years are capped
+    path = np.minimum(stepped, cap)
+    path[:1] = stepped[:1]
+
+    return CatchUpPlan(
+        min_start_sip=min_start_sip_for_overshoot(required_sip, years, stepup, overshoot_factor),
+        cap=int(cap),
+        cap_year=int(reached[0]) + 1 if len(reached) else None,
+        path=path.astype(np.int64),
+    )
+
+
+def system_risk_level(current_age: int, retirement_age: int, is_behind: bool) -> int:
+    years = retirement_age - current_age
+    base = 4 if years > 25 else 3 if years > 15 else 2
+    return min(5, base + 1) if is_behind else base
+
+
+def blended_risk(user_risk: int, system_risk: int) -> int:
+    return max(1, min(5, round(0.6 * user_risk + 0.4 * system_risk)))
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from assumptions import resolve
+
+LEDGER_COLUMNS = [
+    "Age",
+    "Phase",
+    "Opening balance",
+    "Contribution",
+    "Growth",
+    "Withdrawal",
+    "Unfunded withdrawal",
+    "Closing balance",
+]
+
+
+def build_ledger(current_age: int, retirement_age: int, current_savings: float,
+                 monthly_sip: float, monthly_expense_today: float,
+                 accumulation_return: float, withdrawal_return: float, *,
+                 life_expectancy: int = 90, sip_step_up: float = 0.0,
+                 inflation: float = None) -> pd.DataFrame:
+    # One row per year of age from current_age to life_expectancy - 1.
+    # Contributions go in, and inflation-growing withdrawals come out, at
+    # year end, the same cash-flow timing the corpus and SIP engines use.
+    #
+    # Balances are closed form: with G_t = prod(1 + r_j) for j <= t and
+    # year-end cash flow cf_t, closing_t = G_t * (C0 + sum_{k<=t} cf_k / G_k).
+    # Once the corpus runs dry it stays at zero, and each withdrawal it
+    # could not pay is reported as unfunded.
+    inflation = resolve(inflation=inflation)
+    years = life_expectancy - current_age
+    accumulating = retirement_age - current_age
+    if years <= 0 or not 0 < accumulating <= years:
+        raise ValueError("Ages must satisfy current_age < retirement_age <= life_expectancy")
+
+    t = np.arange(years)
+    in_retirement = t >= accumulating
+    rate = np.where(in_retirement, withdrawal_return, accumulation_return)
+
+    contribution = np.where(in_retirement, 0.0, 12 * monthly_sip * (1 + sip_step_up) ** t)
+    first_withdrawal = monthly_expense_today * 12 * (1 + inflation) ** accumulating
+    needed = np.where(in_retirement, first_withdrawal * (1 + inflation) ** (t - accumulating), 0.0)
+
+    growth_factor = np.cumprod(1 + rate)
+    closing = growth_factor * (current_savings + np.cumsum((contribution - needed) / growth_factor))
+    opening = np.concatenate(([float(current_savings)], closing[:-1]))
+
+    depleted = np.maximum.accumulate(in_retirement & (closing < 0))
+    if depleted.any():
+        first = int(np.argmax(depleted))
+        opening[first + 1:] = 0.0
+        closing[depleted] = 0.0
+    growth = opening * rate
+    withdrawal = np.where(depleted, opening + growth, needed)
+
+    return pd.DataFrame({
+        "Age": (current_age + t).astype(np.uint8),
+        "Phase": pd.Categorical(np.where(in_retirement, "Retirement", "Accumulation"),
+                                categories=["Accumulation", "Retirement"]),
+        "Opening balance": np.round(opening).astype(np.int64),
+        "Contribution": np.round(contribution).astype(np.int64),
+        "Growth": np.round(growth).astype(np.int64),
+        "Withdrawal": np.round(withdrawal).astype(np.int64),
+        "Unfunded withdrawal": np.round(needed - withdrawal).astype(np.int64),
+        "Closing balance": np.round(closing).astype(np.int64),
+    }, columns=LEDGER_COLUMNS)
+
+
+def export_ledger(ledger: pd.DataFrame, path) -> Path:
+    # Format follows the file extension: .csv or .parquet
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        ledger.to_csv(path, index=False)
+    elif suffix == ".parquet":
+        try:
+            ledger.to_parquet(path, index=False)
+        except ImportError as exc:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from exc
+    else:
+        raise ValueError(f"Unsupported ledger format {suffix!r}; use .csv or .parquet")
+    return path
@@ -0,0 +1,80 @@
+import numpy as np
+
+from assumptions import current_assumptions
+from engine_cache import assumptions_fingerprint, canonical_key
+from retirement_batch import portfolio_return_batch, retirement_plan_batch
+from retirement_ledger import build_ledger
+
+LIFE_EXPECTANCY = 90
+MAX_SCENARIOS = 6
+
+# Inputs that define a scenario; "name" is only a label
+SCENARIO_FIELDS = [
+    "current_age",
+    "retirement_age",
+    "monthly_expense",
+    "current_savings",
+    "current_monthly_investment",
+    "risk",
+    "fd_lockin",
+]
+
+
+def scenario_key(scenario: dict, compounding: str = "annual") -> str:
+    # Changes whenever an input, the compounding mode or the assumptions change
+    return canonical_key({f: scenario[f] for f in SCENARIO_FIELDS}, compounding,
+                         assumptions_fingerprint("retirement"))
+
+
+def catch_up_status(current_sip: float, required_sip: int, min_start_sip: int) -> str:
+    # Same rule as the main plan: behind but above the minimum start SIP can
+    # still catch up by stepping up every year
+    if current_sip >= required_sip:
+        return "On track"
+    if current_sip >= min_start_sip:
+        return "Can catch up"
+    return "Cannot catch up"
+
+
+def evaluate_scenarios(scenarios: list, *, compounding: str = "annual") -> list:
+    # All scenarios go through one retirement_plan_batch call; ledgers are
+    # built per scenario. Returns one result dict per scenario, in order.
+    if not scenarios:
+        return []
+    column = {f: np.array([s[f] for s in scenarios]) for f in SCENARIO_FIELDS}
+    if np.any(column["retirement_age"] <= column["current_age"]) or \
+            np.any(column["retirement_age"] >= LIFE_EXPECTANCY):
+        raise ValueError(f"Each scenario needs current age < retirement age < {LIFE_EXPECTANCY}")
+
+    # Pinned for the whole call so the plan and the ledgers agree
+    A = current_assumptions()
+    years_to_ret = column["retirement_age"] - column["current_age"]
+    plan = retirement_plan_batch(
+        column["monthly_expense"], years_to_ret, LIFE_EXPECTANCY - column["retirement_age"],
+        column["risk"], column["current_savings"],
+        fd_lockin=column["fd_lockin"].astype(bool), inflation=A.inflation,
+        post_ret_return=A.post_ret_return, max_sip_growth=A.max_sip_growth,
+        risk_alloc=A.risk_alloc, asset_returns=A.asset_returns, compounding=compounding,
+    )
+    r = portfolio_return_batch(column["risk"], risk_alloc=A.risk_alloc,
+                               asset_returns=A.asset_returns)
+
+    results = []
+    for i, scenario in enumerate(scenarios):
+        required_sip = int(plan["required_sip"][i])
+        min_start_sip = int(plan["min_start_sip"][i])
+        results.append({
+            "required_corpus": float(plan["required_corpus"][i]),
+            "required_sip": required_sip,
+            "min_start_sip": min_start_sip,
+            "status": catch_up_status(scenario["current_monthly_investment"],
+                                      required_sip, min_start_sip),
+            "ledger": build_ledger(
+                int(scenario["current_age"]), int(scenario["retirement_age"]),
+                scenario["current_savings"], required_sip, scenario["monthly_expense"],
+                accumulation_return=float(r[i]),
+                withdrawal_return=A.post_ret_return if scenario["fd_lockin"] else float(r[i]),
+                life_expectancy=LIFE_EXPECTANCY, inflation=A.inflation,
+            ),
+        })
+    return results
@@ -0,0 +1,182 @@
+import bisect
+import os
+
+import numpy as np
+import pytest
+
+import assumptions
+from assumptions import ASSUMPTIONS_PATH, Band, compile_bands, load_assumptions
+
+
+def _load_edited(tmp_path, old, new):
+    text = ASSUMPTIONS_PATH.read_text(encoding="utf-8")
+    assert old in text
+    path = tmp_path / "assumptions.toml"
+    path.write_text(text.replace(old, new), encoding="utf-8")
+    return load_assumptions(path)
+
+
+def test_every_risk_level_has_an_equity_cap():
+    a = load_assumptions()
+    assert set(a.max_equity) == set(a.risk_alloc)
+    assert all(0 <= cap <= 1 for cap in a.max_equity.values())
+
+
+@pytest.mark.parametrize("old, new, message", [
+    ("5 = 0.90\n", "", "cap for every risk_allocation level"),
+    ("5 = 0.90\n", "5 = 1.5\n", "max_equity.5 must be at most 1"),
+    ("5 = 0.90\n", "5 = 0.90\nsix = 0.9\n", "must be a risk level number"),
+])
+def test_bad_equity_caps_are_rejected(tmp_path, old, new, message):
+    with pytest.raises(ValueError, match=message):
+        _load_edited(tmp_path, old, new)
+
+
+@pytest.mark.parametrize("old, new, message", [
+    ("inflation = 0.06", "inflation = \"high\"", "retirement.inflation must be a number"),
+    ("Savings = 0.01\n", "", "same assets as asset_returns"),
+    ("1 = { Equity = 0.25", "1 = { Equity = 0.35", "risk_allocation.1 weights must add up to 1"),
+    ("[retirement.risk_allocation]\n1 =", "[retirement.risk_allocation]\n7 =", "numbered 1, 2, 3"),
+    ("{ below = 3, value = 12 }", "{ below = 0, value = 12 }", "above the previous band"),
+    ("{ value = 15 }", "{ below = 5, value = 15 }", "last band and must not have a bound"),
+    ("[premiums]", "[premiums_typo]", "premiums is missing"),
+    ("Tier_2 = 250_000", "Tier_2 = 250_", "assumptions.toml"),
+])
+def test_invalid_files_are_rejected(tmp_path, old, new, message):
+    with pytest.raises(ValueError, match=message):
+        _load_edited(tmp_path, old, new)
+
+
+# ============================================================
+# HOT RELOAD
+# ============================================================
+
+@pytest.fixture
+def live_file(tmp_path, monkeypatch):
+    # A copy of the assumptions file that refresh_assumptions() watches
+    path = tmp_path / "assumptions.toml"
+    path.write_text(ASSUMPTIONS_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    monkeypatch.setattr(assumptions, "ASSUMPTIONS_PATH", path)
+    monkeypatch.setattr(assumptions, "_current", load_assumptions(path))
+    monkeypatch.setattr(assumptions, "_load_error", None)
+    return path
+
+
+def _write(path, text):
+    stat = path.stat()
+    path.write_text(text, encoding="utf-8")
+    # A save within the same mtime tick must still count as a change
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000))
+
+
+def _save(path, old, new):
+    text = path.read_text(encoding="utf-8")
+    assert old in text
+    _write(path, text.replace(old, new))
+
+
+def test_refresh_reloads_only_after_the_file_changes(live_file):
+    first = assumptions.refresh_assumptions()
+    assert assumptions.refresh_assumptions() is first
+    _save(live_file, "inflation = 0.06", "inflation = 0.07")
+    second = assumptions.refresh_assumptions()
+    assert second.inflation == 0.07 and first.inflation == 0.06
+    assert assumptions.current_assumptions() is second
+    assert assumptions.refresh_assumptions() is second
+
+
+def test_refresh_keeps_last_good_assumptions_while_file_is_missing(live_file):
+    good = assumptions.refresh_assumptions()
+    text = live_file.read_text(encoding="utf-8")
+    live_file.unlink()
+    with pytest.warns(RuntimeWarning, match="Keeping the last good assumptions"):
+        assert assumptions.refresh_assumptions() is good
+    assert "No such file" in assumptions.load_error()
+
+    live_file.write_text(text.replace("inflation = 0.06", "inflation = 0.07"), encoding="utf-8")
+    assert assumptions.refresh_assumptions().inflation == 0.07
+    assert assumptions.load_error() is None
+
+
+@pytest.mark.parametrize("old, new, message", [
+    # Half-saved, not TOML
+    ("[premiums]", "[premiums", "assumptions.toml"),
+    # Parses but fails validation
+    ("5 = 0.90\n", "", "cap for every risk_allocation level"),
+])
+def test_refresh_keeps_last_good_assumptions_for_a_broken_file(live_file, old, new, message):
+    good = assumptions.refresh_assumptions()
+    text = live_file.read_text(encoding="utf-8")
+    _save(live_file, old, new)
+    with pytest.warns(RuntimeWarning, match="Keeping the last good assumptions"):
+        assert assumptions.refresh_assumptions() is good
+    assert assumptions.current_assumptions() is good
+    assert message in assumptions.load_error()
+
+    _write(live_file, text)
+    assert assumptions.refresh_assumptions() is not good
+    assert assumptions.load_error() is None
+
+
+# ============================================================
+# SECTION FINGERPRINTS
+# ============================================================
+
+@pytest.mark.parametrize("old, new, changed", [
+    ("cover_unit = 1_000_000", "cover_unit = 2_000_000", "insurance"),
+    ("Tier_2 = 250_000", "Tier_2 = 300_000", "insurance"),
+    ("income_growth = 0.06", "income_growth = 0.05", "insurance"),
+    ("inflation = 0.06", "inflation = 0.065", "retirement"),
+    ("5 = 0.90", "5 = 0.85", "retirement"),
+])
+def test_editing_a_section_changes_only_its_fingerprint(tmp_path, old, new, changed):
+    before = load_assumptions()
+    after = _load_edited(tmp_path, old, new)
+    for section in assumptions.SECTIONS:
+        assert (before.fingerprint(section) != after.fingerprint(section)) == (section == changed)
+    assert before.fingerprint() != after.fingerprint()
+
+
+def test_comments_and_layout_do_not_change_fingerprints(tmp_path):
+    before = load_assumptions()
+    after = _load_edited(tmp_path, "inflation = 0.06", "inflation   =   0.060   # edited")
+    assert after.fingerprint() == before.fingerprint()
+
+
+# ============================================================
+# BAND TABLES
+# ============================================================
+
+def test_values_on_a_through_bound_stay_in_its_band():
+    # base_cover: below 30, through 45, then the open band
+    table = load_assumptions().insurance.health_base_cover
+    assert [table.lookup(age) for age in (29, 30, 45, 46)] == [
+        1_000_000, 1_500_000, 1_500_000, 2_500_000]
+    assert table.lookup(45.0) == 1_500_000
+    assert table.lookup(45.000001) == 2_500_000
+    assert table.lookup(29.999999) == 1_000_000
+    assert list(table.lookup_batch([29.999999, 30.0, 45.0, 45.000001])) == [
+        1_000_000, 1_500_000, 1_500_000, 2_500_000]
+
+
+@pytest.mark.parametrize("name", ["life_income_multiplier", "health_base_cover",
+                                  "health_family_buffer", "life_premium_rates",
+                                  "health_premium_rates"])
+def test_batch_lookups_match_scalar_lookup(name):
+    table = getattr(load_assumptions().insurance, name)
+    ages = np.arange(0, 121)
+    expected = np.array([table.lookup(int(age)) for age in ages])
+    # Integer input searches the integer edges, float input the float edges
+    for x in (ages, ages.astype(float)):
+        assert (table.lookup_batch(x) == expected).all()
+        assert (table.index_batch(x) == [bisect.bisect_right(table.edges, a) for a in ages]).all()
+
+
+@pytest.mark.parametrize("bands", [
+    (Band(2.5, True, 1), Band(None, False, 2)),
+    (Band(-3, False, 1), Band(0, True, 2), Band(7.5, False, 3), Band(None, False, 4)),
+])
+def test_integer_edges_handle_fractional_and_negative_bounds(bands):
+    table = compile_bands(bands)
+    xs = np.arange(-10, 11)
+    assert list(table.lookup_batch(xs)) == [table.lookup(int(x)) for x in xs]
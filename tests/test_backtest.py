@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from assumptions import current_assumptions
+from backtest import load_annual_returns, rolling_withdrawal_backtest
+
+
+def _loop_backtest(returns, corpus, first_withdrawal, retirement_years, risk):
+    # One window at a time, year by year: grow, then withdraw at year end
+    a = current_assumptions()
+    weights = a.risk_alloc[risk]
+    portfolio = [sum(row[asset] * w for asset, w in weights.items())
+                 for _, row in returns.iterrows()]
+    rows = []
+    for start in range(len(portfolio) - retirement_years + 1):
+        balance, withdrawal, funded = corpus, first_withdrawal, retirement_years
+        for year in range(retirement_years):
+            balance = balance * (1 + portfolio[start + year]) - withdrawal
+            withdrawal *= 1 + a.inflation
+            if balance < 0:
+                funded = year
+                break
+        failed = funded < retirement_years
+        rows.append((returns.index[start], 0.0 if failed else balance, failed, funded))
+    return rows
+
+
+def _random_returns(seed, years=60):
+    rng = np.random.default_rng(seed)
+    assets = list(current_assumptions().asset_returns)
+    return pd.DataFrame(rng.normal(0.06, 0.2, (years, len(assets))), columns=assets,
+                        index=pd.Index(range(1950, 1950 + years), name="Year"))
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("corpus, first_withdrawal, retirement_years, risk", [
+    (10_000_000, 400_000, 25, 3),
+    (10_000_000, 900_000, 30, 5),     # many windows run dry
+    (5_000_000, 100_000, 1, 1),
+    (5_000_000, 300_000, 60, 2),      # a single window
+])
+def test_backtest_matches_window_loop(seed, corpus, first_withdrawal, retirement_years, risk):
+    returns = _random_returns(seed)
+    result = rolling_withdrawal_backtest(returns, corpus, first_withdrawal, retirement_years, risk)
+    expected = _loop_backtest(returns, corpus, first_withdrawal, retirement_years, risk)
+
+    table = result.windows
+    assert len(table) == len(expected)
+    for (start, ending, failed, funded), row in zip(expected, table.itertuples(index=False)):
+        assert row[0] == start and row[2] == failed and row[3] == funded
+        assert row[1] == pytest.approx(ending, rel=1e-9, abs=1e-3)
+
+    endings = [e[1] for e in expected]
+    assert result.failure_rate == pytest.approx(np.mean([e[2] for e in expected]))
+    assert result.worst_ending_corpus == pytest.approx(min(endings), rel=1e-9, abs=1e-3)
+    assert result.median_ending_corpus == pytest.approx(np.median(endings), rel=1e-9, abs=1e-3)
+    worst = min(expected, key=lambda e: (e[3], e[1]))
+    assert result.worst_start_year == worst[0]
+
+
+def test_sample_returns_match_window_loop():
+    returns = load_annual_returns()
+    result = rolling_withdrawal_backtest(returns, 20_000_000, 800_000, 25, 3)
+    expected = _loop_backtest(returns, 20_000_000, 800_000, 25, 3)
+    assert result.windows["Years funded"].tolist() == [e[3] for e in expected]
+    assert result.windows["Ending corpus"].to_numpy() == pytest.approx(
+        [e[1] for e in expected], rel=1e-9, abs=1e-3)
+
+
+@pytest.mark.parametrize("retirement_years", [0, 1_000])
+def test_backtest_rejects_impossible_windows(retirement_years):
+    with pytest.raises(ValueError):
+        rolling_withdrawal_backtest(_random_returns(0), 1e7, 4e5, retirement_years, 3)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_cli import main, plan_chunk, run
+from retirement_batch import required_monthly_sip_batch
+
+GOOD = {
+    "current_age": 30, "retirement_age": 60, "monthly_expense": 50_000,
+    "current_savings": 1_000_000, "risk": 3, "annual_income": 1_200_000, "dependents": 2,
+    "existing_life_cover": 0, "existing_health_cover": 0, "city_tier": "Tier_1",
+}
+
+
+def _book(*changes):
+    # One good row followed by one row per change
+    return pd.DataFrame([GOOD] + [{**GOOD, **change} for change in changes])
+
+
+def test_sip_batch_is_nan_only_where_unsolvable():
+    sip = required_monthly_sip_batch([5e6, 5e6, 1e6], [0, 0, 2e6], [10, 0, 0], 0.08)
+    assert sip[0] > 0 and np.isnan(sip[1]) and sip[2] == 0
+
+
+@pytest.mark.parametrize("change, error", [
+    ({"retirement_age": 30}, "no years left to invest"),
+    ({"retirement_age": np.nan}, "missing or non-numeric retirement input"),
+    ({"monthly_expense": "lots"}, "missing or non-numeric retirement input"),
+    ({"risk": 9}, "risk must be one of"),
+    ({"retirement_age": 95}, "must not be above 90"),
+])
+def test_bad_retirement_row_does_not_fail_the_chunk(change, error):
+    out = plan_chunk(_book(change))
+    assert pd.isna(out["error"][0]) and out["required_sip"][0] > 0
+    assert error in out["error"][1]
+    assert out[["required_corpus", "required_sip", "min_start_sip"]].iloc[1].isna().all()
+    # The insurance group is planned independently
+    assert out["life_gap"][1] == out["life_gap"][0]
+
+
+def test_bad_insurance_row_keeps_retirement_results():
+    out = plan_chunk(_book({"dependents": np.nan}, {"existing_life_cover": -1}))
+    assert out["life_gap"].isna().tolist() == [False, True, True]
+    assert out["required_sip"].notna().all()
+    assert out["error"][2] == "insurance inputs must not be negative"
+
+
+def test_run_writes_bad_rows_and_replaces_output_on_success(tmp_path):
+    source, output = tmp_path / "book.csv", tmp_path / "plans.csv"
+    _book({"retirement_age": 30}).to_csv(source, index=False)
+    assert run(source, output) == 2
+    written = pd.read_csv(output)
+    assert written["error"].isna().tolist() == [True, False]
+    assert set(tmp_path.iterdir()) == {source, output}
+
+
+def test_failed_run_leaves_no_output(tmp_path):
+    source, output = tmp_path / "book.csv", tmp_path / "plans.csv"
+    pd.DataFrame({"unrelated": [1, 2]}).to_csv(source, index=False)
+    with pytest.raises(SystemExit):
+        main([str(source), str(output)])
+    assert set(tmp_path.iterdir()) == {source}
+
+
+@pytest.mark.parametrize("text, lockin", [("no", False), ("false", False), ("0", False),
+                                          ("", False), ("YES", True), ("true", True), ("1", True)])
+def test_fd_lockin_text_is_parsed(tmp_path, text, lockin):
+    source = tmp_path / "book.csv"
+    pd.DataFrame([{**GOOD, "fd_lockin": text}]).to_csv(source, index=False)
+    planned = plan_chunk(pd.read_csv(source))
+    expected = plan_chunk(pd.DataFrame([{**GOOD, "fd_lockin": lockin}]))
+    assert planned["required_corpus"][0] == expected["required_corpus"][0]
+
+
+def test_unknown_fd_lockin_is_a_row_error():
+    out = plan_chunk(_book({"fd_lockin": "maybe"}))
+    assert "fd_lockin must be" in out["error"][1] and pd.isna(out["required_sip"][1])
+    assert pd.isna(out["error"][0])
+
+
+@pytest.mark.parametrize("change, error", [
+    ({"current_age": 45.5}, "must be whole numbers"),
+    ({"retirement_age": 60.2}, "must be whole numbers"),
+    ({"risk": 2.5}, "must be whole numbers"),
+    ({"dependents": 2.7}, "current_age and dependents must be whole numbers"),
+])
+def test_fractional_counts_are_row_errors(change, error):
+    out = plan_chunk(_book(change))
+    assert error in out["error"][1]
+    assert pd.isna(out["error"][0])
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+
+import engine_cache
+from engine_cache import LRUCache, canonical_key, memoize
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(engine_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+# ============================================================
+# LRU CACHE
+# ============================================================
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    clock[0] += 9.9
+    assert cache.get("a") == (True, 1)
+    clock[0] += 0.1
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_without_ttl_never_expire(clock):
+    cache = LRUCache(maxsize=4, ttl=None)
+    cache.set("a", 1)
+    clock[0] += 1e9
+    assert cache.get("a") == (True, 1)
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=3, ttl=None)
+    for key in "abc":
+        cache.set(key, key)
+    cache.get("a")          # b is now the oldest
+    cache.set("c", "c2")    # overwriting counts as a use
+    cache.set("d", "d")
+    assert cache.get("b") == (False, None)
+    assert [cache.get(key) for key in "acd"] == [(True, "a"), (True, "c2"), (True, "d")]
+    cache.set("e", "e")     # a was used longest ago
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["size"] == 3
+
+
+def test_counts_hits_and_misses():
+    cache = LRUCache(maxsize=2, ttl=None)
+    cache.get("a")
+    cache.set("a", None)    # a cached None is still a hit
+    assert cache.get("a") == (True, None)
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats() == {"hits": 2, "misses": 2, "size": 1, "maxsize": 2, "ttl": None}
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 2, "ttl": None}
+
+
+# ============================================================
+# CANONICAL KEYS
+# ============================================================
+
+@pytest.mark.parametrize("a, b", [
+    (1, 1.0),
+    (np.int64(3), 3.0),
+    (np.float32(0.5), 0.5),
+    ({"x": 1, "y": [1, 2]}, {"y": (1.0, 2.0), "x": 1.0}),
+    ({"x": {"b": 1, "a": 2}}, {"x": {"a": 2, "b": 1}}),
+    (np.array([1, 2]), [1.0, 2.0]),
+    ({3, 1, 2}, [1, 2, 3]),
+])
+def test_equal_inputs_share_a_key(a, b):
+    assert canonical_key("f", a) == canonical_key("f", b)
+
+
+@pytest.mark.parametrize("a, b", [
+    (1, 2),
+    (True, 1),
+    ("1", 1),
+    (None, 0),
+    ({"x": 1}, {"y": 1}),
+    ([1, 2], [2, 1]),
+])
+def test_different_inputs_get_different_keys(a, b):
+    assert canonical_key("f", a) != canonical_key("f", b)
+
+
+def test_unsupported_types_are_rejected():
+    with pytest.raises(TypeError, match="object"):
+        canonical_key(object())
+
+
+# ============================================================
+# MEMOIZE
+# ============================================================
+
+def test_memoize_reuses_results_for_equivalent_calls():
+    calls = []
+
+    @memoize(maxsize=8, ttl=None, fingerprint=None)
+    def add(a, b=2):
+        calls.append((a, b))
+        return a + b
+
+    assert add(1) == add(1.0) == add(1, b=2) == add(a=1, b=2.0) == 3
+    assert add(1, 3) == 4
+    assert len(calls) == 2
+    assert add.cache.stats()["hits"] == 3
+
+
+def test_memoize_recomputes_when_fingerprint_changes():
+    fingerprint = ["v1"]
+    calls = []
+
+    @memoize(maxsize=8, ttl=None, fingerprint=lambda: fingerprint[0])
+    def double(x):
+        calls.append(x)
+        return 2 * x
+
+    double(5)
+    double(5)
+    fingerprint[0] = "v2"
+    double(5)
+    assert calls == [5, 5]
+    fingerprint[0] = "v1"   # entries under the old fingerprint are still there
+    double(5)
+    assert calls == [5, 5]
+
+
+def test_cached_engines_match_the_engines():
+    engine_cache.clear_caches()
+    args = (60_000, 25, 30, 3)
+    expected = engine_cache.retirement_engine.required_corpus_portfolio(*args)
+    assert engine_cache.required_corpus_portfolio(*args) == expected
+    assert engine_cache.required_corpus_portfolio(*args) == expected
+    stats = engine_cache.cache_stats()["required_corpus_portfolio"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
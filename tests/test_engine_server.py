@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+import engine_server
+from engine_server import EngineServer, RequestError
+
+PROFILE = {"current_age": 30, "retirement_age": 60, "monthly_expense": 50_000,
+           "current_savings": 1_000_000, "risk": 3}
+
+
+@pytest.fixture
+def server():
+    server = EngineServer(workers=1)
+    yield server
+    server.close()
+
+
+def _post(server, path, payload):
+    return asyncio.run(server.dispatch("POST", path, json.dumps(payload).encode()))
+
+
+@pytest.mark.parametrize("change, field", [
+    ({"current_age": -100_000}, "current_age"),
+    ({"retirement_age": 20}, "retirement_age"),
+    ({"monthly_expense": 1e300}, "monthly_expense"),
+    ({"current_savings": "lots"}, "current_savings"),
+    ({"risk": 9}, "risk"),
+])
+def test_out_of_range_retirement_fields_are_bad_requests(server, change, field):
+    with pytest.raises(RequestError) as exc:
+        _post(server, "/retirement", {**PROFILE, **change})
+    assert exc.value.status == 400 and field in str(exc.value)
+
+
+def test_batch_reports_bad_rows_without_failing(server):
+    result = _post(server, "/retirement/batch",
+                   {"profiles": [PROFILE, {**PROFILE, "retirement_age": 30}]})["results"]
+    assert result[0]["error"] is None and result[0]["required_sip"] > 0
+    assert result[1]["required_sip"] is None and "no years left" in result[1]["error"]
+
+
+def test_unexpected_errors_get_a_json_500(server, monkeypatch):
+    def broken(profile):
+        raise OverflowError("boom")
+    monkeypatch.setitem(engine_server.ROUTES, "/retirement", broken)
+
+    async def request():
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps(PROFILE).encode()
+            writer.write(b"POST /retirement HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s"
+                         % (len(body), body))
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    head, _, body = asyncio.run(request()).partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 500")
+    assert json.loads(body) == {"error": "Internal server error"}
+
+
+def test_batch_requests_do_not_block_other_requests(server):
+    async def send(port, raw):
+        # Returns the response and when its first line arrived
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        status = await reader.readline()
+        arrived = asyncio.get_running_loop().time()
+        await reader.read()
+        writer.close()
+        return status, arrived
+
+    async def requests():
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            body = json.dumps({"profiles": [PROFILE] * 100_000}).encode()
+            batch = asyncio.create_task(send(port, b"POST /retirement/batch HTTP/1.1\r\n"
+                                                  b"Connection: close\r\nContent-Length: %d\r\n\r\n%s"
+                                            % (len(body), body)))
+            await asyncio.sleep(0.2)  # let the batch body arrive and start planning
+            health = await send(port, b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+            return await batch, health
+
+    (batch, batch_arrived), (health, health_arrived) = asyncio.run(requests())
+    assert batch.startswith(b"HTTP/1.1 200") and health.startswith(b"HTTP/1.1 200")
+    assert health_arrived < batch_arrived
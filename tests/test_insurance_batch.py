@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from insurance_batch import (
+    estimate_health_premium_batch,
+    estimate_life_premium_batch,
+    insurance_gap_batch,
+    lifestyle_flags,
+)
+from insurance_gap import calculate_insurance_gap
+from insurance_inputs import InsuranceInputs
+from premium_estimator import estimate_health_premium, estimate_life_premium
+
+N = 2_000
+# Band edges from assumptions.toml (below 30, through 45) and their neighbours
+EDGE_AGES = [18, 29, 30, 31, 44, 45, 46, 70]
+TIERS = ["Tier_1", "Tier_2", "Tier_3", "Tier_4", "Metro", None]
+RISKS = ["smoking", "sedentary", "high_stress", "vaping", "night_shifts"]
+
+
+def _customers(seed: int) -> list:
+    # Random customers, with band-edge ages, zero incomes and covers, and
+    # tiers or risks the assumptions do not know
+    rng = np.random.default_rng(seed)
+    customers = []
+    for i in range(N):
+        risks = [r for r in RISKS if rng.random() < 0.3]
+        customers.append(InsuranceInputs(
+            age=int(EDGE_AGES[i % len(EDGE_AGES)] if i % 2 else rng.integers(18, 71)),
+            annual_income=0.0 if i % 7 == 0 else float(rng.integers(1, 400) * 12_500),
+            dependents=int(rng.integers(0, 7)),
+            existing_life_cover=0.0 if i % 5 == 0 else float(rng.integers(0, 80) * 250_000),
+            existing_health_cover=0.0 if i % 3 == 0 else float(rng.integers(0, 40) * 125_000),
+            city_tier=TIERS[int(rng.integers(0, len(TIERS)))],
+            lifestyle_risks=risks or (None if i % 2 else []),
+        ))
+    return customers
+
+
+def _batch(customers: list) -> dict:
+    column = lambda name: [getattr(c, name) for c in customers]
+    return insurance_gap_batch(
+        column("age"), column("annual_income"), column("dependents"),
+        column("existing_life_cover"), column("existing_health_cover"),
+        np.array(column("city_tier"), dtype=object),
+        lifestyle_flags(column("lifestyle_risks")),
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_gap_batch_matches_scalar(seed):
+    customers = _customers(seed)
+    batch = _batch(customers)
+    for i, inputs in enumerate(customers):
+        expected = calculate_insurance_gap(inputs)
+        for key, value in expected.items():
+            assert batch[key][i] == value, (key, inputs)
+
+
+def test_lifestyle_flags_ignore_unknown_risks():
+    flags = lifestyle_flags([["smoking", "vaping"], None, [], ["high_stress", "smoking"]])
+    assert set(flags) == {"smoking", "sedentary", "high_stress"}
+    assert flags["smoking"].tolist() == [True, False, False, True]
+    assert flags["high_stress"].tolist() == [False, False, False, True]
+    assert not flags["sedentary"].any()
+
+
+def test_unknown_tier_adds_nothing():
+    known = _batch([InsuranceInputs(35, 1e6, 1, 0, 0, "Tier_3")])
+    unknown = _batch([InsuranceInputs(35, 1e6, 1, 0, 0, "Tier_9")])
+    assert unknown["required_health_cover"][0] == known["required_health_cover"][0]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_premium_batch_matches_scalar(seed):
+    rng = np.random.default_rng(seed)
+    age = np.concatenate([EDGE_AGES, rng.integers(18, 71, N)])
+    # Whole cover units, exact halves of a rupee and zero gaps
+    gap = np.concatenate([np.zeros(len(EDGE_AGES)), rng.integers(0, 400, N) * 62_500.0])
+    gap[::11] = 0
+    gap[1::13] += 312.5
+
+    life_low, life_high = estimate_life_premium_batch(gap, age)
+    health_low, health_high = estimate_health_premium_batch(gap, age)
+    assert life_low.dtype == health_high.dtype == np.int64
+    for i, (g, a) in enumerate(zip(gap.tolist(), age.tolist())):
+        assert (life_low[i], life_high[i]) == estimate_life_premium(g, a)
+        assert (health_low[i], health_high[i]) == estimate_health_premium(g, a)
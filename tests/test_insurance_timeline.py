@@ -0,0 +1,83 @@
+import dataclasses
+
+import pytest
+
+from assumptions import current_assumptions
+from insurance_gap import calculate_insurance_gap
+from insurance_inputs import InsuranceInputs
+from insurance_timeline import coverage_timeline
+from premium_estimator import estimate_health_premium, estimate_life_premium
+
+CUSTOMERS = [
+    InsuranceInputs(age=27, annual_income=900_000, dependents=0, existing_life_cover=0,
+                    existing_health_cover=500_000, city_tier="Tier_1", lifestyle_risks=None),
+    InsuranceInputs(age=34, annual_income=2_400_000, dependents=3,
+                    existing_life_cover=10_000_000, existing_health_cover=1_000_000,
+                    city_tier="Tier_2", lifestyle_risks=["smoking", "high_stress"]),
+    InsuranceInputs(age=44, annual_income=6_000_000, dependents=2,
+                    existing_life_cover=200_000_000, existing_health_cover=9_000_000,
+                    city_tier="Metro", lifestyle_risks=["sedentary", "vaping"]),
+    InsuranceInputs(age=58, annual_income=0, dependents=1, existing_life_cover=0,
+                    existing_health_cover=0, city_tier=None, lifestyle_risks=[]),
+]
+
+
+@pytest.mark.parametrize("inputs", CUSTOMERS)
+def test_year_zero_matches_gap_and_premium_estimators(inputs):
+    timeline = coverage_timeline(inputs, 60 if inputs.age < 60 else 65)
+    gap = calculate_insurance_gap(inputs)
+    for key in ("required_life_cover", "required_health_cover", "life_gap", "health_gap"):
+        assert timeline[key][0] == gap[key], key
+    assert (timeline["life_premium_low"][0],
+            timeline["life_premium_high"][0]) == estimate_life_premium(gap["life_gap"], inputs.age)
+    assert (timeline["health_premium_low"][0],
+            timeline["health_premium_high"][0]) == estimate_health_premium(gap["health_gap"],
+                                                                           inputs.age)
+
+
+@pytest.mark.parametrize("inputs, independent_in", [
+    (inputs, independent_in)
+    for inputs in CUSTOMERS
+    for independent_in in [(), (0,), (5,), (3, 12, 12), (40,)]
+    if len(independent_in) <= inputs.dependents
+])
+def test_every_year_matches_scalar_engines(inputs, independent_in):
+    rules = current_assumptions().insurance
+    retirement_age = 60 if inputs.age < 60 else 65
+    timeline = coverage_timeline(inputs, retirement_age, independent_in=independent_in)
+    assert len(timeline["age"]) == retirement_age - inputs.age
+
+    for t in range(retirement_age - inputs.age):
+        # The customer t years from now, with cover needs from the scalar engines
+        year = dataclasses.replace(
+            inputs, age=inputs.age + t,
+            annual_income=inputs.annual_income * (1 + rules.income_growth) ** t,
+            dependents=inputs.dependents - sum(1 for y in independent_in if y <= t),
+        )
+        gap = calculate_insurance_gap(year)
+        required_health = gap["required_health_cover"] * (1 + rules.medical_inflation) ** t
+        health_gap = max(0, required_health - inputs.existing_health_cover)
+
+        assert timeline["age"][t] == year.age
+        assert timeline["dependents"][t] == year.dependents
+        assert timeline["required_life_cover"][t] == pytest.approx(gap["required_life_cover"])
+        assert timeline["life_gap"][t] == pytest.approx(gap["life_gap"])
+        assert timeline["required_health_cover"][t] == pytest.approx(required_health)
+        assert timeline["health_gap"][t] == pytest.approx(health_gap)
+
+        # Premiums on the timeline's own gaps, so rounding to whole rupees
+        # cannot tell them apart
+        life = estimate_life_premium(timeline["life_gap"][t], year.age)
+        health = estimate_health_premium(timeline["health_gap"][t], year.age)
+        assert (timeline["life_premium_low"][t], timeline["life_premium_high"][t]) == life
+        assert (timeline["health_premium_low"][t], timeline["health_premium_high"][t]) == health
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"retirement_age": 34}, "above the current age"),
+    ({"retirement_age": 60, "independent_in": (1, 2, 3, 4)}, "only 3"),
+    ({"retirement_age": 60, "independent_in": (-1,)}, "must not be negative"),
+])
+def test_timeline_rejects_bad_inputs(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        coverage_timeline(CUSTOMERS[1], **kwargs)
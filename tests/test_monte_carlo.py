@@ -0,0 +1,52 @@
+import itertools
+
+import pytest
+
+from assumptions import current_assumptions
+from monte_carlo import simulate_portfolio_withdrawal
+from retirement_engine import portfolio_return, required_corpus_portfolio, required_monthly_sip
+from retirement_ledger import build_ledger
+
+PROFILE = dict(monthly_expense_today=100_000, years_to_ret=38, retirement_years=30, risk=3,
+               current_savings=0)
+
+
+def _required_sip(p):
+    required = required_corpus_portfolio(p["monthly_expense_today"], p["years_to_ret"],
+                                         p["retirement_years"], p["risk"])
+    return required_monthly_sip(required, p["current_savings"], p["years_to_ret"],
+                                portfolio_return(p["risk"]))
+
+
+@pytest.mark.parametrize("years_to_ret, retirement_years, risk, savings", list(itertools.product(
+    (5, 20, 38), (10, 30), (1, 3, 5), (0, 3_000_000))))
+def test_zero_volatility_reproduces_the_deterministic_plan(years_to_ret, retirement_years,
+                                                          risk, savings):
+    p = {**PROFILE, "years_to_ret": years_to_ret, "retirement_years": retirement_years,
+         "risk": risk, "current_savings": savings}
+    sip = _required_sip(p)
+    still = {asset: 0.0 for asset in current_assumptions().volatility}
+    result = simulate_portfolio_withdrawal(**p, monthly_sip=sip, paths=50, volatility=still)
+    assert result.success_probability == 1.0
+
+    r = portfolio_return(risk)
+    ledger = build_ledger(22, 22 + years_to_ret, savings, sip, p["monthly_expense_today"],
+                          accumulation_return=r, withdrawal_return=r,
+                          life_expectancy=22 + years_to_ret + retirement_years)
+    for ending in result.ending_corpus_percentiles.values():
+        assert ending == pytest.approx(ledger["Closing balance"].iloc[-1], rel=1e-6, abs=100)
+
+    # Well below the required SIP the same plan runs dry on every path
+    short = simulate_portfolio_withdrawal(**{**p, "current_savings": 0}, monthly_sip=sip * 0.9,
+                                          paths=50, volatility=still)
+    assert short.success_probability == 0.0
+
+
+def test_same_seed_gives_identical_results():
+    sip = _required_sip(PROFILE)
+    runs = [simulate_portfolio_withdrawal(**PROFILE, monthly_sip=sip, paths=3_000, seed=7,
+                                          chunk_size=1_000) for _ in range(2)]
+    assert runs[0] == runs[1]
+    other = simulate_portfolio_withdrawal(**PROFILE, monthly_sip=sip, paths=3_000, seed=8,
+                                          chunk_size=1_000)
+    assert other.ending_corpus_percentiles != runs[0].ending_corpus_percentiles
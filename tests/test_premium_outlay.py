@@ -0,0 +1,108 @@
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from assumptions import Band, compile_bands, current_assumptions
+from premium_estimator import estimate_health_premium, estimate_life_premium
+from premium_outlay import PremiumOutlay
+
+TIERS = ["Tier_1", "Tier_2", "Metro", None]
+
+
+def _book(seed: int, n: int = 600) -> pd.DataFrame:
+    # Batch CLI output columns, with band-edge ages, zero gaps, missing
+    # tiers and rows the CLI could not plan
+    rng = np.random.default_rng(seed)
+    book = pd.DataFrame({
+        "current_age": rng.choice([18, 29, 30, 34, 35, 45, 46, 70], n),
+        "city_tier": rng.choice(np.array(TIERS, dtype=object), n),
+        "life_gap": rng.integers(0, 40, n) * 250_000.0,
+        "health_gap": rng.integers(0, 20, n) * 100_000.0,
+    })
+    book.loc[book.index % 17 == 0, ["life_gap", "health_gap"]] = np.nan
+    return book
+
+
+def _chunks(book: pd.DataFrame, n: int) -> list:
+    bounds = np.linspace(0, len(book), n + 1).astype(int)
+    return [book.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _expected(book: pd.DataFrame, rules, band_of) -> pd.DataFrame:
+    # Scalar premiums per customer, grouped with a plain pandas groupby
+    book = book.dropna(subset=["life_gap", "health_gap"])
+    life = [estimate_life_premium(g, a, rules)
+            for g, a in zip(book["life_gap"], book["current_age"])]
+    health = [estimate_health_premium(g, a, rules)
+              for g, a in zip(book["health_gap"], book["current_age"])]
+    frame = pd.DataFrame({
+        "age_band": book["current_age"].map(band_of).to_numpy(),
+        "city_tier": book["city_tier"].fillna("Unknown").to_numpy(),
+        "customers": 1,
+        "life_premium_low": [low for low, _ in life],
+        "life_premium_high": [high for _, high in life],
+        "health_premium_low": [low for low, _ in health],
+        "health_premium_high": [high for _, high in health],
+    })
+    frame["total_premium_low"] = frame["life_premium_low"] + frame["health_premium_low"]
+    frame["total_premium_high"] = frame["life_premium_high"] + frame["health_premium_high"]
+    return frame
+
+
+def _check(result: pd.DataFrame, frame: pd.DataFrame, percentiles):
+    grouped = frame.groupby(["age_band", "city_tier"])
+    sums = grouped[[c for c in frame.columns if c not in ("age_band", "city_tier")]].sum()
+    assert len(result) == len(sums) + 1
+    for _, row in result.iterrows():
+        if row["age_band"] == "All":
+            group, expected = frame, sums.sum()
+        else:
+            group = frame[(frame["age_band"] == row["age_band"])
+                          & (frame["city_tier"] == row["city_tier"])]
+            expected = sums.loc[(row["age_band"], row["city_tier"])]
+        for column, value in expected.items():
+            assert row[column] == value, (row["age_band"], row["city_tier"], column)
+        for p in percentiles:
+            for side in ("low", "high"):
+                assert row[f"total_premium_{side}_p{p:g}"] == pytest.approx(
+                    group[f"total_premium_{side}"].quantile(p / 100))
+
+
+def _default_band(age):
+    return "Below 30 years" if age < 30 else "30–45 years" if age <= 45 else "Above 45 years"
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("chunks", [1, 4, 7])
+def test_outlay_matches_groupby(seed, chunks):
+    book = _book(seed)
+    outlay = PremiumOutlay()
+    for chunk in _chunks(book, chunks):
+        outlay.add(chunk)
+    rules = current_assumptions().insurance
+    _check(outlay.result(), _expected(book, rules, _default_band), outlay.percentiles)
+
+
+def test_groups_split_where_either_premium_rate_changes():
+    rules = current_assumptions().insurance
+    # Life rates change at 35 instead of 30 and 45
+    life = compile_bands((Band(35, False, (600.0, 900.0)), Band(None, False, (1_400.0, 2_000.0))))
+    rules = dataclasses.replace(rules, life_premium_rates=life)
+    bands = {18: "Below 30 years", 29: "Below 30 years", 30: "30–34 years", 34: "30–34 years",
+             35: "35–45 years", 45: "35–45 years", 46: "Above 45 years", 70: "Above 45 years"}
+
+    book = _book(0)
+    outlay = PremiumOutlay(rules=rules, percentiles=(50,))
+    for chunk in _chunks(book, 3):
+        outlay.add(chunk)
+    result = outlay.result()
+    assert list(dict.fromkeys(result["age_band"])) == [
+        "Below 30 years", "30–34 years", "35–45 years", "Above 45 years", "All"]
+    _check(result, _expected(book, rules, bands.get), (50,))
+
+
+def test_outlay_without_rows_raises():
+    with pytest.raises(ValueError, match="No rows"):
+        PremiumOutlay().result()
@@ -0,0 +1,132 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import retirement_engine as engine
+from retirement_batch import (
+    RETIREMENT_STYLES,
+    earliest_retirement_age,
+    required_monthly_sip_batch,
+    retirement_plan_batch,
+    sensitivity_grid,
+)
+
+# Every combination, one element per profile
+PROFILES = np.array(list(itertools.product(
+    (20_000, 75_000, 250_000),      # monthly expense today
+    (1, 10, 25, 40),                # years to retirement
+    (5, 20, 35),                    # years in retirement
+    (1, 2, 3, 4, 5),                # risk
+    (0, 800_000, 20_000_000),       # current savings
+)), dtype=float).T
+
+
+@pytest.mark.parametrize("compounding, step_up", [("annual", 0.0), ("annual", 0.07),
+                                                  ("monthly", 0.0), ("monthly", 0.1)])
+def test_required_sip_batch_matches_scalar(compounding, step_up):
+    expense, years, _, risk, savings = PROFILES
+    corpus = expense * 250
+    r = np.array([engine.portfolio_return(int(level)) for level in risk])
+    batch = required_monthly_sip_batch(corpus, savings, years, r, compounding=compounding,
+                                       step_up=step_up)
+    scalar = [engine.required_monthly_sip(c, s, int(y), rate, compounding=compounding,
+                                          step_up=step_up)
+              for c, s, y, rate in zip(corpus, savings, years, r)]
+    np.testing.assert_array_equal(batch, scalar)
+
+
+@pytest.mark.parametrize("fd_lockin", (False, True))
+@pytest.mark.parametrize("compounding", ("annual", "monthly"))
+def test_retirement_plan_batch_matches_scalar(fd_lockin, compounding):
+    expense, years, retirement_years, risk, savings = PROFILES
+    plan = retirement_plan_batch(expense, years, retirement_years, risk, savings,
+                                 fd_lockin=fd_lockin, compounding=compounding)
+
+    for i, (e, y, ry, k, s) in enumerate(zip(expense, years.astype(int),
+                                             retirement_years.astype(int), risk.astype(int),
+                                             savings)):
+        if fd_lockin:
+            required = engine.required_corpus_fd_lockin(e, y, ry, compounding=compounding)
+        else:
+            required = engine.required_corpus_portfolio(e, y, ry, k, compounding=compounding)
+        sip = engine.required_monthly_sip(required, s, y, engine.portfolio_return(k),
+                                          compounding=compounding)
+        min_start = engine.min_start_sip_for_overshoot(sip, y, engine.MAX_SIP_GROWTH)
+
+        assert plan["required_corpus"][i] == pytest.approx(required, rel=1e-9, abs=1)
+        # The corpus differs in the last bits, which can move the SIP by a rupee
+        assert abs(plan["required_sip"][i] - sip) <= 1
+        assert abs(plan["min_start_sip"][i] - min_start) <= 1
+
+
+def _scalar_plan(monthly_expense, years_to_ret, retirement_years, risk, current_savings,
+                 fd_lockin, compounding):
+    if fd_lockin:
+        required = engine.required_corpus_fd_lockin(monthly_expense, years_to_ret,
+                                                    retirement_years, compounding=compounding)
+    else:
+        required = engine.required_corpus_portfolio(monthly_expense, years_to_ret,
+                                                    retirement_years, risk,
+                                                    compounding=compounding)
+    sip = engine.required_monthly_sip(required, current_savings, years_to_ret,
+                                      engine.portfolio_return(risk), compounding=compounding)
+    return required, sip
+
+
+@pytest.mark.parametrize("fd_lockin", (False, True))
+@pytest.mark.parametrize("compounding", ("annual", "monthly"))
+@pytest.mark.parametrize("current_age, current_savings", [
+    (30, 0), (42, 3_500_000), (58, 40_000_000)])
+def test_sensitivity_grid_matches_scalar(current_age, current_savings, fd_lockin, compounding):
+    ages = [current_age + 1, current_age + 7, 60, 89]
+    expenses = [15_000, 60_000, 310_000]
+    risks = [1, 3, 5]
+    grid = sensitivity_grid(current_age, current_savings, ages, expenses, risks,
+                            fd_lockin=fd_lockin, compounding=compounding)
+    assert grid["required_corpus"].shape == grid["required_sip"].shape == (4, 3, 3)
+
+    for (i, age), (j, expense), (k, risk) in itertools.product(
+            enumerate(ages), enumerate(expenses), enumerate(risks)):
+        required, sip = _scalar_plan(expense, age - current_age, 90 - age, risk,
+                                     current_savings, fd_lockin, compounding)
+        assert grid["required_corpus"][i, j, k] == pytest.approx(required, rel=1e-9, abs=1)
+        assert abs(grid["required_sip"][i, j, k] - sip) <= 1
+
+
+def test_sensitivity_grid_rejects_past_retirement_ages():
+    with pytest.raises(ValueError, match="after the current age"):
+        sensitivity_grid(40, 0, [40, 50], [50_000], [3])
+
+
+@pytest.mark.parametrize("compounding", ("annual", "monthly"))
+@pytest.mark.parametrize("current_age, current_savings, investment, expense, risk", [
+    (28, 0, 25_000, 50_000, 3),
+    (35, 2_000_000, 80_000, 90_000, 5),
+    (45, 15_000_000, 10_000, 40_000, 1),
+    (50, 0, 0, 30_000, 2),                      # never feasible
+    (60, 100_000_000, 0, 20_000, 4),            # feasible straight away
+])
+def test_earliest_retirement_age_matches_scalar(current_age, current_savings, investment,
+                                                expense, risk, compounding):
+    result = earliest_retirement_age(current_age, current_savings, investment, expense, risk,
+                                     compounding=compounding)
+    ages = list(range(current_age + 1, 76))
+    assert result["retirement_ages"].tolist() == ages
+
+    for style in RETIREMENT_STYLES:
+        fd_lockin = style == "fd_lockin"
+        plans = [_scalar_plan(expense, age - current_age, 90 - age, risk, current_savings,
+                              fd_lockin, compounding) for age in ages]
+        np.testing.assert_allclose(result["required_corpus"][style], [p[0] for p in plans],
+                                   rtol=1e-9, atol=1)
+        sips = np.array([p[1] for p in plans])
+        assert np.abs(result["required_sip"][style] - sips).max() <= 1
+        feasible = sips <= investment
+        assert result["feasible"][style].tolist() == feasible.tolist()
+        assert result["earliest"][style] == (ages[feasible.argmax()] if feasible.any() else None)
+
+
+def test_earliest_retirement_age_needs_ages_to_check():
+    with pytest.raises(ValueError, match="below max_age"):
+        earliest_retirement_age(75, 0, 10_000, 50_000, 3)
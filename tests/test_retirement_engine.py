@@ -0,0 +1,171 @@
+import itertools
+
+import pytest
+
+import retirement_engine
+from retirement_engine import _bisect_corpus, _solve_corpus, portfolio_return
+
+INFLATION = 0.06
+
+
+# ============================================================
+# CLOSED-FORM CORPUS VS THE ORIGINAL BISECTION
+# ============================================================
+
+@pytest.mark.parametrize("monthly_expense, retirement_years, risk", list(itertools.product(
+    (10_000, 55_000, 240_000), (1, 5, 20, 35), (1, 2, 3, 4, 5))))
+def test_closed_form_corpus_matches_bisection(monthly_expense, retirement_years, risk):
+    annual = monthly_expense * 12
+    r = portfolio_return(risk)
+    expected = _bisect_corpus(annual, r, retirement_years, INFLATION)
+    assert _solve_corpus(annual, r, retirement_years, INFLATION) == pytest.approx(expected, abs=1)
+
+
+@pytest.mark.parametrize("retirement_years", (1, 10, 30))
+def test_return_equal_to_inflation(retirement_years):
+    # The growing-annuity formula divides by r - inflation; this is the limit
+    annual = 600_000
+    expected = _bisect_corpus(annual, INFLATION, retirement_years, INFLATION)
+    assert _solve_corpus(annual, INFLATION, retirement_years, INFLATION) == \
+        pytest.approx(expected, abs=1)
+
+
+def test_no_retirement_years_needs_no_corpus():
+    assert _solve_corpus(600_000, 0.08, 0, INFLATION) == 0
+
+
+@pytest.mark.parametrize("bad", (float("nan"), float("inf"), -1.0))
+def test_falls_back_to_bisection(monkeypatch, bad):
+    monkeypatch.setattr(retirement_engine, "growing_annuity_pv", lambda *args, **kwargs: bad)
+    expected = _bisect_corpus(600_000, 0.08, 25, INFLATION)
+    assert _solve_corpus(600_000, 0.08, 25, INFLATION) == expected
+
+
+def test_overflowing_closed_form_falls_back_to_bisection():
+    # q ** years overflows here, so the closed form has no finite value
+    r, years = -0.9, 400
+    assert _solve_corpus(1_000, r, years, INFLATION) == _bisect_corpus(1_000, r, years, INFLATION)
+
+
+# ============================================================
+# REQUIRED SIP + MIN START SIP VS THE ORIGINAL LOOPS
+# ============================================================
+
+def _loop_required_sip(required_corpus, current_savings, years, annual_return):
+    # The year-by-year bisection required_monthly_sip replaced (annual mode)
+    lo, hi = 0, 300_000
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        C = current_savings
+        for _ in range(years):
+            C = C * (1 + annual_return) + 12 * mid
+        hi = mid if C >= required_corpus else hi
+        lo = lo if C >= required_corpus else mid
+    return int(hi)
+
+
+def _loop_min_start_sip(required_sip, years, stepup, overshoot_factor=1.10):
+    lo, hi = 0, required_sip
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        sip = mid
+        for _ in range(years):
+            sip = min(sip * (1 + stepup), required_sip * overshoot_factor)
+        hi = mid if sip >= required_sip * overshoot_factor else hi
+        lo = lo if sip >= required_sip * overshoot_factor else mid
+    return int(hi)
+
+
+def _simulate(sip, current_savings, years, annual_return, compounding, step_up):
+    # Corpus after `years`, contributing month by month or as 12 x SIP at year end
+    C = current_savings
+    monthly = retirement_engine.monthly_rate(annual_return)
+    for k in range(years):
+        payment = sip * (1 + step_up) ** k
+        if compounding == "monthly":
+            for _ in range(12):
+                C = C * (1 + monthly) + payment
+        else:
+            C = C * (1 + annual_return) + 12 * payment
+    return C
+
+
+SIP_CASES = list(itertools.product(
+    (2_000_000, 15_000_000, 60_000_000), (0, 500_000, 3_000_000), (3, 12, 30), (0.04, 0.087, 0.12)))
+
+
+@pytest.mark.parametrize("required_corpus, current_savings, years, annual_return", SIP_CASES)
+def test_required_sip_matches_loop(required_corpus, current_savings, years, annual_return):
+    expected = _loop_required_sip(required_corpus, current_savings, years, annual_return)
+    if expected >= 299_999:
+        pytest.skip("the old loop capped its answer at 300,000")
+    sip = retirement_engine.required_monthly_sip(required_corpus, current_savings, years,
+                                                 annual_return)
+    assert abs(sip - expected) <= 1
+
+
+@pytest.mark.parametrize("compounding, step_up", [("annual", 0.05), ("annual", 0.087),
+                                                  ("monthly", 0.0), ("monthly", 0.1)])
+@pytest.mark.parametrize("required_corpus, current_savings, years, annual_return", SIP_CASES[::5])
+def test_required_sip_is_smallest_sip_reaching_target(required_corpus, current_savings, years,
+                                                  annual_return, compounding, step_up):
+    # step_up 0.087 equals one of the returns, the level-annuity limit
+    sip = retirement_engine.required_monthly_sip(required_corpus, current_savings, years,
+                                                 annual_return, compounding=compounding,
+                                                 step_up=step_up)
+    simulate = lambda s: _simulate(s, current_savings, years, annual_return, compounding, step_up)
+    assert simulate(sip) >= required_corpus * (1 - 1e-12)
+    if sip > 0:
+        assert simulate(sip - 1) < required_corpus
+
+
+def test_required_sip_is_zero_without_shortfall():
+    assert retirement_engine.required_monthly_sip(1_000_000, 1_000_000, 10, 0.08) == 0
+    assert retirement_engine.required_monthly_sip(1_000_000, 5_000_000, 0, 0.08) == 0
+
+
+@pytest.mark.parametrize("years", (0, -3))
+def test_required_sip_without_years_raises(years):
+    with pytest.raises(ValueError, match="no years left"):
+        retirement_engine.required_monthly_sip(5_000_000, 0, years, 0.08)
+
+
+@pytest.mark.parametrize("required_sip, years, stepup", list(itertools.product(
+    (5_000, 48_000, 350_000), (0, 1, 7, 25), (0.0, 0.05, 0.15))))
+def test_min_start_sip_matches_loop(required_sip, years, stepup):
+    expected = _loop_min_start_sip(required_sip, years, stepup)
+    assert abs(retirement_engine.min_start_sip_for_overshoot(required_sip, years, stepup)
+               - expected) <= 1
+
+
+def _loop_catch_up(current_sip, required_sip, years, stepup, overshoot_factor=1.10):
+    # The page's year-by-year path before catch_up_plan, plus the year it hit the cap
+    sip, cap = current_sip, overshoot_factor * required_sip
+    path, cap_year = [], None
+    for year in range(1, years + 1):
+        path.append(int(sip))
+        if cap_year is None and sip >= cap:
+            cap_year = year
+        sip = min(sip * (1 + stepup), cap)
+    return path, cap_year
+
+
+@pytest.mark.parametrize("current_sip, required_sip, years, stepup", [
+    *itertools.product((0, 8_000, 17_200, 45_000), (12_000, 47_076), (0, 1, 6, 25),
+                       (0.0, 0.1, 0.15)),
+    # The stepped-up SIP lands exactly on the cap
+    (10_000, 10_000 * 1.1 ** 3 / 1.1, 6, 0.1),
+    (10_000, 10_000 * 1.1 ** 2 / 1.1, 6, 0.1),
+    (11_000, 10_000, 4, 0.1),
+    (5_000, 5_000 / 1.1, 3, 0.0),
+    # Already above the cap
+    (20_000, 10_000, 3, 0.1),
+])
+def test_catch_up_plan_matches_loop(current_sip, required_sip, years, stepup):
+    path, cap_year = _loop_catch_up(current_sip, required_sip, years, stepup)
+    plan = retirement_engine.catch_up_plan(current_sip, required_sip, years, stepup)
+    assert plan.path.tolist() == path
+    assert plan.cap_year == cap_year
+    assert plan.cap == int(1.10 * required_sip)
+    if cap_year is not None and cap_year > 1:
+        assert plan.path[cap_year - 1] == plan.cap
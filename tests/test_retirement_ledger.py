@@ -0,0 +1,36 @@
+import itertools
+
+import pytest
+
+from assumptions import current_assumptions
+from retirement_engine import (
+    portfolio_return,
+    required_corpus_fd_lockin,
+    required_corpus_portfolio,
+    required_monthly_sip,
+)
+from retirement_ledger import build_ledger
+
+LIFE_EXPECTANCY = 90
+
+
+@pytest.mark.parametrize("current_age, retirement_age, monthly_expense, risk, savings, fd_lockin",
+                         list(itertools.product((22, 40), (50, 60, 70), (30_000, 100_000),
+                                                (1, 3, 5), (0, 2_500_000), (False, True))))
+def test_required_sip_ledger_lasts_to_life_expectancy(current_age, retirement_age,
+                                                      monthly_expense, risk, savings, fd_lockin):
+    years_to_ret, retirement_years = retirement_age - current_age, LIFE_EXPECTANCY - retirement_age
+    r = portfolio_return(risk)
+    if fd_lockin:
+        withdrawal_return = current_assumptions().post_ret_return
+        required = required_corpus_fd_lockin(monthly_expense, years_to_ret, retirement_years)
+    else:
+        withdrawal_return = r
+        required = required_corpus_portfolio(monthly_expense, years_to_ret, retirement_years, risk)
+    sip = required_monthly_sip(required, savings, years_to_ret, r)
+
+    ledger = build_ledger(current_age, retirement_age, savings, sip, monthly_expense,
+                          accumulation_return=r, withdrawal_return=withdrawal_return)
+    assert ledger["Age"].iloc[-1] == LIFE_EXPECTANCY - 1
+    assert (ledger["Unfunded withdrawal"] == 0).all()
+    assert (ledger["Closing balance"] >= 0).all()
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+import retirement_engine as engine
+from assumptions import current_assumptions
+from retirement_ledger import build_ledger
+from scenarios import LIFE_EXPECTANCY, catch_up_status, evaluate_scenarios
+
+SCENARIOS = [
+    {"name": "Base", "current_age": 30, "retirement_age": 60, "monthly_expense": 50_000,
+     "current_savings": 1_000_000, "current_monthly_investment": 60_000, "risk": 3,
+     "fd_lockin": False},
+    {"name": "Retire early", "current_age": 30, "retirement_age": 50, "monthly_expense": 50_000,
+     "current_savings": 1_000_000, "current_monthly_investment": 60_000, "risk": 3,
+     "fd_lockin": False},
+    {"name": "FD after", "current_age": 41, "retirement_age": 62, "monthly_expense": 120_000,
+     "current_savings": 8_000_000, "current_monthly_investment": 90_000, "risk": 5,
+     "fd_lockin": True},
+    {"name": "Late start", "current_age": 55, "retirement_age": 65, "monthly_expense": 35_000,
+     "current_savings": 0, "current_monthly_investment": 5_000, "risk": 1,
+     "fd_lockin": False},
+    {"name": "Ahead", "current_age": 25, "retirement_age": 89, "monthly_expense": 20_000,
+     "current_savings": 40_000_000, "current_monthly_investment": 0, "risk": 2,
+     "fd_lockin": True},
+]
+
+
+def _scalar(scenario, compounding):
+    # The main page's path for one scenario, through the scalar engines
+    A = current_assumptions()
+    years_to_ret = scenario["retirement_age"] - scenario["current_age"]
+    retirement_years = LIFE_EXPECTANCY - scenario["retirement_age"]
+    r = engine.portfolio_return(scenario["risk"])
+    if scenario["fd_lockin"]:
+        required = engine.required_corpus_fd_lockin(scenario["monthly_expense"], years_to_ret,
+                                                    retirement_years, compounding=compounding)
+    else:
+        required = engine.required_corpus_portfolio(scenario["monthly_expense"], years_to_ret,
+                                                    retirement_years, scenario["risk"],
+                                                    compounding=compounding)
+    sip = engine.required_monthly_sip(required, scenario["current_savings"], years_to_ret, r,
+                                      compounding=compounding)
+    min_start = engine.min_start_sip_for_overshoot(sip, years_to_ret, A.max_sip_growth)
+    return required, sip, min_start, r
+
+
+@pytest.mark.parametrize("compounding", ("annual", "monthly"))
+def test_scenarios_match_scalar_engines(compounding):
+    results = evaluate_scenarios(SCENARIOS, compounding=compounding)
+    assert len(results) == len(SCENARIOS)
+
+    for scenario, result in zip(SCENARIOS, results):
+        required, sip, min_start, r = _scalar(scenario, compounding)
+        assert result["required_corpus"] == pytest.approx(required, rel=1e-9, abs=1)
+        # The corpus differs in the last bits, which can move the SIP by a rupee
+        assert abs(result["required_sip"] - sip) <= 1
+        assert abs(result["min_start_sip"] - min_start) <= 1
+        assert result["status"] == catch_up_status(scenario["current_monthly_investment"],
+                                                   sip, min_start)
+
+        withdrawal_return = current_assumptions().post_ret_return if scenario["fd_lockin"] else r
+        ledger = build_ledger(scenario["current_age"], scenario["retirement_age"],
+                              scenario["current_savings"], result["required_sip"],
+                              scenario["monthly_expense"], r, withdrawal_return)
+        pd.testing.assert_frame_equal(result["ledger"], ledger)
+
+
+def test_scenarios_cover_every_status():
+    statuses = [result["status"] for result in evaluate_scenarios(SCENARIOS)]
+    assert set(statuses) == {"On track", "Can catch up", "Cannot catch up"}
+
+
+def test_one_scenario_matches_it_alone():
+    together = evaluate_scenarios(SCENARIOS)
+    for scenario, result in zip(SCENARIOS, together):
+        (alone,) = evaluate_scenarios([scenario])
+        assert alone["required_sip"] == result["required_sip"]
+        pd.testing.assert_frame_equal(alone["ledger"], result["ledger"])
+
+
+@pytest.mark.parametrize("change", [{"retirement_age": 30}, {"retirement_age": 90}])
+def test_scenarios_reject_impossible_ages(change):
+    with pytest.raises(ValueError, match="current age < retirement age"):
+        evaluate_scenarios([SCENARIOS[0], {**SCENARIOS[0], **change}])
+
+
+def test_no_scenarios_give_no_results():
+    assert evaluate_scenarios([]) == []
@@ -0,0 +1,279 @@
+import functools
+import re
+
+import streamlit as st
+
+# ============================================================
+# STYLESHEETS
+# ============================================================
+# Page background and text colour come from .streamlit/config.toml, which
+# reaches the browser once per session. Everything below goes out as a
+# <style> element on every full rerun, because Streamlit drops any element
+# a rerun does not draw again; it is assembled and minified once per process.
+
+_BASE_CSS = """
+/* Headings */
+h1, h2, h3 {
+    color: #f8fafc;
+}
+
+/* Dark cards */
+div[data-testid="stContainer"] {
+    background-color: #111827;
+    border-radius: 18px;
+    border: 1px solid #1f2937;
+    padding: 26px;
+}
+div[data-testid="stContainer"]:hover {
+    box-shadow: 0 0 0 1px #10b981;
+    transition: 0.2s ease;
+}
+"""
+
+_HOME_CSS = """
+/* Hero */
+.hero-title {
+    font-size: 44px;
+    font-weight: 800;
+    margin-bottom: 6px;
+}
+.hero-subtitle {
+    font-size: 18px;
+    color: #9ca3af;
+    margin-bottom: 32px;
+}
+
+/* Metrics */
+[data-testid="stMetricValue"] {
+    font-size: 30px;
+    font-weight: 700;
+    color: #10b981;
+}
+
+/* Buttons */
+.stButton > button {
+    background-color: #10b981;
+    color: white;
+    border-radius: 10px;
+    font-weight: 600;
+    border: none;
+    padding: 0.6rem 1.2rem;
+}
+.stButton > button:hover {
+    background-color: #059669;
+}
+
+/* Captions / muted */
+.small-text {
+    color: #94a3b8;
+    font-size: 14px;
+}
+
+/* Accent text */
+.accent {
+    color: #5eead4;
+    font-weight: 600;
+}
+"""
+
+# Shared by the retirement and insurance pages
+_PLANNER_CSS = """
+/* Global text scale; default is ~14px */
+html, body, [class*="css"] {
+    font-size: 17px;
+}
+:root {
+    accent-color: #10b981;
+}
+
+/* Number input wrapper */
+div[data-testid="stNumberInput"] {
+    overflow: visible;
+    border-radius: 14px;
+}
+div[data-testid="stNumberInput"] > div {
+    border-radius: 14px;
+    overflow: hidden;
+}
+
+/* Input field */
+input[type="number"],
+input[type="text"] {
+    background-color: #020617 !important;
+    color: #e5e7eb !important;
+    border: 1px solid #1f2937 !important;
+    border-right: none !important;
+    border-radius: 14px 0 0 14px !important;
+}
+input[type="number"]:focus,
+input[type="text"]:focus {
+    border-color: #10b981 !important;
+    outline: none !important;
+    box-shadow: none !important;
+}
+
+/* Kill BaseWeb wrapper borders */
+div[data-baseweb="base-input"],
+div[data-baseweb="input"],
+div[data-baseweb="base-input"]:hover,
+div[data-baseweb="base-input"]:focus,
+div[data-baseweb="base-input"]:focus-within,
+div[data-baseweb="input"]:hover,
+div[data-baseweb="input"]:focus,
+div[data-baseweb="input"]:focus-within {
+    border: none !important;
+    box-shadow: none !important;
+}
+
+/* Minus / plus buttons; the -1px margin closes the gap to the field */
+button[data-testid="stNumberInputStepDown"] {
+    background-color: #020617 !important;
+    color: #ffffff !important;
+    border-top: 1px solid #1f2937 !important;
+    border-bottom: 1px solid #1f2937 !important;
+    border-left: 1px solid #1f2937 !important;
+    border-right: none !important;
+    margin-left: -1px !important;
+    border-radius: 0 !important;
+    padding: 0.25rem 0.25rem !important;
+}
+button[data-testid="stNumberInputStepUp"] {
+    background-color: #020617 !important;
+    color: #ffffff !important;
+    border: 1px solid #1f2937 !important;
+    border-left: none !important;
+    margin-left: -1px !important;
+    border-radius: 0 14px 14px 0 !important;
+    padding: 0.25rem 0.25rem !important;
+}
+input[type="number"]:focus ~ div button[data-testid="stNumberInputStepUp"],
+input[type="text"]:focus ~ div button[data-testid="stNumberInputStepUp"],
+input[type="number"]:focus ~ div button[data-testid="stNumberInputStepDown"],
+input[type="text"]:focus ~ div button[data-testid="stNumberInputStepDown"] {
+    border-color: #10b981 !important;
+}
+button[data-testid="stNumberInputStepUp"]:hover,
+button[data-testid="stNumberInputStepDown"]:hover {
+    background-color: #10b981 !important;
+    color: #020617 !important;
+}
+
+/* Primary button */
+.stButton > button {
+    background-color: #10b981;
+    color: #022c22;
+    border-radius: 12px;
+    font-weight: 700;
+    border: none;
+    padding: 0.8rem 1.6rem;
+}
+.stButton > button:hover {
+    background-color: #059669;
+}
+
+/* Metrics */
+[data-testid="stMetricValue"] {
+    color: #5eead4;
+    font-weight: 800;
+}
+
+/* Scrollbar */
+::-webkit-scrollbar {
+    width: 8px;
+}
+::-webkit-scrollbar-thumb {
+    background: #10b981;
+    border-radius: 10px;
+}
+
+/* Progress bar: transparent wrapper, dark track, emerald fill, no outlines */
+div[data-testid="stProgress"] {
+    background: transparent !important;
+    padding: 0 !important;
+}
+div[data-testid="stProgress"] div[role="progressbar"] {
+    background: transparent !important;
+}
+div[data-testid="stProgress"] > div {
+    background-color: #020617 !important;
+    height: 12px !important;
+    border-radius: 999px !important;
+    overflow: hidden !important;
+}
+div[data-testid="stProgress"] > div > div {
+    background-color: #10b981 !important;
+    height: 100% !important;
+    border-radius: 999px !important;
+}
+div[data-testid="stProgress"],
+div[data-testid="stProgress"] *,
+div[data-testid="stProgress"] *::before,
+div[data-testid="stProgress"] *::after {
+    border: none !important;
+    outline: none !important;
+    box-shadow: none !important;
+}
+"""
+
+STYLESHEETS = {
+    "home": (_BASE_CSS, _HOME_CSS),
+    "planner": (_BASE_CSS, _PLANNER_CSS),
+}
+
+
+@functools.cache
+def _style_tag(stylesheet: str) -> str:
+    css = "".join(STYLESHEETS[stylesheet])
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s*([{};:,>~])\s*", r"\1", css)
+    css = re.sub(r"\s+", " ", css).replace(";}", "}")
+    return f"<style>{css.strip()}</style>"
+
+
+def apply_theme(stylesheet: str) -> None:
+    # Call right after st.set_page_config, before anything heavy is imported,
+    # so the styled page paints first
+    if stylesheet not in STYLESHEETS:
+        raise ValueError(f"Unknown stylesheet {stylesheet!r}; expected one of {sorted(STYLESHEETS)}")
+    st.markdown(_style_tag(stylesheet), unsafe_allow_html=True)
+
+
+# ============================================================
+# LAZY CHART LIBRARIES
+# ============================================================
+# Altair and pandas take about half a second to import. Pages get them from
+# these functions when they first draw a result, so a cold page paints
+# without them; the Altair theme is registered with the first import.
+
+@functools.cache
+def altair():
+    import altair as alt
+
+    alt.themes.register(
+        "dark_emerald",
+        lambda: {
+            "config": {
+                "background": "transparent",
+                "axis": {
+                    "labelColor": "#9ca3af",
+                    "titleColor": "#e5e7eb",
+                    "gridColor": "#1f2937",
+                    "tickColor": "#374151",
+                },
+                "legend": {
+                    "labelColor": "#e5e7eb",
+                    "titleColor": "#e5e7eb"
+                },
+                "range": {
+                    "category": ["#10b981", "#5eead4", "#34d399", "#059669"]
+                }
+            }
+        }
+    )
+    alt.themes.enable("dark_emerald")
+    return alt
+
+
+def pandas():
+    import pandas as pd
+    return pd